@@ -1,91 +1,52 @@
+import argparse
+import hashlib
+import inspect
+import json
 import os
 import re
-import ast
-import matplotlib.pyplot as plt
-import numpy as np
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+from cache_soluciones import cache_por_defecto, huella_archivo
+from cotas import SCALE
+from resultados_db import RUTA_BD, conectar, ultimas_por_instancia
 
-# Directorio base de los reportes
-DATA_DIR = 'reportes'
-SUBDIRS = ['grandes', 'medianas', 'pequeñas']
 ORDEN_TAMANO = {'pequeñas': 0, 'medianas': 1, 'grandes': 2}
+RUTA_TEX = 'graficos_informe.tex'
+# Huella de las entradas de cada gráfico y cotas LP ya calculadas por .dzn
+RUTA_ESTADO = 'cache/graficos.json'
 
-datos = []
-
-# Recorrer subcarpetas (grandes, medianas, pequeñas)
-for subdir in SUBDIRS:
-    dir_path = os.path.join(DATA_DIR, subdir)
-    for fname in sorted(os.listdir(dir_path)):
-        if fname.endswith('.txt'):
-            path = os.path.join(dir_path, fname)
-            with open(path, 'r', encoding='utf-8') as f:
-                meta = None
-                tiempo = None
-                objetivo = None
-                for line in f:
-                    if line.strip().startswith('Metadata:'):
-                        meta_str = line.strip().replace('Metadata: ', '')
-                        try:
-                            meta = ast.literal_eval(meta_str)
-                        except Exception:
-                            meta = None
-                    if 'COSTO TOTAL:' in line:
-                        match = re.search(r'COSTO TOTAL:\s*\$([0-9]+)\.([0-9]+)', line)
-                        if match:
-                            objetivo = float(match.group(1) + '.' + match.group(2))
-                    if 'Tiempo de resolución:' in line:
-                        match = re.search(r'Tiempo de resolución:\s*([0-9.]+)', line)
-                        if match:
-                            tiempo = float(match.group(1))
-                if meta:
-                    datos.append({
-                        'instancia': fname.replace('.txt',''),
-                        'tamaño': meta.get('tamaño',''),
-                        'numero': meta.get('numero',''),
-                        'suministro_total': float(meta.get('suministro_total',0)),
-                        'demanda_total': float(meta.get('demanda_total',0)),
-                        'factor_holgura': float(meta.get('factor_holgura',0)),
-                        'num_arcos': float(meta.get('num_arcos',0)),
-                        'objetivo': objetivo,
-                        'tiempo': tiempo
-                    })
-
-# --- INYECCIÓN DE DATOS CORREGIDOS MANUALMENTE ---
-# Estos datos reflejan la tabla resumen corregida a mano en informe_proyecto.tex
-# Si existe un dato con el mismo nombre de instancia, se reemplaza
-correcciones = [
-    # Pequeñas
-    {'instancia': 'reporte_pequeña_1', 'tamaño': 'pequeñas', 'numero': 1, 'suministro_total': 682.82, 'demanda_total': 525.24, 'factor_holgura': 1.30, 'num_arcos': 36, 'objetivo': None, 'tiempo': 60.0},
-    {'instancia': 'reporte_pequeña_2', 'tamaño': 'pequeñas', 'numero': 2, 'suministro_total': 849.58, 'demanda_total': 653.52, 'factor_holgura': 1.30, 'num_arcos': 40, 'objetivo': None, 'tiempo': 63.0},
-    {'instancia': 'reporte_pequeña_3', 'tamaño': 'pequeñas', 'numero': 3, 'suministro_total': 1199.01, 'demanda_total': 922.32, 'factor_holgura': 1.30, 'num_arcos': 47, 'objetivo': None, 'tiempo': 9.0},
-    {'instancia': 'reporte_pequeña_4', 'tamaño': 'pequeñas', 'numero': 4, 'suministro_total': 1076.49, 'demanda_total': 828.07, 'factor_holgura': 1.30, 'num_arcos': 51, 'objetivo': None, 'tiempo': 32.108},
-    {'instancia': 'reporte_pequeña_5', 'tamaño': 'pequeñas', 'numero': 5, 'suministro_total': 1456.26, 'demanda_total': 1120.20, 'factor_holgura': 1.30, 'num_arcos': 76, 'objetivo': None, 'tiempo': 78.0},
-    # Medianas
-    {'instancia': 'reporte_mediana_1', 'tamaño': 'medianas', 'numero': 1, 'suministro_total': 2308.14, 'demanda_total': 1775.49, 'factor_holgura': 1.30, 'num_arcos': 87, 'objetivo': None, 'tiempo': 324.0},
-    {'instancia': 'reporte_mediana_2', 'tamaño': 'medianas', 'numero': 2, 'suministro_total': 1062.81, 'demanda_total': 817.54, 'factor_holgura': 1.30, 'num_arcos': 60, 'objetivo': None, 'tiempo': 111.0},
-    {'instancia': 'reporte_mediana_3', 'tamaño': 'medianas', 'numero': 3, 'suministro_total': 1607.10, 'demanda_total': 1236.24, 'factor_holgura': 1.30, 'num_arcos': 99, 'objetivo': None, 'tiempo': 447.0},
-    {'instancia': 'reporte_mediana_4', 'tamaño': 'medianas', 'numero': 4, 'suministro_total': 1450.89, 'demanda_total': 1116.08, 'factor_holgura': 1.30, 'num_arcos': 88, 'objetivo': None, 'tiempo': 133.0},
-    {'instancia': 'reporte_mediana_5', 'tamaño': 'medianas', 'numero': 5, 'suministro_total': 1456.26, 'demanda_total': 1120.20, 'factor_holgura': 1.30, 'num_arcos': 76, 'objetivo': None, 'tiempo': 105.0},
-    # Grandes
-    {'instancia': 'reporte_grande_1', 'tamaño': 'grandes', 'numero': 1, 'suministro_total': 5095.98, 'demanda_total': 3920.00, 'factor_holgura': 1.30, 'num_arcos': 186, 'objetivo': None, 'tiempo': 507.0},
-    {'instancia': 'reporte_grande_2', 'tamaño': 'grandes', 'numero': 2, 'suministro_total': 3134.20, 'demanda_total': 2410.91, 'factor_holgura': 1.30, 'num_arcos': 130, 'objetivo': None, 'tiempo': 333.0},
-    {'instancia': 'reporte_grande_3', 'tamaño': 'grandes', 'numero': 3, 'suministro_total': 4441.16, 'demanda_total': 3416.28, 'factor_holgura': 1.30, 'num_arcos': 183, 'objetivo': None, 'tiempo': 1163.0},
-    {'instancia': 'reporte_grande_4', 'tamaño': 'grandes', 'numero': 4, 'suministro_total': 5757.96, 'demanda_total': 4429.22, 'factor_holgura': 1.30, 'num_arcos': 193, 'objetivo': None, 'tiempo': 507.0},
-    {'instancia': 'reporte_grande_5', 'tamaño': 'grandes', 'numero': 5, 'suministro_total': 5280.20, 'demanda_total': 4061.69, 'factor_holgura': 1.30, 'num_arcos': 167, 'objetivo': None, 'tiempo': 1822.0},
-]
 
-# Reemplazar o agregar los datos corregidos, pero mantener también los datos extraídos de los reportes
-for corr in correcciones:
-    found = False
-    for i, d in enumerate(datos):
-        if d['instancia'] == corr['instancia']:
-            # Fusionar: si el dato corregido es None, mantener el extraído
-            for k, v in corr.items():
-                if v is not None:
-                    datos[i][k] = v
-            found = True
-            break
-    if not found:
-        datos.append(corr)
+def _pyplot():
+    """pyplot con el backend Agg (sin ventana); se importa solo si hay algo que dibujar"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def leer_estado(ruta=RUTA_ESTADO):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        estado = {}
+    estado.setdefault('graficos', {})
+    estado.setdefault('cotas', {})
+    return estado
+
+
+def guardar_estado(estado, ruta=RUTA_ESTADO):
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
 
 def es_valido(d):
     try:
@@ -100,154 +61,370 @@ def es_valido(d):
     except Exception:
         return False
 
-datos = [d for d in datos if es_valido(d)]
-if not datos:
-    print('No hay reportes válidos con datos completos para graficar.')
-    exit(0)
-
-datos.sort(key=lambda x: (ORDEN_TAMANO[x['tamaño']], int(x['numero'])))
-
-instancias = [d['instancia'] for d in datos]
-suministro = [d['suministro_total'] for d in datos]
-demanda = [d['demanda_total'] for d in datos]
-num_arcos = [d['num_arcos'] for d in datos]
-tamaños = [d['tamaño'].capitalize() for d in datos]
-objetivos = [d['objetivo'] for d in datos]
-tiempos = [d['tiempo'] for d in datos]
-
-# Gráfico Suministro vs Demanda
-plt.figure(figsize=(10,6))
-plt.bar(instancias, suministro, label='Suministro total', alpha=0.7)
-plt.bar(instancias, demanda, label='Demanda total', alpha=0.7)
-plt.ylabel('Cantidad')
-plt.xlabel('Instancia')
-plt.title('Suministro y Demanda por Instancia')
-plt.xticks(rotation=45)
-plt.legend()
-plt.tight_layout()
-plt.savefig('suministro_demanda.png')
-plt.close()
-
-# Gráfico Número de arcos
-plt.figure(figsize=(10,6))
-plt.bar(instancias, num_arcos, color='purple')
-plt.ylabel('Número de arcos')
-plt.xlabel('Instancia')
-plt.title('Número de arcos por instancia')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig('num_arcos.png')
-plt.close()
-
-# Gráfico Suministro/Demanda por tamaño
-labels = sorted(set(tamaños), key=lambda x: ORDEN_TAMANO[x.lower()])
-medias_suministro = [np.mean([d['suministro_total'] for d in datos if d['tamaño'].capitalize()==t]) for t in labels]
-medias_demanda = [np.mean([d['demanda_total'] for d in datos if d['tamaño'].capitalize()==t]) for t in labels]
-
-x = np.arange(len(labels))
-width = 0.35
-plt.figure(figsize=(8,5))
-plt.bar(x-width/2, medias_suministro, width, label='Suministro promedio')
-plt.bar(x+width/2, medias_demanda, width, label='Demanda promedio')
-plt.ylabel('Cantidad promedio')
-plt.xlabel('Tamaño de instancia')
-plt.title('Promedio de Suministro y Demanda por Tamaño')
-plt.xticks(x, labels)
-plt.legend()
-plt.tight_layout()
-plt.savefig('promedio_suministro_demanda.png')
-plt.close()
-
-# Gráfico Función Objetivo por instancia (solo si hay datos válidos)
-objetivos_validos = [o for o in objetivos if o is not None]
-if len(objetivos_validos) == len(objetivos):
+
+def cargar_datos(estado):
+    """
+    Última ejecución registrada de cada instancia (tools/resultados_db.py),
+    con el mejor objetivo de todas las ejecuciones sobre el mismo .dzn, la
+    cota de la relajación lineal y la brecha.
+    """
+    con = conectar()
+    filas = ultimas_por_instancia(con)
+    con.close()
+
+    datos = []
+    for f in filas:
+        numero = re.search(r'_(\d+)$', f['nombre'])
+        datos.append({
+            'instancia': f['nombre'],
+            'tamaño': f['tamaño'],
+            'numero': numero.group(1) if numero else '',
+            'ruta': f['ruta'],
+            'huella': f['instancia'],
+            'suministro_total': f['suministro_total'],
+            'demanda_total': f['demanda_total'],
+            'factor_holgura': f['factor_holgura'],
+            'num_arcos': f['nA'],
+            'objetivo': f['mejor_objetivo_c'] / SCALE if f['mejor_objetivo_c'] is not None else None,
+            'tiempo': f['tiempo']
+        })
+    datos = [d for d in datos if es_valido(d)]
+    datos.sort(key=lambda x: (ORDEN_TAMANO[x['tamaño']], int(x['numero'])))
+
+    # La cota es la relajación lineal del modelo (tools/cota_inferior.py,
+    # guardada en cache/cotas/); el estado la recuerda por huella del .dzn,
+    # así que SciPy solo se importa cuando aparece una instancia nueva. Las
+    # ejecuciones importadas del informe no guardan la ruta del .dzn ni el
+    # costo: se busca en instancias/<tamaño>/ y el costo es el de la última
+    # solución guardada de la instancia (cache/soluciones/previas/), solo si
+    # se calculó sobre el mismo contenido del .dzn que la cota.
+    cota_inferior = None
+    for d in datos:
+        ruta_dzn = d.pop('ruta') or os.path.join('instancias', d['tamaño'], d['instancia'] + '.dzn')
+        huella_ejecucion = d.pop('huella')
+        d['cota_inferior'] = None
+        d['brecha'] = None
+        if not os.path.exists(ruta_dzn):
+            continue
+        huella = huella_archivo(ruta_dzn)
+        if d['objetivo'] is not None and not huella_ejecucion.startswith('informe:') and huella_ejecucion != huella:
+            # La ejecución registrada es de una versión anterior del .dzn
+            print(f"Advertencia: {ruta_dzn} cambió desde su última ejecución; se omite su costo")
+            d['objetivo'] = None
+        if d['objetivo'] is None:
+            previa = cache_por_defecto().previa_vigente(ruta_dzn)
+            if previa and previa.get('costo_total_c') is not None:
+                d['objetivo'] = previa['costo_total_c'] / SCALE
+        if huella not in estado['cotas']:
+            if cota_inferior is None:
+                try:
+                    from cota_inferior import cota_inferior
+                except ImportError:  # la relajación lineal necesita SciPy
+                    print('Advertencia: SciPy no está instalado; se omiten las cotas inferiores y las brechas')
+                    cota_inferior = False
+            if cota_inferior is False:
+                continue
+            estado['cotas'][huella] = cota_inferior(ruta_dzn)['cota_inferior_c']
+        cota_c = estado['cotas'][huella]
+        if cota_c is not None:
+            d['cota_inferior'] = cota_c / SCALE
+            if d['objetivo'] is not None:
+                costo_c = round(d['objetivo'] * SCALE)
+                if costo_c < cota_c:
+                    # Costo y cota de instancias distintas: no es una brecha de 0 %
+                    print(f"Advertencia: el costo de {d['instancia']} ({d['objetivo']:.2f}) es menor que su "
+                          f"cota LP ({cota_c / SCALE:.2f}); se omite la brecha")
+                else:
+                    d['brecha'] = (costo_c - cota_c) / costo_c if costo_c > 0 else 0.0
+    return datos
+
+
+def _etiquetas_tamaño(datos):
+    return sorted({d['tamaño'].capitalize() for d in datos}, key=lambda x: ORDEN_TAMANO[x.lower()])
+
+
+def _media_por_tamaño(datos, campo):
+    import numpy as np
+    medias = []
+    for t in _etiquetas_tamaño(datos):
+        valores = [d[campo] for d in datos if d['tamaño'].capitalize()==t and d[campo] is not None]
+        medias.append(np.mean(valores) if valores else np.nan)
+    return medias
+
+
+def suministro_demanda(plt, datos, ruta):
+    instancias = [d['instancia'] for d in datos]
     plt.figure(figsize=(10,6))
-    plt.plot(instancias, objetivos, marker='o', color='green')
+    plt.bar(instancias, [d['suministro_total'] for d in datos], label='Suministro total', alpha=0.7)
+    plt.bar(instancias, [d['demanda_total'] for d in datos], label='Demanda total', alpha=0.7)
+    plt.ylabel('Cantidad')
+    plt.xlabel('Instancia')
+    plt.title('Suministro y Demanda por Instancia')
+    plt.xticks(rotation=45)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(ruta)
+    plt.close()
+
+
+def num_arcos(plt, datos, ruta):
+    plt.figure(figsize=(10,6))
+    plt.bar([d['instancia'] for d in datos], [d['num_arcos'] for d in datos], color='purple')
+    plt.ylabel('Número de arcos')
+    plt.xlabel('Instancia')
+    plt.title('Número de arcos por instancia')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(ruta)
+    plt.close()
+
+
+def promedio_suministro_demanda(plt, datos, ruta):
+    import numpy as np
+    labels = _etiquetas_tamaño(datos)
+    x = np.arange(len(labels))
+    width = 0.35
+    plt.figure(figsize=(8,5))
+    plt.bar(x-width/2, _media_por_tamaño(datos, 'suministro_total'), width, label='Suministro promedio')
+    plt.bar(x+width/2, _media_por_tamaño(datos, 'demanda_total'), width, label='Demanda promedio')
+    plt.ylabel('Cantidad promedio')
+    plt.xlabel('Tamaño de instancia')
+    plt.title('Promedio de Suministro y Demanda por Tamaño')
+    plt.xticks(x, labels)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(ruta)
+    plt.close()
+
+
+def funcion_objetivo_por_instancia(plt, datos, ruta):
+    plt.figure(figsize=(10,6))
+    plt.plot([d['instancia'] for d in datos], [d['objetivo'] for d in datos], marker='o', color='green')
     plt.ylabel('Costo total (función objetivo)')
     plt.xlabel('Instancia')
     plt.title('Función objetivo (costo total) por instancia')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig('funcion_objetivo_por_instancia.png')
+    plt.savefig(ruta)
     plt.close()
-else:
-    print('Advertencia: No se pudo graficar función objetivo por instancia (faltan datos en algunos reportes)')
-
-# Gráfico Función Objetivo promedio por tamaño (solo si hay datos válidos)
-medias_objetivo = []
-for t in labels:
-    valores = [d['objetivo'] for d in datos if d['tamaño'].capitalize()==t and d['objetivo'] is not None]
-    medias_objetivo.append(np.mean(valores) if valores else np.nan)
-if all([not np.isnan(m) for m in medias_objetivo]):
+
+
+def funcion_objetivo_promedio(plt, datos, ruta):
     plt.figure(figsize=(8,5))
-    plt.bar(labels, medias_objetivo, color='orange')
+    plt.bar(_etiquetas_tamaño(datos), _media_por_tamaño(datos, 'objetivo'), color='orange')
     plt.ylabel('Costo total promedio')
     plt.xlabel('Tamaño de instancia')
     plt.title('Función objetivo promedio por tamaño de instancia')
     plt.tight_layout()
-    plt.savefig('funcion_objetivo_promedio.png')
+    plt.savefig(ruta)
+    plt.close()
+
+
+def brechas_por_instancia(plt, datos, ruta):
+    # Las instancias sin costo quedan vacías
+    plt.figure(figsize=(10,6))
+    plt.bar([d['instancia'] for d in datos], [100 * d['brecha'] if d['brecha'] is not None else 0 for d in datos],
+            color='brown')
+    plt.ylabel('Brecha respecto de la cota LP (%)')
+    plt.xlabel('Instancia')
+    plt.title('Brecha de optimalidad por instancia')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(ruta)
+    plt.close()
+
+
+def tiempos_resolucion(plt, datos, ruta):
+    plt.figure(figsize=(10,6))
+    plt.plot([d['instancia'] for d in datos], [d['tiempo'] for d in datos], marker='o', color='red')
+    plt.ylabel('Tiempo de resolución (s)')
+    plt.xlabel('Instancia')
+    plt.title('Tiempo de resolución por instancia')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(ruta)
     plt.close()
-else:
-    print('Advertencia: No se pudo graficar función objetivo promedio por tamaño (faltan datos)')
-
-# Gráfico Tiempos de resolución por instancia
-plt.figure(figsize=(10,6))
-plt.plot(instancias, tiempos, marker='o', color='red')
-plt.ylabel('Tiempo de resolución (s)')
-plt.xlabel('Instancia')
-plt.title('Tiempo de resolución por instancia')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig('tiempos_resolucion.png')
-plt.close()
-
-# Gráfico Tiempos de resolución promedio por tamaño (corregido para filtrar None)
-medias_tiempo = []
-for t in labels:
-    valores = [d['tiempo'] for d in datos if d['tamaño'].capitalize()==t and d['tiempo'] is not None]
-    medias_tiempo.append(np.mean(valores) if valores else np.nan)
-plt.figure(figsize=(8,5))
-plt.bar(labels, medias_tiempo, color='teal')
-plt.ylabel('Tiempo promedio (s)')
-plt.xlabel('Tamaño de instancia')
-plt.title('Tiempo de resolución promedio por tamaño de instancia')
-plt.tight_layout()
-plt.savefig('tiempos_resolucion_promedio.png')
-plt.close()
-
-print('¡Gráficos generados exitosamente!')
-
-# Al final del script, generar un archivo .tex con las inclusiones de los gráficos generados
-with open('graficos_informe.tex', 'w', encoding='utf-8') as f:
-    f.write('% Gráficos generados automáticamente\n')
-    if os.path.exists('suministro_demanda.png'):
-        f.write('\\begin{figure}[H]\n')
-        f.write('\\centering\n')
-        f.write('\\includegraphics[width=0.8\\textwidth]{suministro_demanda.png}\n')
-        f.write('\\caption{Suministro y demanda por instancia}\n')
-        f.write('\\end{figure}\n\n')
-    if os.path.exists('num_arcos.png'):
-        f.write('\\begin{figure}[H]\n')
-        f.write('\\centering\n')
-        f.write('\\includegraphics[width=0.8\\textwidth]{num_arcos.png}\n')
-        f.write('\\caption{Número de arcos por instancia}\n')
-        f.write('\\end{figure}\n\n')
-    if os.path.exists('promedio_suministro_demanda.png'):
-        f.write('\\begin{figure}[H]\n')
-        f.write('\\centering\n')
-        f.write('\\includegraphics[width=0.7\\textwidth]{promedio_suministro_demanda.png}\n')
-        f.write('\\caption{Promedio de suministro y demanda por tamaño de instancia}\n')
-        f.write('\\end{figure}\n\n')
-    if os.path.exists('tiempos_resolucion.png'):
-        f.write('\\begin{figure}[H]\n')
-        f.write('\\centering\n')
-        f.write('\\includegraphics[width=0.7\\textwidth]{tiempos_resolucion.png}\n')
-        f.write('\\caption{Tiempos de resolución por instancia}\n')
-        f.write('\\end{figure}\n\n')
-    if os.path.exists('tiempos_resolucion_promedio.png'):
-        f.write('\\begin{figure}[H]\n')
-        f.write('\\centering\n')
-        f.write('\\includegraphics[width=0.7\\textwidth]{tiempos_resolucion_promedio.png}\n')
-        f.write('\\caption{Tiempos de resolución promedio por tamaño de instancia}\n')
-        f.write('\\end{figure}\n\n')
-print('Archivo graficos_informe.tex generado para inclusión automática en el informe.')
+
+
+def tiempos_resolucion_promedio(plt, datos, ruta):
+    plt.figure(figsize=(8,5))
+    plt.bar(_etiquetas_tamaño(datos), _media_por_tamaño(datos, 'tiempo'), color='teal')
+    plt.ylabel('Tiempo promedio (s)')
+    plt.xlabel('Tamaño de instancia')
+    plt.title('Tiempo de resolución promedio por tamaño de instancia')
+    plt.tight_layout()
+    plt.savefig(ruta)
+    plt.close()
+
+
+def _objetivo_en_todos(datos):
+    return all(d['objetivo'] is not None for d in datos)
+
+
+def _objetivo_en_cada_tamaño(datos):
+    tamaños = {d['tamaño'] for d in datos}
+    return all(any(d['objetivo'] is not None for d in datos if d['tamaño'] == t) for t in tamaños)
+
+
+def _alguna_brecha(datos):
+    return any(d['brecha'] is not None for d in datos)
+
+
+# Cada gráfico declara las columnas de datos que usa ('entradas'): solo se
+# vuelve a dibujar si cambian esas columnas o el código de 'dibujar'. Si
+# 'disponible' da falso se omite con 'aviso'. 'leyenda' y 'ancho' son los de
+# graficos_informe.tex; los gráficos sin leyenda no se incluyen.
+GRAFICOS = [
+    {'archivo': 'suministro_demanda.png', 'dibujar': suministro_demanda,
+     'entradas': ('instancia', 'suministro_total', 'demanda_total'),
+     'leyenda': 'Suministro y demanda por instancia', 'ancho': '0.8'},
+    {'archivo': 'num_arcos.png', 'dibujar': num_arcos,
+     'entradas': ('instancia', 'num_arcos'),
+     'leyenda': 'Número de arcos por instancia', 'ancho': '0.8'},
+    {'archivo': 'promedio_suministro_demanda.png', 'dibujar': promedio_suministro_demanda,
+     'entradas': ('tamaño', 'suministro_total', 'demanda_total'),
+     'leyenda': 'Promedio de suministro y demanda por tamaño de instancia', 'ancho': '0.7'},
+    {'archivo': 'funcion_objetivo_por_instancia.png', 'dibujar': funcion_objetivo_por_instancia,
+     'entradas': ('instancia', 'objetivo'), 'disponible': _objetivo_en_todos,
+     'aviso': 'No se pudo graficar función objetivo por instancia (faltan datos en algunas ejecuciones)'},
+    {'archivo': 'funcion_objetivo_promedio.png', 'dibujar': funcion_objetivo_promedio,
+     'entradas': ('tamaño', 'objetivo'), 'disponible': _objetivo_en_cada_tamaño,
+     'aviso': 'No se pudo graficar función objetivo promedio por tamaño (faltan datos)'},
+    {'archivo': 'brechas_por_instancia.png', 'dibujar': brechas_por_instancia,
+     'entradas': ('instancia', 'brecha'), 'disponible': _alguna_brecha,
+     'aviso': 'No se pudo graficar la brecha (no hay costos de ejecuciones)',
+     'leyenda': 'Brecha de optimalidad respecto de la cota de la relajación lineal', 'ancho': '0.8'},
+    {'archivo': 'tiempos_resolucion.png', 'dibujar': tiempos_resolucion,
+     'entradas': ('instancia', 'tiempo'),
+     'leyenda': 'Tiempos de resolución por instancia', 'ancho': '0.7'},
+    {'archivo': 'tiempos_resolucion_promedio.png', 'dibujar': tiempos_resolucion_promedio,
+     'entradas': ('tamaño', 'tiempo'),
+     'leyenda': 'Tiempos de resolución promedio por tamaño de instancia', 'ancho': '0.7'},
+]
+
+
+def _disponible(grafico, datos):
+    return grafico.get('disponible', lambda _: True)(datos)
+
+
+def _dibujar(indice, datos):
+    # Corre en los procesos del pool, que reciben el gráfico por índice
+    grafico = GRAFICOS[indice]
+    grafico['dibujar'](_pyplot(), datos, grafico['archivo'])
+    return indice
+
+
+# Código compartido por todas las figuras: si cambia, hay que redibujarlas todas
+_AUXILIARES = (_pyplot, _etiquetas_tamaño, _media_por_tamaño, _dibujar)
+
+
+def huella_grafico(grafico, datos):
+    """
+    sha256 de las columnas de entrada del gráfico, de la función que lo dibuja
+    y de los auxiliares que comparten todas las figuras
+    """
+    contenido = {'codigo': [inspect.getsource(f) for f in (grafico['dibujar'],) + _AUXILIARES],
+                 'orden_tamaño': ORDEN_TAMANO,
+                 'datos': [[d[c] for c in grafico['entradas']] for d in datos]}
+    return hashlib.sha256(json.dumps(contenido, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _tabla_cotas(datos):
+    if not any(d['cota_inferior'] is not None for d in datos):
+        return ''
+    partes = ['\\begin{table}[H]\n', '\\centering\n', '\\begin{tabular}{lrrr}\n',
+              'Instancia & Objetivo & Cota LP & Brecha \\\\\n\\hline\n']
+    for d in datos:
+        objetivo = f"{d['objetivo']:.2f}" if d['objetivo'] is not None else '--'
+        cota = f"{d['cota_inferior']:.2f}" if d['cota_inferior'] is not None else '--'
+        gap = f"{100 * d['brecha']:.3f}\\%" if d['brecha'] is not None else '--'
+        nombre = d['instancia'].replace('_', '\\_')
+        partes.append(f"{nombre} & {objetivo} & {cota} & {gap} \\\\\n")
+    partes += ['\\end{tabular}\n', '\\caption{Costo, cota inferior y brecha por instancia}\n', '\\end{table}\n\n']
+    return ''.join(partes)
+
+
+def seccion_tex(datos):
+    """graficos_informe.tex: las figuras con leyenda disponibles y, tras la de brechas, la tabla de cotas"""
+    partes = ['% Gráficos generados automáticamente\n']
+    for grafico in GRAFICOS:
+        if 'leyenda' in grafico and _disponible(grafico, datos):
+            partes.append('\\begin{figure}[H]\n'
+                          '\\centering\n'
+                          f"\\includegraphics[width={grafico['ancho']}\\textwidth]{{{grafico['archivo']}}}\n"
+                          f"\\caption{{{grafico['leyenda']}}}\n"
+                          '\\end{figure}\n\n')
+        if grafico['archivo'] == 'brechas_por_instancia.png':
+            partes.append(_tabla_cotas(datos))
+    return ''.join(partes)
+
+
+def generar(forzar=False, procesos=None):
+    """
+    Dibuja los gráficos de GRAFICOS cuyas entradas cambiaron desde la
+    última vez (o cuyo archivo falta), en procesos paralelos si son varios,
+    y reescribe graficos_informe.tex solo si cambia su contenido. Devuelve
+    los archivos dibujados.
+    """
+    estado = leer_estado()
+    datos = cargar_datos(estado)
+    if not datos:
+        print(f'No hay ejecuciones registradas en {RUTA_BD} para graficar '
+              '(python3 tools/resultados_db.py importar-informe carga las del informe).')
+        return []
+
+    print(f"{'Instancia':<22}{'Objetivo':>16}{'Cota LP':>16}{'Brecha':>10}")
+    for d in datos:
+        objetivo = f"{d['objetivo']:.2f}" if d['objetivo'] is not None else '-'
+        cota = f"{d['cota_inferior']:.2f}" if d['cota_inferior'] is not None else '-'
+        gap = f"{100 * d['brecha']:.3f}%" if d['brecha'] is not None else '-'
+        print(f"{d['instancia']:<22}{objetivo:>16}{cota:>16}{gap:>10}")
+
+    pendientes = {}
+    for indice, grafico in enumerate(GRAFICOS):
+        if not _disponible(grafico, datos):
+            print(f"Advertencia: {grafico['aviso']}")
+            continue
+        huella = huella_grafico(grafico, datos)
+        if forzar or estado['graficos'].get(grafico['archivo']) != huella or not os.path.exists(grafico['archivo']):
+            pendientes[indice] = huella
+
+    if pendientes:
+        # Importado antes de crear el pool, los procesos (fork) lo heredan
+        _pyplot()
+        procesos = min(len(pendientes), procesos or os.cpu_count() or 1)
+        if procesos > 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                list(pool.map(_dibujar, pendientes, [datos] * len(pendientes)))
+        else:
+            for indice in pendientes:
+                _dibujar(indice, datos)
+        for indice, huella in pendientes.items():
+            estado['graficos'][GRAFICOS[indice]['archivo']] = huella
+
+    tex = seccion_tex(datos)
+    try:
+        with open(RUTA_TEX, 'r', encoding='utf-8') as f:
+            tex_cambio = f.read() != tex
+    except FileNotFoundError:
+        tex_cambio = True
+    if tex_cambio:
+        with open(RUTA_TEX, 'w', encoding='utf-8') as f:
+            f.write(tex)
+    guardar_estado(estado)
+
+    dibujados = [GRAFICOS[indice]['archivo'] for indice in pendientes]
+    print(f"{len(dibujados)} gráficos dibujados ({', '.join(dibujados) or 'ninguno cambió'})")
+    if tex_cambio:
+        print(f'Archivo {RUTA_TEX} generado para inclusión automática en el informe.')
+    return dibujados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gráficos del informe a partir del registro de ejecuciones')
+    parser.add_argument('--forzar', action='store_true', help='dibujar todos aunque sus entradas no cambien')
+    parser.add_argument('--procesos', type=int, default=None, help='procesos para dibujar en paralelo')
+    args = parser.parse_args()
+    inicio = time.perf_counter()
+    generar(args.forzar, args.procesos)
+    print(f'Listo en {time.perf_counter() - inicio:.2f}s')
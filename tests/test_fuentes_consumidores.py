@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tools'))
+
+from cotas import calcular_cotas
+from factibilidad import analisis_conocido, analizar_factibilidad
+
+# Planta 1 -> tanque 2 sin salida y consumidor 3 -> consumidor 4. El 4 pide
+# 1500 y solo puede dejar 1000 sin cubrir (MAX_INSATISFECHA_C), así que el 3
+# tiene que emitir 500 declarando más demanda insatisfecha que la suya. El
+# óptimo (MILP de HiGHS) es 1650010.00.
+INSTANCIA = {
+    'nP': 1, 'nT': 1, 'nC1': 1, 'nC2': 1,
+    'arc_from': [1, 3], 'arc_to': [2, 4],
+    'supply': [100, 0, 0, 0], 'demand': [0, 0, 100, 1500],
+    'max_capacity': [1000, 2000, 3000],
+    'install_cost': [[10, 20, 30], [10, 20, 30]], 'trans_cost': [1, 1]
+}
+OPTIMO_C = 165001000
+
+
+def test_cotas_admiten_flujo_emitido_por_consumidores():
+    flow_ub, allowed_diam = calcular_cotas(INSTANCIA)
+    assert flow_ub[1] >= 50000
+    assert 1 in allowed_diam[1]
+
+
+def test_optimo_con_las_cotas():
+    pytest.importorskip('scipy')
+    from benders import resolver_benders
+    r = resolver_benders(INSTANCIA, tiempo_limite=30, verbose=False)
+    assert r['estado'] == 'OPTIMO'
+    assert r['costo_total_c'] == OPTIMO_C
+
+
+def test_presolve_conserva_el_optimo():
+    pytest.importorskip('scipy')
+    from benders import resolver_benders
+    from presolve import presolve
+    reducida, mapeo = presolve(INSTANCIA)
+    assert mapeo['estadisticas']['arcos_reducidos'] == 1
+    assert resolver_benders(reducida, tiempo_limite=30, verbose=False)['costo_total_c'] == OPTIMO_C
+
+
+def test_factibilidad_no_la_declara_infactible():
+    f = analizar_factibilidad(INSTANCIA)
+    assert f['clasificacion'] == 'DEMANDA_PARCIAL'
+    assert f['nodos_sin_holgura'] == []
+    assert analisis_conocido(f) is None
+
+
+def test_evaluador_usa_la_emision_de_consumidores():
+    from evaluador import evaluar_diseño
+    r = evaluar_diseño(INSTANCIA, [0, 1])
+    assert r['factible']
+    assert r['costo_total_c'] == OPTIMO_C
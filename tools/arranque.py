@@ -0,0 +1,146 @@
+import json
+import os
+import re
+
+# Solvers que aceptan anotaciones warm_start (se comparan en minúsculas con el id)
+SOLVERS_WARM_START = ('gurobi', 'cplex', 'xpress', 'scip', 'cp-sat', 'ortools')
+
+DIAMETROS_MM = [75, 100, 150]  # diam_mm de models/red.mzn
+
+# Salida compacta: en vez del reporte de texto, MiniZinc imprime por solución
+# solo la sección "compacto" de models/red.mzn, una línea JSON con los costos,
+# los arcos con tubería o flujo y la demanda no satisfecha distinta de cero.
+# El reporte de texto se arma en Python si hace falta (tools/reporte.py). Con
+# el reporte de texto se omite esa sección
+SECCION_COMPACTA = 'compacto'
+OPCIONES_SALIDA_COMPACTA = ['--only-sections', SECCION_COMPACTA]
+OPCIONES_SALIDA_TEXTO = ['--not-sections', SECCION_COMPACTA]
+
+_RE_SOLVE = re.compile(r'^solve\s*(?:::\s*(?P<anotacion>.*?)\s*)?(?P<objetivo>(?:minimize|maximize|satisfy)\b.*?;)',
+                       re.S | re.M)
+_RE_ARCO = re.compile(r'^Arco (\d+): \d+ -> \d+ \| Flujo: ([-\d.e+]+) l/min \| Diámetro: (\d+|N/A)', re.M)
+_RE_COSTO = re.compile(r'^COSTO TOTAL:\s*\$(-?\d+)\.(\d+)', re.M)
+_RE_TAMAÑO = {nombre: re.compile(rf'^\s*{nombre}\s*=\s*(\d+)\s*;', re.M) for nombre in ('nA', 'nD')}
+
+_WARM_START = """warm_start_array([
+           warm_start([y[a,d] | a in 1..nA, d in 1..nD], [ws_y[a,d] | a in 1..nA, d in 1..nD]),
+           warm_start(f_c, ws_f)
+         ])"""
+
+# Sin warm_start: la primera bajada de la búsqueda sigue la solución previa
+# (cada literal "igual a la pista" se prueba primero en true) y luego se
+# continúa con la búsqueda original del modelo
+_PISTA = """bool_search([y[a,d] = ws_y[a,d] | a in 1..nA, d in 1..nD], input_order, indomain_max),
+           bool_search([f_c[a] = ws_f[a] | a in 1..nA], input_order, indomain_max)"""
+
+_DECLARACIONES = """
+% Solución previa para el arranque (la escribe tools/arranque.py)
+array[1..nA, 1..nD] of bool: ws_y;
+array[1..nA] of int: ws_f;
+"""
+
+
+def soporta_warm_start(solver):
+    solver = solver.lower()
+    return any(nombre in solver for nombre in SOLVERS_WARM_START)
+
+
+def tamaños_dzn(ruta_dzn):
+    """(nA, nD) leídos de la cabecera del .dzn, sin parsear los arreglos"""
+    with open(ruta_dzn, 'r', encoding='utf-8') as f:
+        texto = f.read()
+    valores = []
+    for nombre in ('nA', 'nD'):
+        m = _RE_TAMAÑO[nombre].search(texto)
+        if not m:
+            return None
+        valores.append(int(m.group(1)))
+    return tuple(valores)
+
+
+def solucion_desde_salida(stdout, nA, nD):
+    """
+    Reconstruye y (diámetro 1..nD por arco, 0 = sin tubería) y f_c a partir
+    del detalle de arcos activos que imprime el modelo, y el costo total
+    escalado ('costo_total_c', None si no aparece). Si el solver imprimió
+    varias soluciones se usa la última. None si no hay ninguna.
+    También lee la salida compacta (OPCIONES_SALIDA_COMPACTA), que además
+    trae 'insatisfecha' ({nodo: unmet_demand_c} de los consumidores con
+    demanda no satisfecha).
+    """
+    bloques = stdout.split('----------')
+    for bloque in reversed(bloques):
+        if '"costos"' in bloque:
+            return _solucion_compacta(bloque, nA, nD)
+        if 'DETALLE DE ARCOS ACTIVOS' not in bloque:
+            continue
+        y = [0] * nA
+        f_c = [0] * nA
+        for arco, flujo, diametro in _RE_ARCO.findall(bloque):
+            a = int(arco) - 1
+            if not 0 <= a < nA:
+                return None
+            f_c[a] = int(round(float(flujo) * 100))
+            if diametro != 'N/A' and int(diametro) in DIAMETROS_MM[:nD]:
+                y[a] = DIAMETROS_MM.index(int(diametro)) + 1
+        costo = _RE_COSTO.search(bloque)
+        costo_c = int(costo.group(1)) * 100 + int(costo.group(2)) if costo else None
+        return {'y': y, 'f_c': f_c, 'costo_total_c': costo_c}
+    return None
+
+
+def _solucion_compacta(bloque, nA, nD):
+    # El objeto es la última línea que empieza con '{'; antes puede haber
+    # estadísticas (%%%mzn-stat) o la cabecera de ejecutor.py
+    inicio = 0 if bloque.startswith('{') else bloque.rfind('\n{') + 1
+    try:
+        valores = json.loads(bloque[inicio:bloque.rfind('}') + 1])
+    except ValueError:
+        return None
+    y = [0] * nA
+    f_c = [0] * nA
+    for arco, d, flujo in valores['arcos']:
+        if not 0 < arco <= nA or not 0 <= d <= nD:
+            return None
+        y[arco - 1] = d
+        f_c[arco - 1] = flujo
+    return {'y': y, 'f_c': f_c, 'insatisfecha': {nodo: u for nodo, u in valores['insatisfecha']},
+            'costo_total_c': sum(valores['costos'])}
+
+
+def seccion_arranque(solucion, nD):
+    """Texto .dzn con ws_y y ws_f para el modelo de arranque"""
+    valores_y = []
+    for d_elegido in solucion['y']:
+        valores_y.extend('true' if d == d_elegido else 'false' for d in range(1, nD + 1))
+    return (f"ws_y = array2d(1..nA, 1..nD, [{', '.join(valores_y)}]);\n"
+            f"ws_f = [{', '.join(str(int(f)) for f in solucion['f_c'])}];\n")
+
+
+def modelo_con_arranque(modelo, solver, carpeta):
+    """
+    Escribe en 'carpeta' una copia del modelo con el ítem solve reemplazado:
+    warm_start si el solver lo soporta, o la búsqueda guiada por la pista en
+    otro caso. Los include se resuelven con '-I <carpeta del modelo>'.
+    Devuelve la ruta del modelo nuevo.
+    """
+    with open(modelo, 'r', encoding='utf-8', newline='') as f:
+        texto = f.read()
+    fin_linea = '\r\n' if '\r\n' in texto else '\n'
+    m = _RE_SOLVE.search(texto)
+    if not m:
+        raise ValueError(f'No se encontró el ítem solve en {modelo}')
+    anotacion = m.group('anotacion')
+    if soporta_warm_start(solver):
+        anotaciones = [_WARM_START] + ([anotacion] if anotacion else [])
+        solve = 'solve :: ' + ' :: '.join(anotaciones)
+    else:
+        busquedas = [_PISTA] + ([anotacion] if anotacion else [])
+        solve = 'solve :: seq_search([\n           ' + ',\n           '.join(busquedas) + '\n         ])'
+    reemplazo = _DECLARACIONES + solve + '\n      ' + m.group('objetivo')
+    reemplazo = reemplazo.replace('\r\n', '\n').replace('\n', fin_linea)
+    texto = texto[:m.start()] + reemplazo + texto[m.end():]
+    ruta = os.path.join(carpeta, os.path.basename(modelo))
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        f.write(texto)
+    return ruta
@@ -0,0 +1,203 @@
+import argparse
+import math
+import os
+import time
+
+from ortools.sat.python import cp_model
+
+from cache_soluciones import cache_por_defecto
+from cotas import datos_escalados
+from dzn import leer_dzn
+from factibilidad import MAX_INSATISFECHA_C, PENALIZACION
+from reporte import escribir_reporte, pesos, resultado_modelo
+from resultados_db import registrar_ejecucion
+from traza import metricas
+
+ESTADOS = {
+    cp_model.OPTIMAL: 'OPTIMO',
+    cp_model.FEASIBLE: 'LIMITE',
+    cp_model.INFEASIBLE: 'INFACTIBLE',
+    cp_model.MODEL_INVALID: 'INVALIDO',
+    cp_model.UNKNOWN: 'DESCONOCIDO'
+}
+# El portafolio de CP-SAT necesita varios trabajadores aunque haya pocos
+# núcleos: con uno solo no prueba el óptimo de complejidad_extrema_* en 15 s
+TRABAJADORES_POR_DEFECTO = 8
+# Estados de ESTADOS con los nombres de resultados_db
+_ESTADOS_REGISTRO = {'LIMITE': 'SOLUCION', 'INVALIDO': 'ERROR', 'DESCONOCIDO': 'SIN_SOLUCION'}
+
+
+class _Observador(cp_model.CpSolverSolutionCallback):
+    """Registra cada solución mejorada y se la pasa a al_encontrar, si hay"""
+
+    def __init__(self, modelo, al_encontrar, inicio):
+        super().__init__()
+        self.modelo = modelo
+        self.al_encontrar = al_encontrar
+        self.inicio = inicio
+        self.historial = []
+
+    def on_solution_callback(self):
+        costo = int(round(self.ObjectiveValue()))
+        tiempo = round(time.perf_counter() - self.inicio, 2)
+        self.historial.append((tiempo, costo))
+        if self.al_encontrar is not None:
+            self.al_encontrar({
+                'tiempo': tiempo,
+                'costo_total_c': costo,
+                'cota_inferior_c': math.ceil(self.BestObjectiveBound() - 1e-6),
+                'y': self.modelo._diseño(self.Value)
+            })
+
+
+class ModeloCPSAT:
+    """
+    Las variables y restricciones de models/main.mzn (red.mzn más
+    reificadas.mzn) armadas directo en la API de CP-SAT, sin el proceso de
+    MiniZinc ni el aplanado. y[a][d] solo existe para los diámetros de
+    allowed_diam[a] (en el modelo los demás se fijan en false); f_c[a] va
+    de 0 a flow_ub[a] y unmet_demand_c solo existe en los consumidores.
+    El modelo se arma una vez; se puede resolver varias veces cambiando la
+    pista.
+    """
+
+    def __init__(self, arreglos):
+        self.arreglos = arreglos
+        datos = datos_escalados(arreglos)
+        supply, demand = datos['supply'], datos['demand']
+        N, nP, nT = datos['N'], datos['nP'], datos['nT']
+        arc_from, arc_to = datos['arc_from'], datos['arc_to']
+        self.nA = nA = datos['nA']
+        self.nD = nD = datos['nD']
+        self.N, self.nP, self.nT = N, nP, nT
+        capacidad_c, install_c, trans_c = datos['capacidad_c'], datos['install_c'], datos['trans_c']
+        self.flow_ub, allowed_diam = datos['flow_ub'], datos['allowed_diam']
+
+        m = self.modelo = cp_model.CpModel()
+        self.y = [{d: m.NewBoolVar(f'y_{a+1}_{d}') for d in sorted(allowed_diam[a])} for a in range(nA)]
+        self.f_c = [m.NewIntVar(0, self.flow_ub[a], f'f_{a+1}') for a in range(nA)]
+        self.unmet_c = {i: m.NewIntVar(0, MAX_INSATISFECHA_C, f'u_{i}') for i in range(nP + nT + 1, N + 1)}
+
+        for a in range(nA):
+            # active[a] <-> f_c[a] > 0 (reificadas.mzn)
+            activo = m.NewBoolVar(f'active_{a+1}')
+            m.Add(self.f_c[a] >= 1).OnlyEnforceIf(activo)
+            m.Add(self.f_c[a] == 0).OnlyEnforceIf(activo.Not())
+            # Sin diámetro no hay flujo (el if-then-else de reificadas.mzn)
+            m.AddBoolOr(list(self.y[a].values())).OnlyEnforceIf(activo)
+            m.AddAtMostOne(self.y[a].values())
+            m.Add(self.f_c[a] <= sum(capacidad_c[d-1] * v for d, v in self.y[a].items()))
+
+        entrada = [[] for _ in range(N + 1)]
+        salida = [[] for _ in range(N + 1)]
+        for a, (u, v) in enumerate(zip(arc_from, arc_to)):
+            salida[u].append(self.f_c[a])
+            entrada[v].append(self.f_c[a])
+        for i in range(1, nP + 1):
+            m.Add(sum(salida[i]) <= supply[i-1])
+        for i in range(nP + 1, nP + nT + 1):
+            m.Add(sum(entrada[i]) == sum(salida[i]))
+        for i, u in self.unmet_c.items():
+            m.Add(sum(entrada[i]) + u == demand[i-1] + sum(salida[i]))
+
+        m.Minimize(sum(install_c[a][d-1] * v for a in range(nA) for d, v in self.y[a].items())
+                   + sum(c * f for c, f in zip(trans_c, self.f_c))
+                   + PENALIZACION * sum(self.unmet_c.values()))
+
+    def _diseño(self, valor):
+        return [next((d for d, v in self.y[a].items() if valor(v)), 0) for a in range(self.nA)]
+
+    def agregar_pista(self, solucion):
+        """Pista ({'y', 'f_c'} como la de heuristica_greedy) para la próxima resolución"""
+        self.modelo.ClearHints()
+        for a in range(self.nA):
+            for d, v in self.y[a].items():
+                self.modelo.AddHint(v, solucion['y'][a] == d)
+            self.modelo.AddHint(self.f_c[a], min(int(solucion['f_c'][a]), self.flow_ub[a]))
+
+    def resolver(self, tiempo_limite=60, trabajadores=TRABAJADORES_POR_DEFECTO, semilla=0, al_encontrar=None,
+                 verbose=False):
+        """
+        Resuelve con trabajadores hilos de búsqueda en paralelo.
+        al_encontrar(solucion) se llama con cada solución mejorada:
+        'tiempo', 'costo_total_c', 'cota_inferior_c' e 'y'.
+        Devuelve el resultado del modelo más 'cota_inferior_c', 'historial'
+        y 'tiempo'; sin solución, solo 'estado' y 'tiempo'.
+        """
+        inicio = time.perf_counter()
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = float(tiempo_limite)
+        solver.parameters.num_workers = trabajadores
+        solver.parameters.random_seed = semilla
+        solver.parameters.log_search_progress = verbose
+        observador = _Observador(self, al_encontrar, inicio)
+        estado = ESTADOS.get(solver.Solve(self.modelo, observador), 'DESCONOCIDO')
+        if estado not in ('OPTIMO', 'LIMITE'):
+            return {'estado': estado, 'tiempo': round(time.perf_counter() - inicio, 2)}
+
+        unmet = [solver.Value(self.unmet_c[i]) if i in self.unmet_c else 0 for i in range(1, self.N + 1)]
+        resultado = resultado_modelo(self.arreglos, estado, self._diseño(solver.BooleanValue),
+                                     [solver.Value(f) for f in self.f_c], unmet)
+        resultado['cota_inferior_c'] = min(math.ceil(solver.BestObjectiveBound() - 1e-6),
+                                           resultado['costo_total_c'])
+        resultado['historial'] = observador.historial
+        resultado['tiempo'] = round(time.perf_counter() - inicio, 2)
+        return resultado
+
+
+def resolver_cpsat(ruta_dzn, tiempo_limite=60, trabajadores=TRABAJADORES_POR_DEFECTO, arranque=True, semilla=0,
+                   al_encontrar=None, verbose=False, registrar=True):
+    """
+    Resuelve una instancia con el backend nativo. arranque funciona como en
+    ejecutor.ejecutar_minizinc: True usa la última solución guardada de la
+    instancia como pista, False ninguna, o un diccionario {'y', 'f_c'}. La
+    solución encontrada se guarda como previa para las próximas ejecuciones
+    y, con registrar, la ejecución se agrega a resultados_db.
+    """
+    arreglos = leer_dzn(ruta_dzn)
+    modelo = ModeloCPSAT(arreglos)
+    cache = cache_por_defecto()
+    pista = arranque if isinstance(arranque, dict) else cache.obtener_previa(ruta_dzn) if arranque else None
+    con_pista = bool(pista) and len(pista['y']) == modelo.nA and len(pista['f_c']) == modelo.nA
+    if con_pista:
+        modelo.agregar_pista(pista)
+    resultado = modelo.resolver(tiempo_limite, trabajadores, semilla, al_encontrar, verbose)
+    if 'y' in resultado:
+        cache.guardar_previa(ruta_dzn, resultado, modelo.nA, modelo.nD)
+    if registrar:
+        filas = [{'tiempo': t, 'objetivo': c, 'evento': 'solucion'} for t, c in resultado.get('historial', [])]
+        anytime = metricas(filas, tiempo_limite)
+        registrar_ejecucion(ruta_dzn, {
+            'herramienta': 'cpsat', 'solver': 'cp-sat', 'modelo': 'backend_cpsat',
+            'configuracion': {'trabajadores': trabajadores, 'semilla': semilla, 'pista': con_pista},
+            'estado': _ESTADOS_REGISTRO.get(resultado['estado'], resultado['estado']),
+            'objetivo_c': resultado.get('costo_total_c'), 'cota_c': resultado.get('cota_inferior_c'),
+            'tiempo': resultado['tiempo'], 'timeout_segundos': tiempo_limite,
+            'tiempo_primera': anytime['tiempo_primera'], 'tiempo_mejor': anytime['tiempo_mejor'],
+            'integral_primal': anytime['integral_primal'] if filas else None
+        })
+    return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Resuelve instancias con CP-SAT directo, sin MiniZinc')
+    parser.add_argument('instancias', nargs='+')
+    parser.add_argument('--tiempo', type=int, default=60, help='Segundos por instancia')
+    parser.add_argument('--trabajadores', type=int, default=TRABAJADORES_POR_DEFECTO, help='Hilos de búsqueda')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--sin-arranque', action='store_true', help='no usar la solución previa como pista')
+    parser.add_argument('--carpeta', default=os.path.join('resultados', 'cpsat'))
+    parser.add_argument('--verbose', action='store_true', help='registro de búsqueda de CP-SAT')
+    args = parser.parse_args()
+
+    os.makedirs(args.carpeta, exist_ok=True)
+    for ruta in args.instancias:
+        r = resolver_cpsat(ruta, args.tiempo, args.trabajadores, not args.sin_arranque, args.semilla,
+                           lambda s: print(f"  {s['tiempo']:7.2f}s costo {pesos(s['costo_total_c'])} "
+                                           f"(cota {pesos(s['cota_inferior_c'])})"),
+                           args.verbose)
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        escribir_reporte(os.path.join(args.carpeta, f'{nombre}.txt'), leer_dzn(ruta), r,
+                         'RESULTADOS OPTIMIZACIÓN RED DE TUBERÍAS - CP-SAT NATIVO')
+        costo = pesos(r['costo_total_c']) if 'costo_total_c' in r else '-'
+        print(f"{ruta}: {r['estado']} | costo {costo} ({r['tiempo']}s)")
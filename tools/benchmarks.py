@@ -0,0 +1,488 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from arranque import solucion_desde_salida, tamaños_dzn
+from derivados import seccion_derivados
+from dzn import escribir_dzn, leer_dzn
+from ejecutor import FORMULACIONES, MODELO_POR_DEFECTO, ejecutar_minizinc
+from evaluador import EvaluadorDiseño
+from lns import buscar_lns
+from reporte import escribir_reporte, resultado_modelo
+from resultados_db import conectar, registrar_ejecucion, resumen, ultimas_por_instancia
+
+SOLVER_POR_DEFECTO = 'org.gecode.gecode'
+
+
+def _instancias(patrones):
+    rutas = []
+    for patron in patrones:
+        rutas.extend(sorted(glob.glob(patron)))
+    return rutas
+
+
+def tiempo_aplanado(modelo, ruta_dzn, solver=SOLVER_POR_DEFECTO, repeticiones=3):
+    """Mejor tiempo (s) de 'minizinc -c' sobre la instancia, o None si falla"""
+    mejor = None
+    with tempfile.TemporaryDirectory() as tmp:
+        comando = ['minizinc', '--solver', solver, '-c', modelo, ruta_dzn,
+                   '--fzn', os.path.join(tmp, 'modelo.fzn'),
+                   '--ozn', os.path.join(tmp, 'modelo.ozn')]
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = subprocess.run(comando, capture_output=True, text=True)
+            tiempo = time.perf_counter() - inicio
+            if resultado.returncode != 0:
+                print(f"  Error aplanando {ruta_dzn} con {modelo}: {resultado.stderr.strip()[:200]}")
+                return None
+            mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def comparar_aplanado(rutas_dzn, modelos=('models/main.mzn', 'models/main_csr.mzn'),
+                      solver=SOLVER_POR_DEFECTO, repeticiones=3):
+    """Compara el tiempo de aplanado de varias variantes del modelo"""
+    filas = []
+    print(f"{'Instancia':40s}" + "".join(f"{os.path.basename(m):>16s}" for m in modelos) + f"{'Aceleración':>14s}")
+    for ruta in rutas_dzn:
+        tiempos = [tiempo_aplanado(m, ruta, solver, repeticiones) for m in modelos]
+        filas.append((ruta, tiempos))
+        celdas = "".join(f"{t:16.3f}" if t is not None else f"{'error':>16s}" for t in tiempos)
+        aceleracion = (f"{tiempos[0] / tiempos[-1]:13.2f}x"
+                       if None not in tiempos and tiempos[-1] > 0 else f"{'-':>14s}")
+        print(f"{os.path.basename(ruta):40s}{celdas}{aceleracion}")
+    return filas
+
+
+def red_sintetica(nA, semilla=0):
+    """Red P->T->C1->C2 aleatoria con unos nA arcos, para medir la escritura"""
+    rng = np.random.default_rng(semilla)
+    nP, nT = max(1, nA // 200), max(1, nA // 40)
+    nC1, nC2 = max(1, nA // 8), max(1, nA // 4)
+    inicio = np.cumsum([0, nP, nT, nC1])
+    tamaños = [nP, nT, nC1, nC2]
+    arc_from, arc_to = [], []
+    for c, cantidad in enumerate([nA // 10, nA // 5, nA - nA // 10 - nA // 5]):
+        arc_from.append(inicio[c] + 1 + rng.integers(0, tamaños[c], cantidad))
+        arc_to.append(inicio[c+1] + 1 + rng.integers(0, tamaños[c+1], cantidad))
+    N = sum(tamaños)
+    supply = np.zeros(N)
+    supply[:nP] = rng.uniform(500, 3000, nP)
+    demand = np.zeros(N)
+    demand[nP + nT:] = rng.uniform(0, 20, N - nP - nT)
+    filas = np.array([[20, 24, 32], [50, 62, 78]])
+    return {
+        'nP': nP, 'nT': nT, 'nC1': nC1, 'nC2': nC2,
+        'arc_from': np.concatenate(arc_from), 'arc_to': np.concatenate(arc_to),
+        'trans_cost': rng.uniform(1, 10, nA),
+        'install_cost': filas[np.arange(nA) % 2],
+        'supply': supply, 'demand': demand,
+        'max_capacity': np.array([795, 1414, 3181])
+    }
+
+
+def _escribir_referencia(ruta, arreglos):
+    # Escritura línea a línea sobre listas de Python, como hacían los generadores
+    datos = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in arreglos.items()}
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for capa in ['nP', 'nT', 'nC1', 'nC2']:
+            f.write(f"{capa} = {datos[capa]};\n")
+        f.write(f"nA = {len(datos['arc_from'])};\n")
+        f.write(f"nD = {len(datos['max_capacity'])};\n\n")
+        f.write("arc_from = [" + ", ".join(map(str, datos['arc_from'])) + "];\n")
+        f.write("arc_to = [" + ", ".join(map(str, datos['arc_to'])) + "];\n\n")
+        f.write("supply = [" + ", ".join(f"{s:.2f}" for s in datos['supply']) + "];\n")
+        f.write("demand = [" + ", ".join(f"{d:.2f}" for d in datos['demand']) + "];\n\n")
+        f.write("max_capacity = [" + ", ".join(f"{c}" for c in datos['max_capacity']) + "];\n\n")
+        f.write("install_cost = array2d(1..nA, 1..nD, [\n")
+        filas = datos['install_cost']
+        for i, fila in enumerate(filas):
+            f.write("  " + ", ".join(f"{c}" for c in fila))
+            f.write(",\n" if i < len(filas) - 1 else "\n")
+        f.write("]);\n\n")
+        f.write("trans_cost = [" + ", ".join(f"{c:.2f}" for c in datos['trans_cost']) + "];\n")
+
+
+def _mejor_tiempo(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempo = time.perf_counter() - inicio
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def comparar_escritura(tamaños=(10000, 50000, 100000), repeticiones=3):
+    """
+    Compara la escritura línea a línea con escribir_dzn sobre los parámetros
+    base (y verifica que coincidan byte a byte). La sección de derivados
+    (cotas y adyacencia) es igual en ambos casos y se mide aparte.
+    """
+    print(f"{'Arcos':>10s}{'Referencia (s)':>18s}{'escribir_dzn (s)':>20s}"
+          f"{'Aceleración':>14s}{'Derivados (s)':>16s}")
+    filas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_ref = os.path.join(tmp, 'referencia.dzn')
+        ruta_nueva = os.path.join(tmp, 'nueva.dzn')
+        for nA in tamaños:
+            arreglos = red_sintetica(nA)
+            t_ref = _mejor_tiempo(lambda: _escribir_referencia(ruta_ref, arreglos), repeticiones)
+            t_nuevo = _mejor_tiempo(lambda: escribir_dzn(ruta_nueva, arreglos, derivados=False), repeticiones)
+            t_derivados = _mejor_tiempo(lambda: seccion_derivados(arreglos), repeticiones)
+            with open(ruta_ref, 'rb') as a, open(ruta_nueva, 'rb') as b:
+                if a.read() != b.read():
+                    print(f"  Aviso: las salidas difieren con {nA} arcos")
+            filas.append((nA, t_ref, t_nuevo, t_derivados))
+            print(f"{nA:10d}{t_ref:18.3f}{t_nuevo:20.3f}{t_ref / t_nuevo:13.2f}x{t_derivados:16.3f}")
+    return filas
+
+
+def comparar_exportacion(tamaños=(10000, 50000, 100000), repeticiones=3, aplanar=False, solver='highs'):
+    """
+    Tiempo de armado de la matriz y de escritura MPS/LP (tools/exportar_mip.py)
+    por tamaño de red; los µs por arco deben mantenerse constantes. Con
+    aplanar=True mide también 'minizinc -c' de main_mip.mzn sobre la misma red.
+    """
+    from exportar_mip import escribir_lp, escribir_mps, modelo_lineal  # requiere SciPy
+    print(f"{'Arcos':>10s}{'Armado (s)':>12s}{'MPS (s)':>10s}{'LP (s)':>10s}{'MPS (MB)':>10s}"
+          f"{'µs/arco':>10s}" + (f"{'Aplanado (s)':>14s}" if aplanar else ""))
+    filas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_mps, ruta_lp = os.path.join(tmp, 'red.mps'), os.path.join(tmp, 'red.lp')
+        for nA in tamaños:
+            arreglos = red_sintetica(nA)
+            t_armado = _mejor_tiempo(lambda: modelo_lineal(arreglos), repeticiones)
+            modelo = modelo_lineal(arreglos)
+            t_mps = _mejor_tiempo(lambda: escribir_mps(ruta_mps, modelo), repeticiones)
+            t_lp = _mejor_tiempo(lambda: escribir_lp(ruta_lp, modelo), repeticiones)
+            megas = os.path.getsize(ruta_mps) / 1e6
+            fila = [nA, t_armado, t_mps, t_lp, megas]
+            linea = (f"{nA:10d}{t_armado:12.3f}{t_mps:10.3f}{t_lp:10.3f}{megas:10.1f}"
+                     f"{1e6 * (t_armado + t_mps) / nA:10.1f}")
+            if aplanar:
+                ruta_dzn = os.path.join(tmp, 'red.dzn')
+                escribir_dzn(ruta_dzn, arreglos)
+                t_aplanado = tiempo_aplanado('models/main_mip.mzn', ruta_dzn, solver, 1)
+                fila.append(t_aplanado)
+                linea += f"{t_aplanado:14.3f}" if t_aplanado is not None else f"{'error':>14s}"
+            filas.append(tuple(fila))
+            print(linea)
+    return filas
+
+
+def comparar_salidas(tamaños=(10000, 50000, 100000), repeticiones=3):
+    """
+    Lectura de la solución con arranque.solucion_desde_salida: reporte de
+    texto del modelo (regex por arco) frente a la sección compacta de
+    models/red.mzn, sobre un diseño al azar de una red sintética.
+    """
+    print(f"{'Arcos':>10s}{'Texto (MB)':>12s}{'JSON (MB)':>11s}{'Texto (s)':>11s}{'JSON (s)':>10s}")
+    filas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_texto = os.path.join(tmp, 'texto.txt')
+        for nA in tamaños:
+            arreglos = red_sintetica(nA)
+            rng = np.random.default_rng(nA)
+            nD, N = len(arreglos['max_capacity']), len(arreglos['supply'])
+            y = rng.integers(0, nD + 1, nA).tolist()
+            f_c = [int(rng.integers(1, 1000)) if d else 0 for d in y]
+            resultado = resultado_modelo(arreglos, 'OPTIMO', y, f_c, [0] * N)
+            escribir_reporte(ruta_texto, arreglos, resultado, 'BENCHMARK')
+            with open(ruta_texto, 'r', encoding='utf-8') as f:
+                texto = f.read()
+            costos = [resultado['costo_instalacion_c'], resultado['costo_transporte_c'], resultado['penalizacion_c']]
+            arcos = [[a, d, f] for a, (d, f) in enumerate(zip(y, f_c), start=1) if d or f]
+            compacta = json.dumps({'costos': costos, 'arcos': arcos, 'insatisfecha': []}) + '\n----------\n==========\n'
+            if (solucion_desde_salida(texto, nA, nD)['y'] != y
+                    or solucion_desde_salida(compacta, nA, nD)['f_c'] != f_c):
+                raise RuntimeError(f'Las dos salidas no coinciden con {nA} arcos')
+            t_texto = _mejor_tiempo(lambda: solucion_desde_salida(texto, nA, nD), repeticiones)
+            t_json = _mejor_tiempo(lambda: solucion_desde_salida(compacta, nA, nD), repeticiones)
+            filas.append((nA, len(texto.encode()) / 1e6, len(compacta) / 1e6, t_texto, t_json))
+            print(f"{nA:10d}{filas[-1][1]:12.1f}{filas[-1][2]:11.1f}{t_texto:11.3f}{t_json:10.3f}")
+    return filas
+
+
+def comparar_bd(tamaños=(1000, 10000, 100000), repeticiones=3, instancias=500):
+    """
+    Consultas de resultados_db sobre una base temporal con ejecuciones
+    sintéticas repartidas entre 'instancias' instancias: última ejecución
+    por instancia (la de graficos_reportes.py) y resúmenes por solver y por
+    familia. También mide el costo de registrar una ejecución real.
+    """
+    solvers = ['org.gecode.gecode', 'org.chuffed.chuffed', 'cp-sat', 'highs', 'cbc']
+    estados = ['OPTIMO', 'SOLUCION', 'SIN_SOLUCION', 'TIMEOUT']
+    print(f"{'Ejecuciones':>12s}{'Últimas (ms)':>14s}{'Por solver (ms)':>17s}{'Por familia (ms)':>18s}")
+    filas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_bd = os.path.join(tmp, 'ejecuciones.sqlite')
+        con = conectar(ruta_bd)
+        rng = np.random.default_rng(0)
+        with con:
+            con.executemany("INSERT INTO instancias (hash, nombre, familia, tamaño, nA) VALUES (?, ?, ?, ?, ?)",
+                            [(f'sintetica:{i}', f'inst_{i % 7}_{i}', f'inst_{i % 7}', 'medianas', 100 + i)
+                             for i in range(instancias)])
+        total = 0
+        for n in tamaños:
+            with con:
+                con.executemany(
+                    "INSERT INTO ejecuciones (fecha, instancia, herramienta, solver, modelo, estado, objetivo_c, "
+                    "tiempo) VALUES (?, ?, 'minizinc', ?, 'models/main.mzn', ?, ?, ?)",
+                    [(f'2026-01-01T00:00:{k % 60:02d}', f'sintetica:{rng.integers(instancias)}',
+                      solvers[k % len(solvers)], estados[k % len(estados)], int(rng.integers(10**6, 10**8)),
+                      float(rng.random() * 60)) for k in range(total, n)])
+            total = n
+            t_ultimas = _mejor_tiempo(lambda: ultimas_por_instancia(con), repeticiones)
+            t_solver = _mejor_tiempo(lambda: resumen(con, 'solver'), repeticiones)
+            t_familia = _mejor_tiempo(lambda: resumen(con, 'familia'), repeticiones)
+            filas.append((n, t_ultimas, t_solver, t_familia))
+            print(f"{n:12d}{1000 * t_ultimas:14.1f}{1000 * t_solver:17.1f}{1000 * t_familia:18.1f}")
+        con.close()
+
+        ruta_dzn = sorted(glob.glob('instancias/*/*.dzn'))[0]
+        datos = {'herramienta': 'minizinc', 'solver': solvers[0], 'estado': 'OPTIMO', 'objetivo_c': 1}
+        registrar_ejecucion(ruta_dzn, datos, ruta_bd)
+        t_registro = _mejor_tiempo(lambda: registrar_ejecucion(ruta_dzn, datos, ruta_bd), repeticiones)
+        print(f"Registrar una ejecución: {1000 * t_registro:.1f} ms")
+    return filas
+
+
+def comparar_lns(rutas_dzn, segundos=60, solver=SOLVER_POR_DEFECTO, procesos=None, timeout_vecindario=5):
+    """Objetivo tras 'segundos': una ejecución simple de MiniZinc vs LNS con el mismo tiempo"""
+    filas = []
+    print(f"{'Instancia':40s}{'MiniZinc':>14s}{'LNS':>14s}{'Mejora':>10s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ruta in rutas_dzn:
+            ruta_sol = os.path.join(tmp, 'simple.txt')
+            ejecutar_minizinc(ruta, ruta_sol, segundos, solver=solver, cache=False, arranque=False)
+            with open(ruta_sol, 'r', encoding='utf-8') as f:
+                simple = solucion_desde_salida(f.read(), *tamaños_dzn(ruta))
+            simple = simple['costo_total_c'] if simple else None
+            lns = buscar_lns(ruta, segundos, timeout_vecindario, procesos=procesos, solver=solver)['costo_total_c']
+            filas.append((ruta, simple, lns))
+            celdas = "".join(f"{c / 100:14.2f}" if c is not None else f"{'-':>14s}" for c in (simple, lns))
+            mejora = (f"{100 * (simple - lns) / simple:9.1f}%"
+                      if simple and lns is not None else f"{'-':>10s}")
+            print(f"{os.path.basename(ruta):40s}{celdas}{mejora}")
+    return filas
+
+
+def comparar_evaluador(rutas_dzn, segundos=60, solver=SOLVER_POR_DEFECTO):
+    """
+    Coincidencia del evaluador con MiniZinc: se evalúa el diseño de la
+    solución de MiniZinc. Si MiniZinc probó el óptimo, los costos deben ser
+    idénticos; si no, el evaluador puede ser menor (mejores flujos para el
+    mismo diseño). Usa la caché de soluciones, así que repetirlo es barato.
+    """
+    filas = []
+    print(f"{'Instancia':40s}{'MiniZinc':>14s}{'Evaluador':>14s}{'Resultado':>12s}{'Eval/s':>10s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ruta in rutas_dzn:
+            ruta_sol = os.path.join(tmp, 'resultado.txt')
+            ejecutar_minizinc(ruta, ruta_sol, segundos, solver=solver, arranque=False)
+            with open(ruta_sol, 'r', encoding='utf-8') as f:
+                salida = f.read()
+            solucion = solucion_desde_salida(salida, *tamaños_dzn(ruta))
+            if solucion is None or solucion['costo_total_c'] is None:
+                print(f"{os.path.basename(ruta):40s}{'-':>14s}{'-':>14s}{'sin solución':>14s}")
+                continue
+            evaluador = EvaluadorDiseño(leer_dzn(ruta))
+            repeticiones = 0
+            inicio = time.perf_counter()
+            while repeticiones < 10 or time.perf_counter() - inicio < 0.5:
+                r = evaluador.evaluar(solucion['y'])
+                repeticiones += 1
+            por_segundo = repeticiones / (time.perf_counter() - inicio)
+            minizinc, evaluado = solucion['costo_total_c'], r.get('costo_total_c')
+            optimo = '==========' in salida
+            if evaluado == minizinc:
+                resultado = 'igual'
+            elif not optimo and evaluado is not None and evaluado < minizinc:
+                resultado = 'mejor'
+            else:
+                resultado = 'DIFIERE'
+            filas.append((ruta, minizinc, evaluado, resultado, por_segundo))
+            celda = f"{evaluado / 100:14.2f}" if evaluado is not None else f"{'-':>14s}"
+            print(f"{os.path.basename(ruta):40s}{minizinc / 100:14.2f}{celda}{resultado:>12s}{por_segundo:10.0f}")
+    return filas
+
+
+def comparar_benders(rutas_dzn, segundos=60, solver=SOLVER_POR_DEFECTO, modelo=MODELO_POR_DEFECTO):
+    """
+    Tiempo y objetivo: el modelo completo en MiniZinc vs la descomposición
+    de Benders. Con modelo='mip' y solver='highs' el monolítico usa el mismo
+    motor que Benders.
+    """
+    from benders import resolver_benders  # requiere SciPy
+
+    filas = []
+    print(f"{'Instancia':40s}{'MiniZinc':>14s}{'t (s)':>8s}{'Benders':>14s}{'t (s)':>8s}{'Estado':>10s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ruta in rutas_dzn:
+            ruta_sol = os.path.join(tmp, 'monolitico.txt')
+            analisis = ejecutar_minizinc(ruta, ruta_sol, segundos, modelo, solver, cache=False, arranque=False)
+            with open(ruta_sol, 'r', encoding='utf-8') as f:
+                monolitico = solucion_desde_salida(f.read(), *tamaños_dzn(ruta))
+            monolitico = monolitico['costo_total_c'] if monolitico else None
+            r = resolver_benders(leer_dzn(ruta), segundos, verbose=False)
+            filas.append((ruta, monolitico, analisis.get('tiempo_ejecutado'), r['costo_total_c'], r['tiempo']))
+            celdas = "".join(f"{c / 100:14.2f}{t:8.1f}" if c is not None else f"{'-':>14s}{t or 0:8.1f}"
+                             for c, t in ((monolitico, analisis.get('tiempo_ejecutado')),
+                                          (r['costo_total_c'], r['tiempo'])))
+            print(f"{os.path.basename(ruta):40s}{celdas}{r['estado']:>10s}")
+    return filas
+
+
+def comparar_cpsat(rutas_dzn, segundos=60, solver='cp-sat'):
+    """
+    Objetivo y tiempo total: MiniZinc con CP-SAT (proceso, aplanado y
+    salida de texto) vs el backend nativo de tools/backend_cpsat.py; '*'
+    marca los óptimos probados. Si ambos prueban el óptimo, deben coincidir.
+    """
+    from backend_cpsat import resolver_cpsat  # requiere OR-Tools
+
+    filas = []
+    print(f"{'Instancia':40s}{'MiniZinc':>15s}{'t (s)':>8s}{'Nativo':>15s}{'t (s)':>8s}{'Resultado':>12s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ruta in rutas_dzn:
+            ruta_sol = os.path.join(tmp, 'minizinc.txt')
+            analisis = ejecutar_minizinc(ruta, ruta_sol, segundos, solver=solver, cache=False, arranque=False)
+            with open(ruta_sol, 'r', encoding='utf-8') as f:
+                salida = f.read()
+            solucion = solucion_desde_salida(salida, *tamaños_dzn(ruta))
+            minizinc = solucion['costo_total_c'] if solucion else None
+            optimo_mzn = '==========' in salida
+            r = resolver_cpsat(ruta, segundos, arranque=False)
+            nativo, optimo_nativo = r.get('costo_total_c'), r['estado'] == 'OPTIMO'
+            if minizinc == nativo:
+                resultado = 'igual'
+            elif optimo_mzn and optimo_nativo:
+                resultado = 'DIFIERE'
+            else:
+                resultado = 'distinto'
+            filas.append((ruta, minizinc, analisis.get('tiempo_ejecutado'), nativo, r['tiempo'], resultado))
+            celdas = "".join(f"{c / 100:14.2f}{'*' if o else ' '}{t or 0:8.1f}" if c is not None
+                             else f"{'-':>15s}{t or 0:8.1f}"
+                             for c, o, t in ((minizinc, optimo_mzn, analisis.get('tiempo_ejecutado')),
+                                             (nativo, optimo_nativo, r['tiempo'])))
+            print(f"{os.path.basename(ruta):40s}{celdas}{resultado:>12s}")
+    return filas
+
+
+def comparar_formulaciones(rutas_dzn, formulaciones=('cp', 'mip'), segundos=60, solver='highs'):
+    """
+    Objetivo y tiempo de cada formulación con el mismo solver y límite; '*'
+    marca las ejecuciones que probaron el óptimo. Pensado para backends MIP,
+    donde las restricciones reificadas de la formulación CP se vuelven big-M.
+    """
+    filas = []
+    print(f"{'Instancia':40s}" + "".join(f"{f:>14s}{'t (s)':>8s}" for f in formulaciones))
+    with tempfile.TemporaryDirectory() as tmp:
+        for ruta in rutas_dzn:
+            celdas, resultados = "", []
+            for formulacion in formulaciones:
+                ruta_sol = os.path.join(tmp, f'{formulacion}.txt')
+                analisis = ejecutar_minizinc(ruta, ruta_sol, segundos, FORMULACIONES[formulacion], solver,
+                                             cache=False, arranque=False)
+                with open(ruta_sol, 'r', encoding='utf-8') as f:
+                    salida = f.read()
+                solucion = solucion_desde_salida(salida, *tamaños_dzn(ruta))
+                costo = solucion['costo_total_c'] if solucion else None
+                optimo = '==========' in salida
+                tiempo = analisis.get('tiempo_ejecutado') or 0
+                resultados.append((costo, tiempo, optimo))
+                celdas += (f"{costo / 100:13.2f}{'*' if optimo else ' '}{tiempo:8.1f}" if costo is not None
+                           else f"{'-':>14s}{tiempo:8.1f}")
+            filas.append((ruta, resultados))
+            print(f"{os.path.basename(ruta):40s}{celdas}")
+    return filas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks del proyecto')
+    sub = parser.add_subparsers(dest='benchmark', required=True)
+
+    p = sub.add_parser('aplanado', help='Tiempo de aplanado: main.mzn vs main_csr.mzn')
+    p.add_argument('instancias', nargs='*', default=['instancias/*/*.dzn'])
+    p.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+    p.add_argument('--repeticiones', type=int, default=3)
+
+    p = sub.add_parser('dzn', help='Escritura de .dzn: línea a línea vs escribir_dzn')
+    p.add_argument('--arcos', type=int, nargs='+', default=[10000, 50000, 100000])
+    p.add_argument('--repeticiones', type=int, default=3)
+
+    p = sub.add_parser('exportar', help='Armado y escritura MPS/LP directa vs aplanado de MiniZinc')
+    p.add_argument('--arcos', type=int, nargs='+', default=[10000, 50000, 100000])
+    p.add_argument('--repeticiones', type=int, default=3)
+    p.add_argument('--aplanar', action='store_true', help='medir también minizinc -c de main_mip.mzn')
+    p.add_argument('--solver', default='highs')
+
+    p = sub.add_parser('salida', help='Lectura de la solución: reporte de texto vs salida JSON')
+    p.add_argument('--arcos', type=int, nargs='+', default=[10000, 50000, 100000])
+    p.add_argument('--repeticiones', type=int, default=3)
+
+    p = sub.add_parser('bd', help='Consultas de resultados_db sobre miles de ejecuciones')
+    p.add_argument('--ejecuciones', type=int, nargs='+', default=[1000, 10000, 100000])
+    p.add_argument('--repeticiones', type=int, default=3)
+
+    p = sub.add_parser('lns', help='Objetivo tras N segundos: MiniZinc simple vs LNS')
+    p.add_argument('instancias', nargs='*',
+                   default=['instancias/grandes/*.dzn', 'instancias/problematicas/complejidad_extrema_*.dzn'])
+    p.add_argument('--segundos', type=int, default=60)
+    p.add_argument('--timeout-vecindario', type=int, default=5)
+    p.add_argument('--procesos', type=int, default=None)
+    p.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+
+    p = sub.add_parser('evaluador', help='Coincidencia del evaluador de diseños con MiniZinc')
+    p.add_argument('instancias', nargs='*', default=['instancias/*/*.dzn'])
+    p.add_argument('--segundos', type=int, default=60)
+    p.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+
+    p = sub.add_parser('benders', help='Tiempo y objetivo: MiniZinc completo vs Benders')
+    p.add_argument('instancias', nargs='*', default=['instancias/grandes/*.dzn'])
+    p.add_argument('--segundos', type=int, default=60)
+    p.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+    p.add_argument('--modelo', default=MODELO_POR_DEFECTO,
+                   help=f"ruta del .mzn o formulación ({', '.join(FORMULACIONES)})")
+
+    p = sub.add_parser('cpsat', help='Objetivo y tiempo: MiniZinc con CP-SAT vs backend nativo')
+    p.add_argument('instancias', nargs='*', default=['instancias/*/*.dzn'])
+    p.add_argument('--segundos', type=int, default=60)
+    p.add_argument('--solver', default='cp-sat')
+
+    p = sub.add_parser('formulaciones', help='Objetivo y tiempo: formulación CP vs lineal (MIP)')
+    p.add_argument('instancias', nargs='*', default=['instancias/medianas/*.dzn', 'instancias/grandes/*.dzn'])
+    p.add_argument('--formulaciones', nargs='+', choices=sorted(FORMULACIONES), default=['cp', 'mip'])
+    p.add_argument('--segundos', type=int, default=60)
+    p.add_argument('--solver', default='highs')
+
+    args = parser.parse_args()
+    if args.benchmark == 'aplanado':
+        comparar_aplanado(_instancias(args.instancias), solver=args.solver,
+                          repeticiones=args.repeticiones)
+    elif args.benchmark == 'dzn':
+        comparar_escritura(args.arcos, args.repeticiones)
+    elif args.benchmark == 'exportar':
+        comparar_exportacion(args.arcos, args.repeticiones, args.aplanar, args.solver)
+    elif args.benchmark == 'salida':
+        comparar_salidas(args.arcos, args.repeticiones)
+    elif args.benchmark == 'bd':
+        comparar_bd(args.ejecuciones, args.repeticiones)
+    elif args.benchmark == 'lns':
+        comparar_lns(_instancias(args.instancias), args.segundos, args.solver, args.procesos,
+                     args.timeout_vecindario)
+    elif args.benchmark == 'evaluador':
+        comparar_evaluador(_instancias(args.instancias), args.segundos, args.solver)
+    elif args.benchmark == 'benders':
+        comparar_benders(_instancias(args.instancias), args.segundos, args.solver, args.modelo)
+    elif args.benchmark == 'cpsat':
+        comparar_cpsat(_instancias(args.instancias), args.segundos, args.solver)
+    elif args.benchmark == 'formulaciones':
+        comparar_formulaciones(_instancias(args.instancias), args.formulaciones, args.segundos, args.solver)
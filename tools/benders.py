@@ -0,0 +1,252 @@
+import argparse
+import time
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+from scipy.sparse import coo_matrix, hstack
+
+from cotas import SCALE, datos_escalados
+from dzn import leer_dzn
+from factibilidad import MAX_INSATISFECHA_C, PENALIZACION
+from heuristica import heuristica_greedy
+
+
+class _Subproblema:
+    """
+    Flujo a costo mínimo con el diseño fijo: variables f (nA) y unmet de
+    los consumidores, con las mismas restricciones de models/red.mzn. Solo
+    cambia el lado derecho de las filas de capacidad (f_a <= capacidad de
+    y_a), así que las matrices se arman una vez. Los datos son enteros y la
+    matriz es de red, por lo que el óptimo de HiGHS (un vértice) es entero.
+    """
+
+    def __init__(self, datos):
+        nA, N = datos['nA'], datos['N']
+        nP, nT = datos['nP'], datos['nT']
+        self.nA = nA
+        consumidores = list(range(nP + nT + 1, N + 1))
+        self.nU = len(consumidores)
+        col_u = {i: nA + k for k, i in enumerate(consumidores)}
+
+        # Filas <=: capacidad de cada arco y salida de cada planta
+        filas, cols, vals = list(range(nA)), list(range(nA)), [1.0] * nA
+        for a, u in enumerate(datos['arc_from']):
+            if u <= nP:
+                filas.append(nA + u - 1)
+                cols.append(a)
+                vals.append(1.0)
+        self.A_ub = coo_matrix((vals, (filas, cols)), shape=(nA + nP, nA + self.nU)).tocsr()
+        self.oferta = np.array(datos['supply'][:nP], dtype=float)
+
+        # Filas =: entrada - salida (+ unmet) en tanques y consumidores
+        filas, cols, vals = [], [], []
+        for a, (u, v) in enumerate(zip(datos['arc_from'], datos['arc_to'])):
+            if v > nP:
+                filas.append(v - nP - 1)
+                cols.append(a)
+                vals.append(1.0)
+            if u > nP:
+                filas.append(u - nP - 1)
+                cols.append(a)
+                vals.append(-1.0)
+        for i in consumidores:
+            filas.append(i - nP - 1)
+            cols.append(col_u[i])
+            vals.append(1.0)
+        self.A_eq = coo_matrix((vals, (filas, cols)), shape=(N - nP, nA + self.nU)).tocsr()
+        self.b_eq = np.array([0.0] * nT + [datos['demand'][i-1] for i in consumidores])
+
+        self.costo = np.array(datos['trans_c'] + [PENALIZACION] * self.nU, dtype=float)
+        self.limites = [(0, ub) for ub in datos['flow_ub']] + [(0, MAX_INSATISFECHA_C)] * self.nU
+
+    def resolver(self, capacidad):
+        """
+        Devuelve (valor, subgradiente respecto de la capacidad, f) si el
+        diseño es factible; si no, (None, subgradiente de la infactibilidad
+        de fase 1, infactibilidad) para el corte de factibilidad.
+        """
+        b_ub = np.concatenate((capacidad, self.oferta))
+        r = linprog(self.costo, A_ub=self.A_ub, b_ub=b_ub, A_eq=self.A_eq, b_eq=self.b_eq,
+                    bounds=self.limites, method='highs')
+        if r.status == 0:
+            return r.fun, r.ineqlin.marginals[:self.nA], np.rint(r.x).astype(int)
+
+        # Fase 1: holgura v >= 0 en cada fila de consumidor; se minimiza su suma
+        nT = self.A_eq.shape[0] - self.nU
+        holgura = coo_matrix((np.ones(self.nU), (np.arange(nT, nT + self.nU), np.arange(self.nU))),
+                             shape=(self.A_eq.shape[0], self.nU))
+        costo = np.concatenate((np.zeros(len(self.costo)), np.ones(self.nU)))
+        r = linprog(costo,
+                    A_ub=hstack([self.A_ub, coo_matrix((self.A_ub.shape[0], self.nU))]).tocsr(), b_ub=b_ub,
+                    A_eq=hstack([self.A_eq, holgura]).tocsr(), b_eq=self.b_eq,
+                    bounds=self.limites + [(0, None)] * self.nU, method='highs')
+        return None, r.ineqlin.marginals[:self.nA], r.fun
+
+
+def resolver_benders(arreglos, tiempo_limite=60, tolerancia=1, verbose=True):
+    """
+    Descomposición de Benders: el maestro (MILP de HiGHS vía scipy) elige
+    los diámetros y acota con theta el costo de flujo; el subproblema es el
+    LP de flujo a costo mínimo con el diseño fijo, que entrega un corte de
+    optimalidad (theta >= valor + subgradiente·(capacidad - capacidad
+    actual)) o, si el diseño deja algún nodo con más demanda insatisfecha
+    de la permitida, un corte de factibilidad de fase 1.
+
+    Arranca con los cortes del diseño de la heurística greedy y del diseño
+    con el mayor diámetro permitido en cada arco, itera primero sobre la
+    relajación lineal del maestro y en cada iteración agrega también el
+    corte de un punto interior que se va moviendo. Termina cuando la brecha
+    entre la mejor solución y la cota del maestro es menor que 'tolerancia'
+    (en unidades escaladas; el objetivo es entero, así que 1 es óptimo) o
+    al agotar tiempo_limite. Devuelve un diccionario con 'y' (1..nD, 0 =
+    sin tubería), 'f_c', 'unmet_c', los costos escalados, 'cota_inferior_c',
+    'estado' (OPTIMO, LIMITE o INFACTIBLE), 'iteraciones' y 'tiempo'.
+    """
+    inicio = time.perf_counter()
+    datos = datos_escalados(arreglos)
+    nA, nD = datos['nA'], datos['nD']
+    sub = _Subproblema(datos)
+
+    # Maestro: y[a,d] en la columna a*nD + d - 1, theta en la última. La
+    # capacidad útil de un diámetro es a lo sumo flow_ub del arco; acotarla
+    # así achica los coeficientes de los cortes y los hace mucho más fuertes.
+    capacidad_col = np.array([min(datos['capacidad_c'][d], datos['flow_ub'][a])
+                              for a in range(nA) for d in range(nD)], dtype=float)
+    costo = np.array([c for fila in datos['install_c'] for c in fila] + [1.0])
+    alto = np.array([1.0 if d + 1 in datos['allowed_diam'][a] else 0.0
+                     for a in range(nA) for d in range(nD)] + [np.inf])
+    integralidad = np.concatenate((np.ones(nA * nD), [0]))
+    un_diametro = LinearConstraint(
+        coo_matrix((np.ones(nA * nD), (np.repeat(np.arange(nA), nD), np.arange(nA * nD))),
+                   shape=(nA, nA * nD + 1)), -np.inf, 1)
+    cortes, lados = [], []
+    cota_inferior = 0
+    mejor = {'costo_total_c': None}
+
+    def a_columnas(y):
+        x = np.zeros(nA * nD)
+        for a, d in enumerate(y):
+            if d:
+                x[a * nD + d - 1] = 1.0
+        return x
+
+    def cortar(x):
+        """Resuelve el subproblema con el diseño x (puede ser fraccional) y agrega su corte"""
+        capacidad = (x * capacidad_col).reshape(nA, nD).sum(axis=1)
+        valor, subgradiente, resultado = sub.resolver(capacidad)
+        # valor + sum_a mu_a (cap_a(x') - cap_a(x)) <= theta  (o <= 0 si es de factibilidad)
+        fila = np.append(-np.repeat(subgradiente, nD) * capacidad_col, 0.0 if valor is None else 1.0)
+        cortes.append(fila)
+        lados.append((resultado if valor is None else valor) - float(subgradiente @ capacidad))
+        return valor, resultado
+
+    def evaluar(y):
+        valor, resultado = cortar(a_columnas(y))
+        if valor is None:
+            return
+        f_c = resultado[:nA].tolist()
+        # Los arcos sin flujo no necesitan tubería
+        y = [d if f_c[a] > 0 else 0 for a, d in enumerate(y)]
+        instalacion = sum(datos['install_c'][a][y[a]-1] for a in range(nA) if y[a])
+        total = instalacion + int(round(valor))
+        if mejor['costo_total_c'] is None or total < mejor['costo_total_c']:
+            mejor.update(y=y, f_c=f_c, unmet_x=resultado[nA:].tolist(),
+                         costo_instalacion_c=instalacion, costo_total_c=total)
+
+    def maestro(entero, restante, brecha=0):
+        restricciones = [un_diametro, LinearConstraint(np.array(cortes), np.array(lados), np.inf)]
+        return milp(costo, constraints=restricciones,
+                    integrality=integralidad if entero else np.zeros(nA * nD + 1),
+                    bounds=Bounds(np.zeros(nA * nD + 1), alto),
+                    options={'time_limit': max(restante, 1e-3), 'mip_rel_gap': brecha})
+
+    greedy = heuristica_greedy(arreglos)
+    evaluar(greedy['y'])
+    y_maximo = [max(datos['allowed_diam'][a], key=lambda d: datos['capacidad_c'][d-1], default=0)
+                for a in range(nA)]
+    evaluar(y_maximo)
+    # Punto interior para los cortes de Papadakos (Pareto-óptimos): las redes de
+    # flujo son muy degeneradas y el corte en el diseño actual suele ser débil
+    nucleo = 0.5 * a_columnas(y_maximo)
+
+    # Fase 1: relajación lineal del maestro, iteraciones baratas que dejan
+    # cortes útiles antes del MILP
+    cota_lp = -np.inf
+    for _ in range(10 * nA):
+        r = maestro(False, tiempo_limite - (time.perf_counter() - inicio))
+        if r.x is None or time.perf_counter() - inicio >= tiempo_limite:
+            break
+        x = np.clip(r.x[:-1], 0, 1)
+        valor, _ = cortar(x)
+        nucleo = 0.5 * (nucleo + x)
+        cortar(nucleo)
+        if valor is not None and valor + costo[:-1] @ x - r.fun < max(tolerancia, 1e-6 * abs(r.fun)):
+            cota_lp = r.fun
+            break
+    if np.isfinite(cota_lp):
+        cota_inferior = max(cota_inferior, int(np.ceil(cota_lp - 1e-6)))
+
+    iteraciones = 0
+    estado = 'LIMITE'
+    while True:
+        restante = tiempo_limite - (time.perf_counter() - inicio)
+        if restante <= 0:
+            break
+        # Mientras la brecha global es grande no hace falta resolver el maestro
+        # a optimalidad: basta un diseño bueno para el próximo corte, y la cota
+        # sigue siendo válida porque se toma la cota dual del MILP
+        brecha = 0
+        if mejor['costo_total_c']:
+            brecha = 0.25 * (mejor['costo_total_c'] - cota_inferior) / mejor['costo_total_c']
+        r = maestro(True, restante, brecha)
+        if r.x is None:
+            if r.status == 2:
+                estado = 'INFACTIBLE'
+            break
+        iteraciones += 1
+        cota_inferior = max(cota_inferior, int(np.ceil(r.mip_dual_bound - 1e-6)))
+        y = [next((d + 1 for d in range(nD) if r.x[a * nD + d] > 0.5), 0) for a in range(nA)]
+        evaluar(y)
+        nucleo = 0.5 * (nucleo + a_columnas(y))
+        cortar(nucleo)
+        if verbose:
+            superior = mejor['costo_total_c']
+            print(f"  Iteración {iteraciones}: cota {cota_inferior / SCALE:.2f}, "
+                  f"mejor {superior / SCALE if superior is not None else float('nan'):.2f}")
+        if mejor['costo_total_c'] is not None and mejor['costo_total_c'] - cota_inferior < tolerancia:
+            estado = 'OPTIMO'
+            break
+
+    if mejor['costo_total_c'] is None:
+        return {'estado': estado, 'costo_total_c': None, 'cota_inferior_c': cota_inferior,
+                'iteraciones': iteraciones, 'tiempo': round(time.perf_counter() - inicio, 2)}
+    consumidores = datos['N'] - datos['nP'] - datos['nT']
+    unmet = [0] * (datos['N'] - consumidores) + mejor['unmet_x']
+    penalizacion = sum(unmet) * PENALIZACION
+    return {
+        'estado': estado,
+        'y': mejor['y'],
+        'f_c': mejor['f_c'],
+        'unmet_c': unmet,
+        'costo_instalacion_c': mejor['costo_instalacion_c'],
+        'costo_transporte_c': mejor['costo_total_c'] - mejor['costo_instalacion_c'] - penalizacion,
+        'penalizacion_c': penalizacion,
+        'costo_total_c': mejor['costo_total_c'],
+        # La cota de HiGHS puede pasarse del óptimo por error numérico (~1e-9 relativo)
+        'cota_inferior_c': min(cota_inferior, mejor['costo_total_c']),
+        'iteraciones': iteraciones,
+        'tiempo': round(time.perf_counter() - inicio, 2)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Descomposición de Benders diseño/flujo')
+    parser.add_argument('instancias', nargs='+')
+    parser.add_argument('--tiempo', type=int, default=60)
+    args = parser.parse_args()
+
+    for ruta in args.instancias:
+        r = resolver_benders(leer_dzn(ruta), args.tiempo)
+        costo = f"{r['costo_total_c'] / SCALE:.2f}" if r['costo_total_c'] is not None else '-'
+        print(f"{ruta}: {r['estado']} | costo {costo}, cota {r['cota_inferior_c'] / SCALE:.2f} "
+              f"({r['iteraciones']} iteraciones, {r['tiempo']}s)")
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+CARPETA_CACHE = 'cache/soluciones'
+
+_RE_INCLUDE = re.compile(r'^\s*include\s+"([^"]+)"\s*;', re.MULTILINE)
+
+
+def _leer_modelo(ruta_modelo):
+    """(rutas, hash) del modelo y de los archivos locales que incluye"""
+    h = hashlib.sha256()
+    pendientes = [os.path.abspath(ruta_modelo)]
+    vistos = set()
+    while pendientes:
+        ruta = pendientes.pop(0)
+        if ruta in vistos or not os.path.exists(ruta):
+            continue
+        vistos.add(ruta)
+        with open(ruta, 'rb') as f:
+            contenido = f.read()
+        h.update(contenido)
+        # Los includes de la librería estándar (globals.mzn, ...) no existen localmente y se ignoran
+        for incluido in _RE_INCLUDE.findall(contenido.decode('utf-8', errors='replace')):
+            pendientes.append(os.path.join(os.path.dirname(ruta), incluido))
+    return sorted(vistos), h.hexdigest()
+
+
+def huella_modelo(ruta_modelo):
+    """Hash del modelo y de los archivos locales que incluye"""
+    return _leer_modelo(ruta_modelo)[1]
+
+
+def _mtimes(rutas):
+    return tuple(os.stat(r).st_mtime_ns if os.path.exists(r) else None for r in rutas)
+
+
+def huella_archivo(ruta):
+    with open(ruta, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class CacheSoluciones:
+    """
+    Caché de resultados de MiniZinc direccionada por contenido.
+    La clave combina el hash del modelo, los bytes del .dzn, el solver y el
+    límite de tiempo, así que cambiar el modelo invalida las entradas solas.
+    Cada entrada es un JSON en disco; al superar max_entradas se eliminan las
+    menos usadas recientemente (el mtime se actualiza en cada acierto).
+    """
+
+    def __init__(self, carpeta=CARPETA_CACHE, max_entradas=2000):
+        self.carpeta = carpeta
+        self.max_entradas = max_entradas
+        self._candado = threading.Lock()
+        self._huellas_modelo = {}
+        os.makedirs(carpeta, exist_ok=True)
+
+    def huella_modelo_vigente(self, ruta_modelo):
+        # Memoizada por los mtime del modelo y de sus includes para no releerlos
+        # en cada consulta del lote; si cambia alguno se vuelven a resolver
+        ruta = os.path.abspath(ruta_modelo)
+        memo = self._huellas_modelo.get(ruta)
+        if memo is None or _mtimes(memo[0]) != memo[1]:
+            rutas, huella = _leer_modelo(ruta)
+            memo = self._huellas_modelo[ruta] = (rutas, _mtimes(rutas), huella)
+        return memo[2]
+
+    def clave(self, ruta_modelo, ruta_dzn, solver, timeout_segundos, opciones=None):
+        """'opciones' distingue ejecuciones con parámetros extra (p. ej. una cota del objetivo)"""
+        h = hashlib.sha256()
+        h.update(self.huella_modelo_vigente(ruta_modelo).encode())
+        h.update(huella_archivo(ruta_dzn).encode())
+        h.update(f"{solver}|{timeout_segundos}".encode())
+        if opciones:
+            h.update(f"|{opciones}".encode())
+        return h.hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.carpeta, f"{clave}.json")
+
+    def obtener(self, clave):
+        """Devuelve la entrada guardada o None si no existe"""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                entrada = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return entrada
+
+    def guardar(self, clave, entrada):
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(entrada, f, ensure_ascii=False)
+        os.replace(temporal, ruta)
+        self._podar()
+
+    def _podar(self):
+        """Elimina las entradas menos usadas recientemente si se supera el límite"""
+        with self._candado:
+            entradas = [e for e in os.scandir(self.carpeta) if e.name.endswith('.json')]
+            sobrantes = len(entradas) - self.max_entradas
+            if sobrantes <= 0:
+                return
+            entradas.sort(key=lambda e: e.stat().st_mtime)
+            for e in entradas[:sobrantes]:
+                try:
+                    os.remove(e.path)
+                except FileNotFoundError:
+                    pass
+
+    def _ruta_previa(self, ruta_dzn):
+        nombre = hashlib.sha256(os.path.abspath(ruta_dzn).encode()).hexdigest()
+        return os.path.join(self.carpeta, 'previas', f"{nombre}.json")
+
+    def guardar_previa(self, ruta_dzn, solucion, nA, nD):
+        """
+        Guarda la última solución conocida de la instancia (y, f_c y su
+        costo, si se conoce) para usarla como arranque y para las brechas de
+        los reportes. Va por ruta y no por contenido: si el .dzn se
+        regenera, la solución anterior sigue sirviendo de pista. Guarda
+        además la huella del .dzn, para que el costo solo se use si la
+        instancia no cambió (ver previa_vigente).
+        """
+        ruta = self._ruta_previa(ruta_dzn)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'dzn': os.path.abspath(ruta_dzn), 'huella': huella_archivo(ruta_dzn), 'nA': nA, 'nD': nD,
+                       'y': list(solucion['y']), 'f_c': list(solucion['f_c']),
+                       'costo_total_c': solucion.get('costo_total_c')}, f)
+        os.replace(temporal, ruta)
+
+    def obtener_previa(self, ruta_dzn):
+        """Solución previa guardada para la instancia o None"""
+        try:
+            with open(self._ruta_previa(ruta_dzn), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def previa_vigente(self, ruta_dzn):
+        """
+        Solución previa solo si se calculó sobre el contenido actual del
+        .dzn (las guardadas sin huella no cuentan); si no, None. Es la que
+        sirve para comparar su costo con datos derivados del archivo, como
+        la cota inferior.
+        """
+        previa = self.obtener_previa(ruta_dzn)
+        if previa is None or previa.get('huella') != huella_archivo(ruta_dzn):
+            return None
+        return previa
+
+    def purgar_modelo(self, ruta_modelo):
+        """Elimina las entradas calculadas con una versión anterior del modelo"""
+        vigente = self.huella_modelo_vigente(ruta_modelo)
+        ruta_abs = os.path.abspath(ruta_modelo)
+        eliminadas = 0
+        for e in os.scandir(self.carpeta):
+            if not e.name.endswith('.json'):
+                continue
+            try:
+                with open(e.path, 'r', encoding='utf-8') as f:
+                    entrada = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if entrada.get('modelo') == ruta_abs and entrada.get('huella_modelo') != vigente:
+                os.remove(e.path)
+                eliminadas += 1
+        return eliminadas
+
+
+_cache_por_defecto = None
+
+
+def cache_por_defecto():
+    global _cache_por_defecto
+    if _cache_por_defecto is None:
+        _cache_por_defecto = CacheSoluciones()
+    return _cache_por_defecto
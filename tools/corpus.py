@@ -0,0 +1,148 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from generador import GeneradorInstanciasGrupo5
+from generador_infactible import GeneradorProblematico
+from generador_penaliza import GeneradorPenaliza
+
+SEMILLA_POR_DEFECTO = 42
+
+# familia -> (clase del generador, tamaños disponibles, función que genera la instancia)
+FAMILIAS = {
+    'grupo5': (GeneradorInstanciasGrupo5,
+               ('pequeñas', 'medianas', 'grandes', 'enormes', 'gigantes'),
+               lambda gen, tamaño, i: gen.generar_instancia(tamaño, i)),
+    'penaliza': (GeneradorPenaliza,
+                 ('pequeña',),
+                 lambda gen, tamaño, i: gen.generar_instancia_penaliza(i)),
+    'problematicas': (GeneradorProblematico,
+                      ('infactible_demanda', 'cuello_botella', 'costos_prohibitivos',
+                       'topologia_imposible', 'complejidad_extrema', 'restricciones_conflictivas'),
+                      lambda gen, tamaño, i: getattr(gen, f'generar_instancia_{tamaño}')(i))
+}
+
+# Composición por defecto: 100 instancias por cada (familia, tamaño) -> 1000 en total
+COMPOSICION_POR_DEFECTO = {
+    'grupo5': {'pequeñas': 100, 'medianas': 100, 'grandes': 100},
+    'penaliza': {'pequeña': 100},
+    'problematicas': {tipo: 100 for tipo in FAMILIAS['problematicas'][1]}
+}
+
+
+def _id(nombre):
+    # crc32 en vez de hash(): no cambia entre ejecuciones de Python
+    return zlib.crc32(nombre.encode('utf-8'))
+
+
+def semilla_instancia(raiz, familia, tamaño, indice):
+    """
+    Flujo aleatorio propio de (familia, tamaño, índice), derivado de la
+    semilla raíz. No depende de las demás instancias, así que cualquier
+    instancia se puede regenerar sola y en cualquier orden.
+    """
+    return np.random.SeedSequence(raiz, spawn_key=(_id(familia), _id(tamaño), indice))
+
+
+def generar_instancia(familia, tamaño, indice, raiz=SEMILLA_POR_DEFECTO):
+    """Genera (sin escribir) la instancia indicada; devuelve (generador, instancia)"""
+    clase, tamaños, generar = FAMILIAS[familia]
+    if tamaño not in tamaños:
+        raise ValueError(f"Tamaño '{tamaño}' no existe en la familia '{familia}'")
+    gen = clase(np.random.default_rng(semilla_instancia(raiz, familia, tamaño, indice)))
+    # Los generadores imprimen avances; en el corpus solo interesa el archivo
+    with contextlib.redirect_stdout(io.StringIO()):
+        instancia = generar(gen, tamaño, indice)
+    return gen, instancia
+
+
+def ruta_instancia(carpeta, familia, tamaño, indice):
+    return os.path.join(carpeta, familia, tamaño, f"{familia}_{tamaño}_{indice}.dzn")
+
+
+def regenerar(familia, tamaño, indice, raiz=SEMILLA_POR_DEFECTO, ruta=None):
+    """Genera y escribe una sola instancia del corpus; devuelve la ruta del .dzn"""
+    gen, instancia = generar_instancia(familia, tamaño, indice, raiz)
+    if ruta is None:
+        ruta = ruta_instancia('corpus', familia, tamaño, indice)
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen.guardar_dzn(instancia, ruta)
+    return ruta
+
+
+def _trabajo(args):
+    familia, tamaño, indice, raiz, ruta = args
+    regenerar(familia, tamaño, indice, raiz, ruta)
+    return ruta
+
+
+def generar_corpus(carpeta='corpus', raiz=SEMILLA_POR_DEFECTO, composicion=None, max_procesos=None):
+    """
+    Genera el corpus en paralelo y escribe carpeta/corpus.json con la semilla
+    raíz y la lista de instancias, suficiente para regenerar cualquiera.
+    """
+    composicion = composicion or COMPOSICION_POR_DEFECTO
+    trabajos = [(familia, tamaño, i, raiz, ruta_instancia(carpeta, familia, tamaño, i))
+                for familia, tamaños in composicion.items()
+                for tamaño, cantidad in tamaños.items()
+                for i in range(1, cantidad + 1)]
+    for familia, tamaño, *_ in trabajos:
+        if tamaño not in FAMILIAS[familia][1]:
+            raise ValueError(f"Tamaño '{tamaño}' no existe en la familia '{familia}'")
+
+    procesos = max_procesos or os.cpu_count() or 1
+    # Trozos grandes: la mayoría de las instancias se genera en milisegundos
+    chunksize = max(1, len(trabajos) // (4 * procesos))
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        rutas = list(pool.map(_trabajo, trabajos, chunksize=chunksize))
+    tiempo = time.perf_counter() - inicio
+
+    manifiesto = {
+        'semilla_raiz': raiz,
+        'composicion': composicion,
+        'instancias': [{'familia': f, 'tamaño': t, 'indice': i, 'archivo': os.path.relpath(r, carpeta)}
+                       for (f, t, i, _, _), r in zip(trabajos, rutas)]
+    }
+    os.makedirs(carpeta, exist_ok=True)
+    with open(os.path.join(carpeta, 'corpus.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    print(f"Corpus: {len(rutas)} instancias en {tiempo:.1f}s ({carpeta})")
+    return rutas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Corpus de instancias reproducible')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('generar', help='Genera el corpus completo en paralelo')
+    p.add_argument('--carpeta', default='corpus')
+    p.add_argument('--semilla', type=int, default=SEMILLA_POR_DEFECTO)
+    p.add_argument('--por-tamaño', type=int, default=None,
+                   help='Instancias por (familia, tamaño); por defecto 100')
+    p.add_argument('--procesos', type=int, default=None)
+
+    p = sub.add_parser('instancia', help='Regenera una sola instancia')
+    p.add_argument('familia', choices=sorted(FAMILIAS))
+    p.add_argument('tamaño')
+    p.add_argument('indice', type=int)
+    p.add_argument('--semilla', type=int, default=SEMILLA_POR_DEFECTO)
+    p.add_argument('--salida', default=None)
+
+    args = parser.parse_args()
+    if args.comando == 'generar':
+        composicion = None
+        if args.por_tamaño is not None:
+            composicion = {f: {t: args.por_tamaño for t in tamaños}
+                           for f, tamaños in COMPOSICION_POR_DEFECTO.items()}
+        generar_corpus(args.carpeta, args.semilla, composicion, args.procesos)
+    else:
+        print(regenerar(args.familia, args.tamaño, args.indice, args.semilla, args.salida))
@@ -0,0 +1,151 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+
+from cotas import SCALE, datos_escalados
+from dzn import leer_dzn
+from factibilidad import MAX_INSATISFECHA_C, PENALIZACION
+
+CARPETA_COTAS = 'cache/cotas'
+# Cambiarla invalida las cotas guardadas si cambia la formulación
+VERSION_FORMULACION = 1
+
+
+def relajacion_lineal(arreglos, ajustar_capacidades=True):
+    """
+    Arma la relajación lineal de models/red.mzn con matrices dispersas:
+    columnas y[a,d] en [0, 1] (solo los diámetros permitidos), f_c[a] en
+    [0, flow_ub] y unmet_demand_c de los consumidores en [0, 100000]. Con
+    ajustar_capacidades la capacidad de un diámetro en la fila
+    f_c[a] <= sum(capacidad·y[a,d]) se toma como min(capacity_c, flow_ub),
+    que es equivalente para el modelo entero pero da una cota más fuerte.
+
+    Devuelve (costo, A_ub, b_ub, A_eq, b_eq, limites, columnas_y), listo
+    para scipy.optimize.linprog; columnas_y son los pares (a, d) de las
+    primeras columnas.
+    """
+    datos = datos_escalados(arreglos)
+    nA, nP, nT, N = datos['nA'], datos['nP'], datos['nT'], datos['N']
+    arc_from = np.array(datos['arc_from'])
+    arc_to = np.array(datos['arc_to'])
+    columnas_y = [(a, d) for a in range(nA) for d in sorted(datos['allowed_diam'][a])]
+    nY = len(columnas_y)
+    consumidores = np.arange(nP + nT + 1, N + 1)
+    nU = len(consumidores)
+    col_f = nY + np.arange(nA)
+    col_u = nY + nA + np.arange(nU)
+
+    ay = np.array([a for a, _ in columnas_y], dtype=int)
+    dy = np.array([d for _, d in columnas_y], dtype=int)
+    capacidad = np.array([datos['capacidad_c'][d-1] for d in dy], dtype=float)
+    if ajustar_capacidades:
+        capacidad = np.minimum(capacidad, np.array(datos['flow_ub'], dtype=float)[ay])
+
+    # Filas <=: un diámetro por arco, f <= capacidad elegida, salida de plantas
+    desde_planta = np.flatnonzero(arc_from <= nP)
+    filas = np.concatenate((ay, nA + np.arange(nA), nA + ay, 2 * nA + arc_from[desde_planta] - 1))
+    cols = np.concatenate((np.arange(nY), col_f, np.arange(nY), col_f[desde_planta]))
+    vals = np.concatenate((np.ones(nY), np.ones(nA), -capacidad, np.ones(len(desde_planta))))
+    A_ub = coo_matrix((vals, (filas, cols)), shape=(2 * nA + nP, nY + nA + nU)).tocsr()
+    b_ub = np.concatenate((np.ones(nA), np.zeros(nA), datos['supply'][:nP])).astype(float)
+
+    # Filas =: entrada - salida (+ unmet) en tanques y consumidores
+    entra = np.flatnonzero(arc_to > nP)
+    sale = np.flatnonzero(arc_from > nP)
+    filas = np.concatenate((arc_to[entra] - nP - 1, arc_from[sale] - nP - 1, consumidores - nP - 1))
+    cols = np.concatenate((col_f[entra], col_f[sale], col_u))
+    vals = np.concatenate((np.ones(len(entra)), -np.ones(len(sale)), np.ones(nU)))
+    A_eq = coo_matrix((vals, (filas, cols)), shape=(N - nP, nY + nA + nU)).tocsr()
+    b_eq = np.array([0] * nT + [datos['demand'][i-1] for i in consumidores], dtype=float)
+
+    costo = np.concatenate((
+        [datos['install_c'][a][d-1] for a, d in columnas_y],
+        datos['trans_c'],
+        [PENALIZACION] * nU
+    )).astype(float)
+    limites = [(0, 1)] * nY + [(0, ub) for ub in datos['flow_ub']] + [(0, MAX_INSATISFECHA_C)] * nU
+    return costo, A_ub, b_ub, A_eq, b_eq, limites, columnas_y
+
+
+def resolver_relajacion(arreglos, ajustar_capacidades=True):
+    """
+    Resuelve la relajación con HiGHS. Devuelve un diccionario con 'estado'
+    (OPTIMO o INFACTIBLE), 'valor_lp' y 'cota_inferior_c' (el valor
+    redondeado hacia arriba: el objetivo del modelo es entero) y 'tiempo'.
+    """
+    inicio = time.perf_counter()
+    costo, A_ub, b_ub, A_eq, b_eq, limites, _ = relajacion_lineal(arreglos, ajustar_capacidades)
+    r = linprog(costo, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=limites, method='highs')
+    resultado = {'estado': 'OPTIMO' if r.status == 0 else 'INFACTIBLE',
+                 'valor_lp': None, 'cota_inferior_c': None}
+    if r.status == 0:
+        resultado['valor_lp'] = r.fun
+        resultado['cota_inferior_c'] = math.ceil(r.fun - 1e-6)
+    elif r.status != 2:
+        raise RuntimeError(f'HiGHS no resolvió la relajación: {r.message}')
+    resultado['tiempo'] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+def _ruta_cota(ruta_dzn, ajustar_capacidades):
+    h = hashlib.sha256()
+    with open(ruta_dzn, 'rb') as f:
+        h.update(f.read())
+    h.update(f'|v{VERSION_FORMULACION}|{int(ajustar_capacidades)}'.encode())
+    return os.path.join(CARPETA_COTAS, h.hexdigest() + '.json')
+
+
+def cota_inferior(ruta_dzn, ajustar_capacidades=True, cache=True):
+    """
+    Cota inferior de la relajación lineal para una instancia, guardada en
+    cache/cotas/ según el contenido del .dzn. El resultado incluye
+    'desde_cache'.
+    """
+    ruta = _ruta_cota(ruta_dzn, ajustar_capacidades)
+    if cache and os.path.exists(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            resultado = json.load(f)
+        resultado['desde_cache'] = True
+        return resultado
+    resultado = resolver_relajacion(leer_dzn(ruta_dzn), ajustar_capacidades)
+    if cache:
+        os.makedirs(CARPETA_COTAS, exist_ok=True)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f)
+        os.replace(temporal, ruta)
+    resultado['desde_cache'] = False
+    return resultado
+
+
+def brecha(costo_total_c, cota_inferior_c):
+    """Brecha relativa (costo - cota) / costo; None si falta alguno de los dos"""
+    if costo_total_c is None or cota_inferior_c is None:
+        return None
+    if costo_total_c <= 0:
+        return 0.0
+    return max(0.0, (costo_total_c - cota_inferior_c) / costo_total_c)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cota inferior por relajación lineal (HiGHS)')
+    parser.add_argument('instancias', nargs='+', help='archivos .dzn')
+    parser.add_argument('--sin-ajuste', action='store_true',
+                        help='usar capacity_c tal cual en vez de min(capacity_c, flow_ub)')
+    parser.add_argument('--sin-cache', action='store_true', help='no leer ni guardar en cache/cotas/')
+    args = parser.parse_args()
+
+    for ruta in args.instancias:
+        r = cota_inferior(ruta, not args.sin_ajuste, not args.sin_cache)
+        if r['cota_inferior_c'] is None:
+            print(f'{ruta}: relajación infactible ({r["tiempo"]}s)')
+        else:
+            print(f"{ruta}: cota {r['cota_inferior_c'] / SCALE:.2f} | {r['tiempo']}s"
+                  f"{' (caché)' if r['desde_cache'] else ''}")
@@ -0,0 +1,194 @@
+from collections import deque
+
+SCALE = 100  # mismo factor de escala que models/main.mzn
+
+# Dominio de unmet_demand_c en models/red.mzn (por nodo, ya escalado)
+MAX_INSATISFECHA_C = 100000
+
+# Con más nodos que esto las cotas aguas abajo se calculan sumando por capas
+# (pueden contar dos veces un mismo nodo, siguen siendo válidas pero más flojas)
+MAX_NODOS_EXACTO = 5000
+
+
+def _escalar(valor):
+    # Se redondea a 2 decimales primero, igual que lo que queda escrito en el .dzn
+    return int(round(float(f"{valor:.2f}") * SCALE))
+
+
+def capacidad_fuente(supply, demand, nP, nT):
+    """
+    Flujo escalado que puede originar cada nodo (lista 0-based). Además de
+    las plantas, en models/red.mzn un consumidor puede emitir flujo
+    declarando más demanda insatisfecha que su demanda
+    (flujo_entrada + unmet = demanda + flujo_salida), hasta
+    MAX_INSATISFECHA_C - demanda. Solo se cuenta si algún consumidor tiene
+    más demanda que MAX_INSATISFECHA_C: si no, ese flujo se puede anular
+    sin empeorar el costo (la penalización que agrega en el origen la
+    descuenta en el destino), así que con las plantas se conserva el óptimo.
+    """
+    fuente = [s if i < nP else 0 for i, s in enumerate(supply)]
+    consumidores = range(nP + nT, len(demand))
+    if any(demand[i] > MAX_INSATISFECHA_C for i in consumidores):
+        for i in consumidores:
+            fuente[i] = max(0, MAX_INSATISFECHA_C - demand[i])
+    return fuente
+
+
+def _orden_topologico(N, arc_from, arc_to):
+    grado = [0] * (N + 1)
+    sucesores = [[] for _ in range(N + 1)]
+    for u, v in zip(arc_from, arc_to):
+        sucesores[u].append(v)
+        grado[v] += 1
+    cola = deque(i for i in range(1, N + 1) if grado[i] == 0)
+    orden = []
+    while cola:
+        u = cola.popleft()
+        orden.append(u)
+        for v in sucesores[u]:
+            grado[v] -= 1
+            if grado[v] == 0:
+                cola.append(v)
+    if len(orden) != N:
+        raise ValueError('La red tiene ciclos; no se pueden calcular cotas por capas')
+    return orden, sucesores
+
+
+def calcular_cotas(arreglos):
+    """
+    Calcula para cada arco una cota superior del flujo escalado (flow_ub) y
+    el conjunto de diámetros no dominados (allowed_diam, índices 1..nD).
+
+    El flujo de un arco u->v no puede superar lo que pueden originar las
+    fuentes que alcanzan u (ver capacidad_fuente), ni la demanda de los
+    nodos alcanzables desde v (incluido v), ni la capacidad del mayor
+    diámetro. Un diámetro d está dominado si otro diámetro igual o más
+    barato también cubre min(capacidad_d, cota).
+    """
+    supply = [_escalar(s) for s in arreglos['supply']]
+    demand = [_escalar(d) for d in arreglos['demand']]
+    N = len(supply)
+    # Enteros de Python: los bitmask crecen más allá de 64 bits
+    arc_from = [int(u) for u in arreglos['arc_from']]
+    arc_to = [int(v) for v in arreglos['arc_to']]
+    capacidades = [int(c) * SCALE for c in arreglos['max_capacity']]
+
+    orden, sucesores = _orden_topologico(N, arc_from, arc_to)
+    predecesores = [[] for _ in range(N + 1)]
+    for u, v in zip(arc_from, arc_to):
+        predecesores[v].append(u)
+
+    # Aguas arriba: conjunto exacto de fuentes que alcanzan cada nodo (bitmask).
+    # Si también emiten los consumidores y la red es grande, se suma por capas
+    fuente = capacidad_fuente(supply, demand, arreglos['nP'], arreglos['nT'])
+    fuentes = [i for i in range(1, N + 1) if fuente[i-1] > 0]
+    arriba = [0] * (N + 1)
+    if N <= MAX_NODOS_EXACTO or all(i <= arreglos['nP'] for i in fuentes):
+        bit_fuente = {p: 1 << k for k, p in enumerate(fuentes)}
+        mascara = [0] * (N + 1)
+        for u in orden:
+            m = bit_fuente.get(u, 0)
+            for p in predecesores[u]:
+                m |= mascara[p]
+            mascara[u] = m
+        capacidad_bit = [fuente[p-1] for p in fuentes]
+        for u in range(1, N + 1):
+            m, total = mascara[u], 0
+            while m:
+                bajo = m & -m
+                total += capacidad_bit[bajo.bit_length() - 1]
+                m ^= bajo
+            arriba[u] = total
+    else:
+        fuente_total = sum(fuente)
+        for u in orden:
+            arriba[u] = min(fuente_total, fuente[u-1] + sum(arriba[p] for p in predecesores[u]))
+
+    # Aguas abajo: demanda alcanzable desde cada nodo
+    demanda_total = sum(demand)
+    abajo = [0] * (N + 1)
+    if N <= MAX_NODOS_EXACTO:
+        alcanza = [0] * (N + 1)
+        for u in reversed(orden):
+            m = (1 << u) if demand[u-1] > 0 else 0
+            for v in sucesores[u]:
+                m |= alcanza[v]
+            alcanza[u] = m
+        for u in range(1, N + 1):
+            m, total = alcanza[u], 0
+            while m:
+                bajo = m & -m
+                total += demand[bajo.bit_length() - 2]
+                m ^= bajo
+            abajo[u] = total
+    else:
+        for u in reversed(orden):
+            abajo[u] = min(demanda_total, demand[u-1] + sum(abajo[v] for v in sucesores[u]))
+
+    # Que d esté dominado solo depende de los costos del arco y de qué
+    # capacidades alcanzan la cota, así que se memoiza por esa combinación
+    tope = max(capacidades, default=0)
+    memo = {}
+    flow_ub = []
+    allowed_diam = []
+    for a, (u, v) in enumerate(zip(arc_from, arc_to)):
+        cota = min(arriba[u], abajo[v], tope)
+        flow_ub.append(cota)
+        costos = tuple(arreglos['install_cost'][a])
+        clave = (costos, cota > 0, tuple(c >= cota for c in capacidades))
+        if clave not in memo:
+            memo[clave] = _no_dominados(costos, capacidades, cota)
+        allowed_diam.append(memo[clave])
+    return flow_ub, allowed_diam
+
+
+def _no_dominados(costos, capacidades, cota):
+    permitidos = set()
+    if cota > 0:
+        for d in range(len(capacidades)):
+            necesario = min(capacidades[d], cota)
+            dominado = any(
+                capacidades[e] >= necesario and
+                (costos[e] < costos[d] or (costos[e] == costos[d] and e < d))
+                for e in range(len(capacidades)) if e != d
+            )
+            if not dominado:
+                permitidos.add(d + 1)
+    return permitidos
+
+
+def costos_instalacion_c(arreglos):
+    """install_cost escalado como en models/red.mzn (sin redondear antes a 2 decimales)"""
+    return [[int(round(float(c) * SCALE)) for c in fila] for fila in arreglos['install_cost']]
+
+
+def datos_escalados(arreglos):
+    """
+    Arreglos de la instancia en las unidades escaladas de models/red.mzn,
+    con los nodos como enteros y flow_ub y allowed_diam de calcular_cotas:
+    lo que necesitan los métodos que resuelven el modelo sin MiniZinc.
+    """
+    supply = [_escalar(s) for s in arreglos['supply']]
+    demand = [_escalar(d) for d in arreglos['demand']]
+    flow_ub, allowed_diam = calcular_cotas(arreglos)
+    return {
+        'nP': arreglos['nP'], 'nT': arreglos['nT'],
+        'N': len(supply), 'nA': len(arreglos['arc_from']), 'nD': len(arreglos['max_capacity']),
+        'arc_from': [int(u) for u in arreglos['arc_from']],
+        'arc_to': [int(v) for v in arreglos['arc_to']],
+        'supply': supply, 'demand': demand,
+        'trans_c': [_escalar(t) for t in arreglos['trans_cost']],
+        'install_c': costos_instalacion_c(arreglos),
+        'capacidad_c': [int(c) * SCALE for c in arreglos['max_capacity']],
+        'flow_ub': flow_ub, 'allowed_diam': allowed_diam
+    }
+
+
+def seccion_cotas(arreglos):
+    """Texto .dzn con flow_ub y allowed_diam, para agregar tras trans_cost"""
+    flow_ub, allowed_diam = calcular_cotas(arreglos)
+    conjuntos = ("{" + ", ".join(str(d) for d in sorted(c)) + "}" for c in allowed_diam)
+    return ("\n% Cotas precalculadas: flujo máximo escalado y diámetros no dominados\n"
+            "flow_ub = [" + ", ".join(map(str, flow_ub)) + "];\n"
+            "allowed_diam = [" + ", ".join(conjuntos) + "];\n")
+
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+
+from cotas import seccion_cotas
+from dzn import leer_dzn, insertar_seccion
+
+
+def calcular_adyacencia(N, arc_from, arc_to):
+    """
+    Listas de adyacencia en formato CSR con índices 1-based: los arcos que
+    salen del nodo i son out_arcs[out_start[i] .. out_start[i+1]-1] (igual
+    para in_start/in_arcs). Dentro de cada nodo los arcos quedan en orden.
+    """
+    def csr(extremos):
+        extremos = np.asarray(extremos, dtype=np.int64)
+        conteo = np.bincount(extremos, minlength=N + 1)[1:N + 1]
+        inicio = np.concatenate(([1], 1 + np.cumsum(conteo)))
+        # Orden estable: dentro de un nodo se conserva el orden de los arcos
+        arcos = np.argsort(extremos, kind='stable') + 1
+        return inicio.tolist(), arcos.tolist()
+
+    out_start, out_arcs = csr(arc_from)
+    in_start, in_arcs = csr(arc_to)
+    return out_start, out_arcs, in_start, in_arcs
+
+
+def seccion_adyacencia(arreglos):
+    """Texto .dzn con la adyacencia CSR (out_start/out_arcs, in_start/in_arcs)"""
+    out_start, out_arcs, in_start, in_arcs = calcular_adyacencia(
+        len(arreglos['supply']), arreglos['arc_from'], arreglos['arc_to'])
+    return ("\n% Adyacencia CSR: arcos de i en out_arcs[out_start[i]..out_start[i+1]-1]\n"
+            "out_start = [" + ", ".join(map(str, out_start)) + "];\n"
+            "out_arcs = [" + ", ".join(map(str, out_arcs)) + "];\n"
+            "in_start = [" + ", ".join(map(str, in_start)) + "];\n"
+            "in_arcs = [" + ", ".join(map(str, in_arcs)) + "];\n")
+
+
+def seccion_derivados(arreglos):
+    """Parámetros que se calculan a partir de la red y se escriben tras trans_cost"""
+    return seccion_cotas(arreglos) + seccion_adyacencia(arreglos)
+
+
+def completar_dzn(ruta):
+    """Agrega a un .dzn existente los parámetros derivados que le falten"""
+    datos = leer_dzn(ruta)
+    seccion = ''
+    if 'flow_ub' not in datos:
+        seccion += seccion_cotas(datos)
+    if 'out_start' not in datos:
+        seccion += seccion_adyacencia(datos)
+    if not seccion:
+        return False
+    insertar_seccion(ruta, seccion)
+    return True
+
+
+if __name__ == '__main__':
+    # Uso: python tools/derivados.py [carpeta ...]  (por defecto, instancias/)
+    for carpeta in sys.argv[1:] or ['instancias']:
+        for raiz, _, archivos in os.walk(carpeta):
+            for nombre in sorted(archivos):
+                if nombre.endswith('.dzn'):
+                    ruta = os.path.join(raiz, nombre)
+                    if completar_dzn(ruta):
+                        print(f"Parámetros derivados agregados: {ruta}")
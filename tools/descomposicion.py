@@ -0,0 +1,194 @@
+import argparse
+import os
+import time
+
+from arranque import solucion_desde_salida
+from cotas import _escalar
+from dzn import escribir_dzn, leer_dzn
+from ejecutor import FORMULACIONES, MODELO_POR_DEFECTO, SOLVER_POR_DEFECTO, ejecutar_lote
+from factibilidad import MAX_INSATISFECHA_C
+from reporte import escribir_reporte, pesos, resultado_modelo
+from resultados_db import registrar_ejecucion
+
+# De peor a mejor: el estado global es el peor de sus componentes
+ESTADOS = ('INFACTIBLE', 'SIN_SOLUCION', 'SOLUCION', 'OPTIMO', 'SIN_FLUJO')
+
+
+def _raiz(padre, i):
+    while padre[i] != i:
+        padre[i] = padre[padre[i]]  # compresión por mitades
+        i = padre[i]
+    return i
+
+
+def componentes(arreglos):
+    """
+    Componentes débilmente conexas de la red (union-find sobre los arcos).
+    Devuelve una lista de (nodos, arcos), de la más grande a la más chica,
+    con los nodos 1..N en orden creciente y los arcos 0-based. Los nodos
+    sin arcos solo aparecen si tienen demanda, como componente aislada.
+    """
+    N = len(arreglos['supply'])
+    padre = list(range(N + 1))
+    arc_from = [int(u) for u in arreglos['arc_from']]
+    arc_to = [int(v) for v in arreglos['arc_to']]
+    for u, v in zip(arc_from, arc_to):
+        ru, rv = _raiz(padre, u), _raiz(padre, v)
+        if ru != rv:
+            padre[ru] = rv
+
+    nodos, arcos = {}, {}
+    for a, u in enumerate(arc_from):
+        arcos.setdefault(_raiz(padre, u), []).append(a)
+    for i in range(1, N + 1):
+        r = _raiz(padre, i)
+        if r in arcos or arreglos['demand'][i-1] > 0:
+            nodos.setdefault(r, []).append(i)
+    grupos = [(nodos[r], arcos.get(r, [])) for r in nodos]
+    grupos.sort(key=lambda g: (-len(g[1]), -len(g[0]), g[0][0]))
+    return grupos
+
+
+def subinstancia(arreglos, nodos, arcos):
+    """
+    Arreglos de la red restringida a una componente, renumerando los nodos
+    y conservando el orden de las capas (como en tools/presolve.py)
+    """
+    limites = [0]
+    for capa in ['nP', 'nT', 'nC1', 'nC2']:
+        limites.append(limites[-1] + arreglos[capa])
+    tamaños = [sum(1 for i in nodos if limites[c] < i <= limites[c+1]) for c in range(4)]
+    nuevo_idx = {orig: k + 1 for k, orig in enumerate(nodos)}
+    return {
+        'nP': tamaños[0], 'nT': tamaños[1], 'nC1': tamaños[2], 'nC2': tamaños[3],
+        'arc_from': [nuevo_idx[int(arreglos['arc_from'][a])] for a in arcos],
+        'arc_to': [nuevo_idx[int(arreglos['arc_to'][a])] for a in arcos],
+        'trans_cost': [arreglos['trans_cost'][a] for a in arcos],
+        'install_cost': [list(arreglos['install_cost'][a]) for a in arcos],
+        'supply': [arreglos['supply'][i-1] for i in nodos],
+        'demand': [arreglos['demand'][i-1] for i in nodos],
+        'max_capacity': list(arreglos['max_capacity'])
+    }
+
+
+def _estado(texto, solucion):
+    if solucion is not None:
+        return 'OPTIMO' if '==========' in texto else 'SOLUCION'
+    if '=====UNSATISFIABLE=====' in texto:
+        return 'INFACTIBLE'
+    return 'SIN_SOLUCION'
+
+
+def resolver_por_componentes(ruta_dzn, carpeta=None, timeout_segundos=60, max_procesos=None,
+                             modelo=MODELO_POR_DEFECTO, solver=SOLVER_POR_DEFECTO, cache=True):
+    """
+    Escribe un .dzn por componente conexa en 'carpeta', los resuelve en
+    paralelo y combina flujos, diámetros, demanda insatisfecha y costos en
+    un solo resultado sobre los arcos y nodos originales. Las componentes
+    sin arcos, o sin planta con oferta y sin consumidores con más demanda
+    que MAX_INSATISFECHA_C, no se envían a MiniZinc: su óptimo es no
+    instalar nada y dejar toda la demanda insatisfecha. En
+    resultados_db se registra el resultado combinado, no cada componente.
+    """
+    inicio = time.perf_counter()
+    arreglos = leer_dzn(ruta_dzn)
+    if carpeta is None:
+        carpeta = os.path.join('resultados', 'componentes', os.path.splitext(os.path.basename(ruta_dzn))[0])
+    os.makedirs(carpeta, exist_ok=True)
+    nP = arreglos['nP']
+    nA, nD = len(arreglos['arc_from']), len(arreglos['max_capacity'])
+
+    grupos = componentes(arreglos)
+    trabajos, resueltas = [], []
+    for k, (nodos, arcos) in enumerate(grupos, start=1):
+        # Sin plantas, un consumidor puede tener que alimentar a otro cuya
+        # demanda excede el dominio de unmet_demand_c (cotas.capacidad_fuente)
+        if not arcos or not any(arreglos['supply'][i-1] > 0 if i <= nP
+                                else _escalar(arreglos['demand'][i-1]) > MAX_INSATISFECHA_C for i in nodos):
+            continue
+        ruta = os.path.join(carpeta, f'componente_{k}.dzn')
+        escribir_dzn(ruta, subinstancia(arreglos, nodos, arcos))
+        trabajos.append((ruta, os.path.join(carpeta, f'componente_{k}_resultado.txt')))
+        resueltas.append(k)
+    print(f"{os.path.basename(ruta_dzn)}: {len(grupos)} componentes, {len(trabajos)} a resolver "
+          f"(mayor: {len(grupos[0][1]) if grupos else 0} de {nA} arcos)")
+    analisis_lote = dict(zip(resueltas, ejecutar_lote(trabajos, timeout_segundos, max_procesos,
+                                                      modelo, solver, cache, salida='json', registrar=False)))
+
+    y, f_c = [0] * nA, [0] * nA
+    resumen = []
+    for k, (nodos, arcos) in enumerate(grupos, start=1):
+        fila = {'componente': k, 'nodos': len(nodos), 'arcos': len(arcos),
+                'estado': 'SIN_FLUJO', 'costo_total_c': None, 'tiempo': 0.0}
+        if k in analisis_lote:
+            with open(trabajos[resueltas.index(k)][1], 'r', encoding='utf-8') as f:
+                texto = f.read()
+            solucion = solucion_desde_salida(texto, len(arcos), nD)
+            fila['estado'] = _estado(texto, solucion)
+            fila['tiempo'] = analisis_lote[k].get('tiempo_ejecutado', 0.0)
+            if solucion is not None:
+                fila['costo_total_c'] = solucion['costo_total_c']
+                for local, a in enumerate(arcos):
+                    y[a], f_c[a] = solucion['y'][local], solucion['f_c'][local]
+        resumen.append(fila)
+
+    # Demanda insatisfecha por el balance de los consumidores con los flujos combinados
+    N = len(arreglos['supply'])
+    neto = [0] * (N + 1)
+    for a in range(nA):
+        neto[int(arreglos['arc_to'][a])] += f_c[a]
+        neto[int(arreglos['arc_from'][a])] -= f_c[a]
+    inicio_consumidores = nP + arreglos['nT']
+    unmet = [max(0, _escalar(arreglos['demand'][i]) - neto[i+1]) if i >= inicio_consumidores else 0
+             for i in range(N)]
+    for fila in resumen:
+        if fila['estado'] == 'SIN_FLUJO':
+            nodos = grupos[fila['componente'] - 1][0]
+            if any(unmet[i-1] > MAX_INSATISFECHA_C for i in nodos):
+                fila['estado'] = 'INFACTIBLE'
+
+    estado = min((fila['estado'] for fila in resumen), key=ESTADOS.index, default='SIN_FLUJO')
+    resultado = resultado_modelo(arreglos, estado, y, f_c, unmet)
+    resultado['componentes'] = resumen
+    resultado['tiempo'] = round(time.perf_counter() - inicio, 2)
+    registrar_ejecucion(ruta_dzn, {
+        'herramienta': 'descomposicion', 'solver': solver, 'modelo': FORMULACIONES.get(modelo, modelo),
+        'configuracion': {'componentes': len(grupos), 'resueltas': len(resueltas)},
+        # Sin flujo en ninguna componente, no instalar nada es el óptimo
+        'estado': 'OPTIMO' if estado == 'SIN_FLUJO' else estado,
+        'objetivo_c': (resultado['costo_total_c']
+                       if estado in ('OPTIMO', 'SOLUCION', 'SIN_FLUJO') else None),
+        'tiempo': resultado['tiempo'], 'timeout_segundos': timeout_segundos
+    })
+    return resultado
+
+
+def escribir_reporte_componentes(ruta, arreglos, resultado):
+    """Reporte de reporte.py con una línea por componente"""
+    componentes = resultado['componentes']
+    lineas = [f"{len(componentes)} componentes "
+              f"(mayor: {max((c['arcos'] for c in componentes), default=0)} arcos)"]
+    for c in componentes:
+        costo = pesos(c['costo_total_c']) if c['costo_total_c'] is not None else '-'
+        lineas.append(f"Componente {c['componente']}: {c['nodos']} nodos, {c['arcos']} arcos | "
+                      f"{c['estado']} | costo {costo} | {c['tiempo']}s")
+    escribir_reporte(ruta, arreglos, resultado, 'RESULTADO POR COMPONENTES CONEXAS',
+                     [('COMPONENTES', lineas)])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Resuelve cada componente conexa por separado')
+    parser.add_argument('instancias', nargs='+')
+    parser.add_argument('--timeout', type=int, default=60)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--modelo', default=MODELO_POR_DEFECTO,
+                        help=f"ruta del .mzn o formulación ({', '.join(FORMULACIONES)})")
+    parser.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+    args = parser.parse_args()
+
+    for ruta in args.instancias:
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        carpeta = os.path.join('resultados', 'componentes', nombre)
+        r = resolver_por_componentes(ruta, carpeta, args.timeout, args.procesos, args.modelo, args.solver)
+        escribir_reporte_componentes(os.path.join(carpeta, f'{nombre}_resultado.txt'), leer_dzn(ruta), r)
+        print(f"{ruta}: {r['estado']} | costo {pesos(r['costo_total_c'])} ({r['tiempo']}s)")
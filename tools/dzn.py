@@ -0,0 +1,199 @@
+import re
+
+import numpy as np
+
+_RE_ASIGNACION = re.compile(r'\s*([A-Za-z_]\w*)\s*=')
+_RE_RANGO = re.compile(r'^(-?\d+)\s*\.\.\s*(-?\d+)$')
+
+
+def _saltar_comentarios(texto, pos):
+    """Avanza sobre espacios y comentarios '%' hasta el siguiente dato"""
+    n = len(texto)
+    while pos < n:
+        if texto[pos].isspace():
+            pos += 1
+        elif texto[pos] == '%':
+            fin = texto.find('\n', pos)
+            pos = n if fin < 0 else fin + 1
+        else:
+            break
+    return pos
+
+
+def _quitar_comentarios(valor):
+    return re.sub(r'%[^\n]*', '', valor)
+
+
+def _dividir(cuerpo):
+    """Separa por comas de primer nivel (respeta llaves y corchetes)"""
+    if not any(c in cuerpo for c in '[{('):
+        return [p.strip() for p in cuerpo.split(',') if p.strip()]
+    partes, nivel, inicio = [], 0, 0
+    for i, c in enumerate(cuerpo):
+        if c in '[{(':
+            nivel += 1
+        elif c in ']})':
+            nivel -= 1
+        elif c == ',' and nivel == 0:
+            partes.append(cuerpo[inicio:i])
+            inicio = i + 1
+    if cuerpo[inicio:].strip():
+        partes.append(cuerpo[inicio:])
+    return [p.strip() for p in partes]
+
+
+def _valor(texto, datos):
+    texto = texto.strip()
+    if texto.startswith('array2d(') and texto.endswith(')'):
+        r1, r2, lista = _dividir(texto[len('array2d('):-1])
+        filas = len(_valor(r1, datos))
+        columnas = len(_valor(r2, datos))
+        plano = _valor(lista, datos)
+        if len(plano) != filas * columnas:
+            raise ValueError('array2d con tamaño inconsistente')
+        return [plano[i*columnas:(i+1)*columnas] for i in range(filas)]
+    if texto.startswith('[|') and texto.endswith('|]'):
+        filas = [f for f in texto[2:-2].split('|') if f.strip()]
+        return [[_valor(p, datos) for p in _dividir(f)] for f in filas]
+    if texto.startswith('[') and texto.endswith(']'):
+        return [_valor(p, datos) for p in _dividir(texto[1:-1])]
+    if texto.startswith('{') and texto.endswith('}'):
+        return {_valor(p, datos) for p in _dividir(texto[1:-1])}
+    rango = _RE_RANGO.match(texto)
+    if rango:
+        return set(range(int(rango.group(1)), int(rango.group(2)) + 1))
+    if '..' in texto:
+        a, b = texto.split('..')
+        return set(range(_valor(a, datos), _valor(b, datos) + 1))
+    if texto in ('true', 'false'):
+        return texto == 'true'
+    if texto.startswith('"') and texto.endswith('"'):
+        return texto[1:-1]
+    if texto in datos:
+        return datos[texto]
+    if re.fullmatch(r'-?\d+', texto):
+        return int(texto)
+    return float(texto)
+
+
+def recorrer_dzn(texto):
+    """
+    Lee las asignaciones 'nombre = valor;' en orden. Se detiene en el primer
+    fragmento que no es una asignación válida (algunas instancias antiguas
+    tienen la salida del solver pegada al final). Devuelve (datos, fin), con
+    fin la posición justo después de la última asignación leída.
+    """
+    datos = {}
+    pos = fin = 0
+    while True:
+        pos = _saltar_comentarios(texto, pos)
+        m = _RE_ASIGNACION.match(texto, pos)
+        if not m:
+            break
+        cierre = texto.find(';', m.end())
+        if cierre < 0:
+            break
+        try:
+            datos[m.group(1)] = _valor(_quitar_comentarios(texto[m.end():cierre]), datos)
+        except (ValueError, TypeError):
+            break
+        pos = fin = cierre + 1
+    # Incluir el salto de línea que cierra la última asignación
+    if texto.startswith('\r\n', fin):
+        fin += 2
+    elif texto.startswith('\n', fin):
+        fin += 1
+    return datos, fin
+
+
+def leer_dzn(ruta):
+    """Lee un archivo .dzn y devuelve un diccionario nombre -> valor"""
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        return recorrer_dzn(f.read())[0]
+
+
+def insertar_seccion(ruta, seccion):
+    """
+    Inserta texto .dzn después de la última asignación del archivo, antes de
+    los comentarios finales, respetando el fin de línea que use el archivo.
+    """
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        texto = f.read()
+    _, fin = recorrer_dzn(texto)
+    if '\r\n' in texto:
+        seccion = seccion.replace('\n', '\r\n')
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        f.write(texto[:fin] + seccion + texto[fin:])
+
+
+# --- Escritura -------------------------------------------------------------
+
+def _fmt_fijo(valores):
+    return ", ".join(map("{:.2f}".format, valores))
+
+
+def _fmt_compacto(valores):
+    # Valores enteros (a 1e-10) sin decimales, el resto con 2 decimales
+    return ", ".join(str(int(round(v))) if abs(v - round(v)) < 1e-10 else f"{v:.2f}"
+                     for v in valores)
+
+
+_FORMATOS_REALES = {'fijo': _fmt_fijo, 'compacto': _fmt_compacto}
+
+
+def texto_dzn(arreglos, cabecera='', pie='', reales='fijo', derivados=True):
+    """
+    Construye el contenido completo del .dzn. Cada arreglo se arma con un
+    solo join; 'reales' elige el formato de supply/demand/trans_cost:
+    'fijo' (siempre 2 decimales) o 'compacto' (enteros sin decimales).
+    Con derivados=True se agregan cotas y adyacencia tras trans_cost.
+    """
+    from derivados import seccion_derivados
+
+    fmt = _FORMATOS_REALES[reales]
+    install_cost = np.asarray(arreglos['install_cost'])
+    nD = len(arreglos['max_capacity'])
+    filas = install_cost.reshape(-1, nD).tolist()
+    partes = [
+        cabecera,
+        f"nP = {arreglos['nP']};\n",
+        f"nT = {arreglos['nT']};\n",
+        f"nC1 = {arreglos['nC1']};\n",
+        f"nC2 = {arreglos['nC2']};\n",
+        f"nA = {len(arreglos['arc_from'])};\n",
+        f"nD = {nD};\n\n",
+        "arc_from = [", ", ".join(map(str, np.asarray(arreglos['arc_from']).tolist())), "];\n",
+        "arc_to = [", ", ".join(map(str, np.asarray(arreglos['arc_to']).tolist())), "];\n\n",
+        "supply = [", fmt(np.asarray(arreglos['supply'], dtype=float).tolist()), "];\n",
+        "demand = [", fmt(np.asarray(arreglos['demand'], dtype=float).tolist()), "];\n\n",
+        "max_capacity = [", ", ".join(map(str, np.asarray(arreglos['max_capacity']).tolist())), "];\n\n",
+        "install_cost = array2d(1..nA, 1..nD, [\n",
+        ",\n".join("  " + ", ".join(map(str, fila)) for fila in filas),
+        "\n" if filas else "",
+        "]);\n\n",
+        "trans_cost = [", fmt(np.asarray(arreglos['trans_cost'], dtype=float).tolist()), "];\n",
+        seccion_derivados(arreglos) if derivados else '',
+        pie
+    ]
+    return "".join(partes)
+
+
+def escribir_dzn(ruta, arreglos, cabecera='', pie='', reales='fijo', derivados=True):
+    """Escribe el .dzn con una sola escritura"""
+    texto = texto_dzn(arreglos, cabecera, pie, reales, derivados)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def escribir_lote(trabajos):
+    """
+    Escribe instancias a medida que se generan: 'trabajos' puede ser un
+    generador de (ruta, arreglos) o (ruta, arreglos, opciones) y solo hay una
+    instancia en memoria a la vez. Devuelve cuántos archivos se escribieron.
+    """
+    escritos = 0
+    for trabajo in trabajos:
+        ruta, arreglos, *resto = trabajo
+        escribir_dzn(ruta, arreglos, **(resto[0] if resto else {}))
+        escritos += 1
+    return escritos
@@ -0,0 +1,397 @@
+import contextlib
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from arranque import (OPCIONES_SALIDA_COMPACTA, OPCIONES_SALIDA_TEXTO, modelo_con_arranque, seccion_arranque,
+                      soporta_warm_start, solucion_desde_salida, tamaños_dzn)
+from cache_soluciones import cache_por_defecto, huella_archivo
+from resultados_db import estadisticas_salida, estado_salida, registrar_ejecucion
+from traza import OPCIONES_TRAZA, leer_flujo, leer_traza, metricas
+
+MODELO_POR_DEFECTO = 'models/main.mzn'
+# Formulaciones del problema; 'modelo' acepta una ruta o uno de estos nombres
+FORMULACIONES = {
+    'cp': MODELO_POR_DEFECTO,              # con restricciones reificadas (Gecode, CP-SAT)
+    'csr': 'models/main_csr.mzn',          # igual que cp, aplanado con adyacencia CSR
+    'mip': 'models/main_mip.mzn'           # lineal y ajustada (HiGHS, CBC, Gurobi)
+}
+SOLVER_POR_DEFECTO = 'org.gecode.gecode'
+MODELO_COTA = 'models/cota.mzn'  # agrega total_cost_c <= cota_objetivo
+
+# Procesos MiniZinc vivos, para poder matarlos si se interrumpe el lote
+_procesos_activos = set()
+_candado = threading.Lock()
+
+
+def lanzar_proceso(comando):
+    """
+    Lanza MiniZinc en una sesión propia (para poder matar también al solver
+    hijo) y lo registra entre los procesos que se matan si se interrumpe el
+    lote. Quien lo lanza debe llamar a liberar_proceso cuando termine.
+    """
+    proceso = subprocess.Popen(comando,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               text=True,
+                               encoding='utf-8',
+                               start_new_session=(os.name != 'nt'))
+    with _candado:
+        _procesos_activos.add(proceso)
+    return proceso
+
+
+def liberar_proceso(proceso):
+    with _candado:
+        _procesos_activos.discard(proceso)
+
+
+def matar_proceso(proceso):
+    """Mata MiniZinc junto con el solver hijo que haya lanzado"""
+    try:
+        if os.name == 'nt':
+            proceso.kill()
+        else:
+            os.killpg(proceso.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proceso.wait()
+
+
+def _analizar_resultado(codigo_retorno, stdout, tiempo_total, timeout_segundos):
+    """Construye el diccionario de análisis a partir de la salida de MiniZinc"""
+    analisis = {
+        'tiempo_ejecutado': round(tiempo_total, 2),
+        'codigo_retorno': codigo_retorno,
+        'timeout_alcanzado': tiempo_total >= timeout_segundos,
+        'es_problematico': False
+    }
+
+    if codigo_retorno != 0:
+        analisis['es_problematico'] = True
+        analisis['razon'] = 'Error de ejecución o infactible'
+    elif tiempo_total >= timeout_segundos * 0.9:
+        analisis['es_problematico'] = True
+        analisis['razon'] = 'Timeout o muy lento'
+    elif '=====UNSATISFIABLE=====' in stdout:
+        analisis['es_problematico'] = True
+        analisis['razon'] = 'Infactible'
+    elif '=====UNKNOWN=====' in stdout:
+        analisis['es_problematico'] = True
+        analisis['razon'] = 'No pudo resolver'
+
+    return analisis
+
+
+def _escribir_resultado(ruta_sol, analisis, stdout, stderr):
+    with open(ruta_sol, 'w', encoding='utf-8') as f:
+        f.write(f"=== ANÁLISIS AUTOMÁTICO ===\n")
+        f.write(f"Tiempo: {analisis['tiempo_ejecutado']}s\n")
+        f.write(f"Problemático: {analisis['es_problematico']}\n")
+        if 'razon' in analisis:
+            f.write(f"Razón: {analisis['razon']}\n")
+        f.write(f"\n=== SALIDA MINIZINC ===\n")
+        f.write(stdout)
+        if stderr:
+            f.write(f"\n=== ERRORES ===\n")
+            f.write(stderr)
+
+
+def escribir_resultado(ruta_sol, codigo_retorno, stdout, stderr, tiempo_total, timeout_segundos):
+    """Analiza la salida de MiniZinc, la escribe en ruta_sol con el análisis al inicio y devuelve el análisis"""
+    analisis = _analizar_resultado(codigo_retorno, stdout, tiempo_total, timeout_segundos)
+    _escribir_resultado(ruta_sol, analisis, stdout, stderr)
+    return analisis
+
+
+def _solucion_valida(solucion, tamaños):
+    if not solucion or not tamaños:
+        return False
+    nA, nD = tamaños
+    if solucion.get('nA', nA) != nA or solucion.get('nD', nD) != nD:
+        return False
+    return (len(solucion['y']) == nA and len(solucion['f_c']) == nA
+            and all(0 <= d <= nD for d in solucion['y']))
+
+
+def ejecutar_minizinc(ruta_dzn, ruta_sol, timeout_segundos=120,
+                      modelo=MODELO_POR_DEFECTO, solver=SOLVER_POR_DEFECTO, cache=True,
+                      cota_objetivo=None, arranque=True, archivos_extra=(), salida='texto',
+                      traza=None, registrar=True):
+    """
+    Ejecuta MiniZinc con timeout sobre una instancia y devuelve el análisis.
+    Con cache=True (o una CacheSoluciones) se reutiliza el resultado de una
+    ejecución anterior con el mismo modelo, datos, solver y límite de tiempo.
+    cota_objetivo (escalada, p. ej. de tools/heuristica.py) agrega
+    models/cota.mzn para podar las soluciones que no la mejoran.
+    archivos_extra: otros .mzn/.dzn que se agregan a la ejecución (p. ej.
+    models/vecindario.mzn y sus datos); su contenido entra en la clave.
+    modelo puede ser una ruta o el nombre de una de las FORMULACIONES.
+
+    arranque: solución inicial para el solver ({'y', 'f_c'} como la de
+    heuristica_greedy). Con True se usa la última solución guardada de la
+    instancia, si hay; con False no se usa ninguna. Ver tools/arranque.py.
+    La solución inicial no forma parte de la clave de la caché.
+
+    salida: 'texto' (el reporte del ítem output del modelo) o 'json' (una
+    línea JSON con los costos, los arcos activos y la demanda no satisfecha;
+    ver arranque.OPCIONES_SALIDA_COMPACTA), que evita armar el reporte en
+    las instancias grandes. En ambos casos la
+    solución se lee con arranque.solucion_desde_salida y el reporte de texto
+    se puede generar después con tools/reporte.py.
+
+    traza: ruta de un .jsonl donde se escriben en vivo las soluciones
+    intermedias y las estadísticas del solver (tools/traza.py). Implica la
+    salida json, no lee la caché de resultados (la traza es una medición) y
+    agrega al análisis 'traza' con el tiempo a la primera y a la mejor
+    solución y la integral primal.
+
+    registrar: agrega la ejecución (estado, objetivo, cota, tiempos,
+    estadísticas del solver, CPU y memoria) a tools/resultados_db.py. Los
+    aciertos de la caché no son ejecuciones y no se registran.
+    """
+    modelo = FORMULACIONES.get(modelo, modelo)
+    if cache is True:
+        cache = cache_por_defecto()
+
+    extras = list(archivos_extra)
+    if cota_objetivo is not None:
+        extras += [MODELO_COTA, '-D', f'cota_objetivo={int(cota_objetivo)}']
+    if traza:
+        extras += OPCIONES_TRAZA
+    elif salida == 'json':
+        extras += OPCIONES_SALIDA_COMPACTA
+    else:
+        extras += OPCIONES_SALIDA_TEXTO
+
+    clave = None
+    if cache and not traza:
+        try:
+            opciones = ['salida=json'] if salida == 'json' else []
+            if cota_objetivo is not None:
+                opciones.append(f"cota_objetivo={int(cota_objetivo)}|{cache.huella_modelo_vigente(MODELO_COTA)}")
+            opciones.extend(cache.huella_modelo_vigente(r) if r.endswith('.mzn') else huella_archivo(r)
+                            for r in archivos_extra)
+            clave = cache.clave(modelo, ruta_dzn, solver, timeout_segundos, '|'.join(opciones))
+        except OSError:
+            clave = None
+        entrada = cache.obtener(clave) if clave else None
+        if entrada is not None:
+            analisis = dict(entrada['analisis'], cache=True)
+            _escribir_resultado(ruta_sol, entrada['analisis'], entrada['stdout'], entrada['stderr'])
+            return analisis
+
+    tamaños = None
+    if cache or arranque or registrar:
+        try:
+            tamaños = tamaños_dzn(ruta_dzn)
+        except OSError:
+            pass
+    solucion_inicial = None
+    if isinstance(arranque, dict):
+        solucion_inicial = arranque
+    elif arranque and cache:
+        solucion_inicial = cache.obtener_previa(ruta_dzn)
+    if not _solucion_valida(solucion_inicial, tamaños):
+        solucion_inicial = None
+
+    with contextlib.ExitStack() as pila:
+        if solucion_inicial is None:
+            entradas = [modelo, ruta_dzn]
+        else:
+            # El modelo de arranque vive en una carpeta temporal e incluye red.mzn vía -I
+            carpeta = pila.enter_context(tempfile.TemporaryDirectory(prefix='arranque_'))
+            ruta_pista = os.path.join(carpeta, 'arranque.dzn')
+            with open(ruta_pista, 'w', encoding='utf-8') as f:
+                f.write(seccion_arranque(solucion_inicial, tamaños[1]))
+            entradas = ['-I', os.path.dirname(os.path.abspath(modelo)),
+                        modelo_con_arranque(modelo, solver, carpeta), ruta_dzn, ruta_pista]
+        modo_arranque = (None if solucion_inicial is None
+                         else 'warm_start' if soporta_warm_start(solver) else 'busqueda_guiada')
+        configuracion = None
+        if registrar:
+            configuracion = {'arranque': modo_arranque, 'cota_objetivo': cota_objetivo,
+                             'archivos_extra': [os.path.basename(r) for r in archivos_extra],
+                             'salida': 'json' if traza else salida}
+        return _ejecutar(entradas + extras, ruta_dzn, ruta_sol, timeout_segundos, modelo, solver,
+                         cache, clave, cota_objetivo, tamaños, modo_arranque, traza, configuracion)
+
+
+def _comunicar(proceso, timeout_segundos):
+    # Como communicate() pero sin esperar al proceso, para recogerlo con wait4
+    salidas = {}
+    lectores = [threading.Thread(target=lambda nombre, flujo: salidas.__setitem__(nombre, flujo.read()),
+                                 args=(nombre, flujo), daemon=True)
+                for nombre, flujo in (('stdout', proceso.stdout), ('stderr', proceso.stderr))]
+    for lector in lectores:
+        lector.start()
+    limite = time.time() + timeout_segundos
+    for lector in lectores:
+        lector.join(max(0.0, limite - time.time()))
+    if any(lector.is_alive() for lector in lectores):
+        raise subprocess.TimeoutExpired(proceso.args, timeout_segundos)
+    return salidas['stdout'], salidas['stderr']
+
+
+def _esperar_recursos(proceso):
+    """Espera el fin de MiniZinc y devuelve su CPU y memoria máxima (incluye el solver hijo)"""
+    if not hasattr(os, 'wait4'):
+        proceso.wait()
+        return {}
+    try:
+        _, estado, uso = os.wait4(proceso.pid, 0)
+    except ChildProcessError:
+        proceso.wait()
+        return {}
+    proceso.returncode = os.waitstatus_to_exitcode(estado)
+    # ru_maxrss está en KiB en Linux
+    return {'cpu_s': round(uso.ru_utime + uso.ru_stime, 3), 'memoria_max_mb': round(uso.ru_maxrss / 1024, 1)}
+
+
+def _leer_con_traza(proceso, ruta_traza, inicio, timeout_segundos, cabecera):
+    # La salida se lee línea a línea, así que el plazo lo vigila un temporizador
+    vencio = threading.Event()
+
+    def vencer():
+        vencio.set()
+        matar_proceso(proceso)
+
+    temporizador = threading.Timer(timeout_segundos, vencer)
+    temporizador.start()
+    try:
+        stdout, stderr = leer_flujo(proceso, ruta_traza, inicio, cabecera)
+    finally:
+        temporizador.cancel()
+    if vencio.is_set():
+        raise subprocess.TimeoutExpired(proceso.args, timeout_segundos)
+    return stdout, stderr
+
+
+def _ejecutar(entradas, ruta_dzn, ruta_sol, timeout_segundos, modelo, solver,
+              cache, clave, cota_objetivo, tamaños, modo_arranque, ruta_traza=None, configuracion=None):
+    comando = [
+        'minizinc',
+        '--solver', solver,
+        '--time-limit', str(timeout_segundos * 1000),  # MiniZinc usa milisegundos
+        '--statistics'
+    ] + entradas
+
+    try:
+        inicio = time.time()
+        proceso = lanzar_proceso(comando)
+        try:
+            if ruta_traza:
+                cabecera = {'instancia': os.path.abspath(ruta_dzn), 'modelo': modelo, 'solver': solver,
+                            'timeout_segundos': timeout_segundos, 'arranque': modo_arranque}
+                stdout, stderr = _leer_con_traza(proceso, ruta_traza, inicio, timeout_segundos + 10, cabecera)
+            else:
+                stdout, stderr = _comunicar(proceso, timeout_segundos + 10)
+            recursos = _esperar_recursos(proceso)
+        except subprocess.TimeoutExpired:
+            matar_proceso(proceso)
+            raise
+        finally:
+            liberar_proceso(proceso)
+
+        tiempo_total = time.time() - inicio
+        analisis = _analizar_resultado(proceso.returncode, stdout, tiempo_total, timeout_segundos)
+        if modo_arranque:
+            analisis['arranque'] = modo_arranque
+        if ruta_traza:
+            analisis['traza'] = metricas(leer_traza(ruta_traza), timeout_segundos)
+        _escribir_resultado(ruta_sol, analisis, stdout, stderr)
+
+        solucion = solucion_desde_salida(stdout, *tamaños) if tamaños and proceso.returncode == 0 else None
+        if cache and solucion is not None:
+            cache.guardar_previa(ruta_dzn, solucion, *tamaños)
+        if configuracion is not None:
+            datos = dict(estadisticas_salida(stdout), **recursos)
+            datos.update({k: v for k, v in analisis.get('traza', {}).items()
+                          if k in ('tiempo_primera', 'tiempo_mejor', 'integral_primal')})
+            datos.update(herramienta='minizinc', solver=solver, modelo=modelo, configuracion=configuracion,
+                         estado=estado_salida(proceso.returncode, stdout, solucion),
+                         objetivo_c=solucion['costo_total_c'] if solucion else None,
+                         tiempo=round(tiempo_total, 3), timeout_segundos=timeout_segundos)
+            registrar_ejecucion(ruta_dzn, datos)
+
+        # Solo se guardan ejecuciones que terminaron por sí mismas
+        if clave and proceso.returncode == 0:
+            cache.guardar(clave, {
+                'modelo': os.path.abspath(modelo),
+                'huella_modelo': cache.huella_modelo_vigente(modelo),
+                'dzn': os.path.abspath(ruta_dzn),
+                'solver': solver,
+                'timeout_segundos': timeout_segundos,
+                'cota_objetivo': cota_objetivo,
+                'analisis': analisis,
+                'stdout': stdout,
+                'stderr': stderr
+            })
+        return analisis
+
+    except subprocess.TimeoutExpired:
+        analisis = {
+            'tiempo_ejecutado': timeout_segundos,
+            'timeout_alcanzado': True,
+            'es_problematico': True,
+            'razon': 'Timeout forzado'
+        }
+        if configuracion is not None:
+            registrar_ejecucion(ruta_dzn, {'herramienta': 'minizinc', 'solver': solver, 'modelo': modelo,
+                                           'configuracion': configuracion, 'estado': 'TIMEOUT',
+                                           'tiempo': timeout_segundos, 'timeout_segundos': timeout_segundos})
+        with open(ruta_sol, 'w', encoding='utf-8') as f:
+            f.write("=== TIMEOUT FORZADO ===\n")
+            f.write(f"Excedió {timeout_segundos} segundos\n")
+        return analisis
+
+    except Exception as e:
+        analisis = {
+            'error': str(e),
+            'es_problematico': True,
+            'razon': f'Error de ejecución: {e}'
+        }
+        with open(ruta_sol, 'w', encoding='utf-8') as f:
+            f.write(f"=== ERROR ===\n{e}\n")
+        return analisis
+
+
+def ejecutar_lote(trabajos, timeout_segundos=60, max_procesos=None,
+                  modelo=MODELO_POR_DEFECTO, solver=SOLVER_POR_DEFECTO, cache=True, salida='texto',
+                  registrar=True):
+    """
+    Resuelve una lista de instancias (ruta_dzn, ruta_sol) en paralelo; un
+    tercer elemento opcional es un diccionario con argumentos extra de
+    ejecutar_minizinc para esa instancia (cota_objetivo, arranque).
+    salida ('texto' o 'json') y registrar valen para todas las instancias.
+    Como el trabajo lo hacen los procesos MiniZinc, basta con un pool de hilos
+    que limite cuántos procesos hijos corren a la vez. Devuelve los análisis
+    en el mismo orden que los trabajos.
+    """
+    trabajos = list(trabajos)
+    if max_procesos is None:
+        max_procesos = os.cpu_count() or 1
+    max_procesos = max(1, min(max_procesos, len(trabajos) or 1))
+
+    print(f"Ejecutando {len(trabajos)} instancias con {max_procesos} procesos "
+          f"(timeout {timeout_segundos}s c/u)...")
+
+    with ThreadPoolExecutor(max_workers=max_procesos) as pool:
+        futuros = [pool.submit(ejecutar_minizinc, ruta_dzn, ruta_sol, timeout_segundos, modelo, solver, cache,
+                               **dict({'salida': salida, 'registrar': registrar},
+                                      **(opciones[0] if opciones else {})))
+                   for ruta_dzn, ruta_sol, *opciones in trabajos]
+        try:
+            return [futuro.result() for futuro in futuros]
+        except KeyboardInterrupt:
+            for futuro in futuros:
+                futuro.cancel()
+            with _candado:
+                procesos = list(_procesos_activos)
+            for proceso in procesos:
+                matar_proceso(proceso)
+            raise
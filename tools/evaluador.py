@@ -0,0 +1,196 @@
+import heapq
+import sys
+import time
+
+from cotas import SCALE, capacidad_fuente, datos_escalados
+from dzn import leer_dzn
+from factibilidad import MAX_INSATISFECHA_C, PENALIZACION
+
+
+class EvaluadorDiseño:
+    """
+    Evalúa asignaciones de diámetros y (1..nD por arco, 0 = sin tubería)
+    con la misma aritmética entera de models/red.mzn: para y fijo resuelve
+    el flujo a costo mínimo exacto y devuelve flujos y costos escalados.
+
+    El grafo se arma una vez por instancia; cada evaluación solo cambia las
+    capacidades de los arcos. Fuente -> plantas (oferta), arcos de la red
+    (capacidad del diámetro, a lo sumo flow_ub, costo trans_cost_c) y
+    consumidores -> sumidero con costo -PENALIZACION: cada unidad que llega
+    ahorra su penalización. Se aumenta por caminos mínimos (Dijkstra con
+    potenciales) mientras el camino tenga costo negativo. La demanda que el
+    dominio de unmet_demand_c obliga a cubrir va por un arco aparte con
+    premio mayor que cualquier costo, así que se cubre primero; si aun así
+    falta, el diseño es infactible para el modelo. Los consumidores que
+    pueden emitir flujo (cotas.capacidad_fuente) reciben de la fuente con
+    costo PENALIZACION: solo conviene para cubrir demanda obligatoria.
+    """
+
+    def __init__(self, arreglos):
+        datos = datos_escalados(arreglos)
+        supply, demand = datos['supply'], datos['demand']
+        self.N = N = datos['N']
+        self.nP, self.nT = datos['nP'], datos['nT']
+        self.arc_from, self.arc_to = datos['arc_from'], datos['arc_to']
+        self.nA = nA = datos['nA']
+        self.nD = datos['nD']
+        self.trans_c, self.install_c = datos['trans_c'], datos['install_c']
+        self.capacidad_c = datos['capacidad_c']
+        self.flow_ub, self.allowed_diam = datos['flow_ub'], datos['allowed_diam']
+        self.demand = demand
+
+        # Premio de la demanda obligatoria: mayor que el costo de cualquier camino
+        self._premio_obligatorio = PENALIZACION + sum(self.trans_c) * 2 + 1
+
+        # Grafo residual: el arco e y su reverso son e y e^1 (como en factibilidad.py)
+        self.fuente, self.sumidero = 0, N + 1
+        self.adyacentes = [[] for _ in range(N + 2)]
+        self.destino, self.costo, self._capacidad_base = [], [], []
+        for u, v, c in zip(self.arc_from, self.arc_to, self.trans_c):
+            self._agregar(u, v, 0, c)  # capacidad según el diseño
+        emision = capacidad_fuente(supply, demand, self.nP, self.nT)
+        for i in range(1, N + 1):
+            if emision[i-1] > 0:
+                self._agregar(self.fuente, i, emision[i-1], PENALIZACION if i > self.nP else 0)
+        for i in range(self.nP + self.nT + 1, N + 1):
+            obligatoria = max(0, demand[i-1] - MAX_INSATISFECHA_C)
+            if obligatoria:
+                self._agregar(i, self.sumidero, obligatoria, -self._premio_obligatorio)
+            if demand[i-1] - obligatoria:
+                self._agregar(i, self.sumidero, demand[i-1] - obligatoria, -PENALIZACION)
+
+    def _agregar(self, u, v, capacidad, costo):
+        self.adyacentes[u].append(len(self.destino))
+        self.destino.append(v)
+        self.costo.append(costo)
+        self._capacidad_base.append(capacidad)
+        self.adyacentes[v].append(len(self.destino))
+        self.destino.append(u)
+        self.costo.append(-costo)
+        self._capacidad_base.append(0)
+
+    def _potenciales(self, capacidad):
+        """Distancias iniciales desde la fuente (Bellman-Ford con cola; hay costos negativos)"""
+        n = self.N + 2
+        distancia = [None] * n
+        distancia[self.fuente] = 0
+        cola = [self.fuente]
+        en_cola = [False] * n
+        while cola:
+            u = cola.pop()
+            en_cola[u] = False
+            for e in self.adyacentes[u]:
+                if capacidad[e] > 0:
+                    v = self.destino[e]
+                    d = distancia[u] + self.costo[e]
+                    if distancia[v] is None or d < distancia[v]:
+                        distancia[v] = d
+                        if not en_cola[v]:
+                            en_cola[v] = True
+                            cola.append(v)
+        return distancia
+
+    def evaluar(self, y):
+        """
+        Devuelve un diccionario con 'f_c', 'unmet_c' (por nodo), los costos
+        escalados (instalación, transporte, penalización, total) y
+        'factible'; si no es factible, 'razon' explica por qué.
+        """
+        if len(y) != self.nA:
+            raise ValueError(f'Se esperaban {self.nA} diámetros y llegaron {len(y)}')
+        capacidad = self._capacidad_base[:]
+        for a, d in enumerate(y):
+            if d:
+                if d not in self.allowed_diam[a]:
+                    return {'factible': False, 'razon': f'Diámetro {d} no permitido en el arco {a+1}'}
+                capacidad[2 * a] = min(self.capacidad_c[d-1], self.flow_ub[a])
+
+        # Los nodos que la fuente no alcanza nunca entran en un camino
+        potencial = [p if p is not None else 0 for p in self._potenciales(capacidad)]
+        n = self.N + 2
+        while True:
+            # Dijkstra con costos reducidos (no negativos gracias a los potenciales)
+            distancia = [None] * n
+            previo = [-1] * n
+            distancia[self.fuente] = 0
+            cola = [(0, self.fuente)]
+            while cola:
+                d, u = heapq.heappop(cola)
+                if d > distancia[u]:
+                    continue
+                for e in self.adyacentes[u]:
+                    if capacidad[e] <= 0:
+                        continue
+                    v = self.destino[e]
+                    nd = d + self.costo[e] + potencial[u] - potencial[v]
+                    if distancia[v] is None or nd < distancia[v]:
+                        distancia[v] = nd
+                        previo[v] = e
+                        heapq.heappush(cola, (nd, v))
+            if distancia[self.sumidero] is None:
+                break
+            tope = distancia[self.sumidero]
+            for v in range(n):
+                if distancia[v] is not None:
+                    potencial[v] += min(distancia[v], tope)
+            # Costo real del camino; si no es negativo, mandar más no mejora
+            if potencial[self.sumidero] - potencial[self.fuente] >= 0:
+                break
+            camino = []
+            v = self.sumidero
+            while v != self.fuente:
+                e = previo[v]
+                camino.append(e)
+                v = self.destino[e ^ 1]
+            aumento = min(capacidad[e] for e in camino)
+            for e in camino:
+                capacidad[e] -= aumento
+                capacidad[e ^ 1] += aumento
+
+        f_c = [capacidad[2 * a + 1] for a in range(self.nA)]
+        neto = [0] * (self.N + 1)
+        for a, f in enumerate(f_c):
+            neto[self.arc_to[a]] += f
+            neto[self.arc_from[a]] -= f
+        inicio_consumidores = self.nP + self.nT
+        unmet = [self.demand[i] - neto[i+1] if i >= inicio_consumidores else 0 for i in range(self.N)]
+        costo_instalacion = sum(self.install_c[a][d-1] for a, d in enumerate(y) if d)
+        costo_transporte = sum(c * f for c, f in zip(self.trans_c, f_c))
+        penalizacion = sum(unmet) * PENALIZACION
+        excedidos = [i + 1 for i, u in enumerate(unmet) if u > MAX_INSATISFECHA_C]
+        resultado = {
+            'f_c': f_c,
+            'unmet_c': unmet,
+            'costo_instalacion_c': costo_instalacion,
+            'costo_transporte_c': costo_transporte,
+            'penalizacion_c': penalizacion,
+            'costo_total_c': costo_instalacion + costo_transporte + penalizacion,
+            'factible': not excedidos
+        }
+        if excedidos:
+            resultado['razon'] = f'{len(excedidos)} nodos superan el máximo de demanda insatisfecha'
+        return resultado
+
+
+def evaluar_diseño(arreglos, y):
+    """Evaluación de un solo diseño; para muchos, reutilizar un EvaluadorDiseño"""
+    return EvaluadorDiseño(arreglos).evaluar(y)
+
+
+if __name__ == '__main__':
+    # Uso: python tools/evaluador.py instancia.dzn [...]
+    # Evalúa el diseño de la heurística greedy y mide evaluaciones por segundo
+    from heuristica import heuristica_greedy
+
+    for ruta in sys.argv[1:]:
+        arreglos = leer_dzn(ruta)
+        evaluador = EvaluadorDiseño(arreglos)
+        y = heuristica_greedy(arreglos)['y']
+        inicio = time.perf_counter()
+        repeticiones = 0
+        while time.perf_counter() - inicio < 1:
+            r = evaluador.evaluar(y)
+            repeticiones += 1
+        por_segundo = repeticiones / (time.perf_counter() - inicio)
+        print(f"{ruta}: costo {r['costo_total_c'] / SCALE:.2f} "
+              f"({'factible' if r['factible'] else r['razon']}) | {por_segundo:.0f} evaluaciones/s")
@@ -0,0 +1,171 @@
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+from scipy.sparse import vstack
+
+from cota_inferior import relajacion_lineal
+from dzn import leer_dzn
+from reporte import escribir_reporte, pesos, resultado_modelo
+
+_TERMINOS_POR_LINEA = 8  # el formato LP limita el largo de las líneas
+
+
+def modelo_lineal(arreglos):
+    """
+    Formulación de models/main_mip.mzn armada directo desde los arreglos,
+    sin aplanar con MiniZinc: la misma matriz dispersa de la relajación
+    lineal (tools/cota_inferior.py) con todas las columnas enteras. Columnas
+    y_a_d (binarias, solo diámetros permitidos), f_a (flujo escalado) y u_i
+    (demanda insatisfecha del consumidor i); filas diam_a, cap_a, oferta_i
+    y balance_i. Las filas sin coeficientes se omiten. Todo es lineal en la
+    cantidad de arcos.
+    """
+    costo, A_ub, b_ub, A_eq, b_eq, limites, columnas_y = relajacion_lineal(arreglos)
+    nA, nP, nT = len(arreglos['arc_from']), arreglos['nP'], arreglos['nT']
+    consumidores = range(nP + nT + 1, len(arreglos['supply']) + 1)
+    columnas = ([f'y_{a+1}_{d}' for a, d in columnas_y] + [f'f_{a+1}' for a in range(nA)]
+                + [f'u_{i}' for i in consumidores])
+    filas = ([f'diam_{a+1}' for a in range(nA)] + [f'cap_{a+1}' for a in range(nA)]
+             + [f'oferta_{i}' for i in range(1, nP + 1)]
+             + [f'balance_{i}' for i in range(nP + 1, len(arreglos['supply']) + 1)])
+    A = vstack([A_ub, A_eq]).tocsr()
+    no_vacias = np.flatnonzero(np.diff(A.indptr))
+    return {
+        'costo': costo,
+        'A': A[no_vacias],
+        'sentidos': np.array(['L'] * A_ub.shape[0] + ['E'] * A_eq.shape[0])[no_vacias],
+        'rhs': np.concatenate((b_ub, b_eq))[no_vacias],
+        'limites': limites,
+        'columnas': columnas,
+        'filas': [filas[k] for k in no_vacias]
+    }
+
+
+def _numero(valor):
+    return f'{valor:.15g}'
+
+
+def escribir_mps(ruta, modelo):
+    """MPS libre (nombres sin espacios); todas las columnas van entre marcadores enteros"""
+    A = modelo['A'].tocsc()
+    lineas = ['NAME red_tuberias', 'ROWS', ' N  COSTO']
+    lineas += [f" {s}  {nombre}" for s, nombre in zip(modelo['sentidos'], modelo['filas'])]
+    lineas += ['COLUMNS', "    MARKER  'MARKER'  'INTORG'"]
+    for j, nombre in enumerate(modelo['columnas']):
+        if modelo['costo'][j]:
+            lineas.append(f"    {nombre}  COSTO  {_numero(modelo['costo'][j])}")
+        for k in range(A.indptr[j], A.indptr[j+1]):
+            lineas.append(f"    {nombre}  {modelo['filas'][A.indices[k]]}  {_numero(A.data[k])}")
+    lineas += ["    MARKER  'MARKER'  'INTEND'", 'RHS']
+    lineas += [f"    RHS  {nombre}  {_numero(b)}" for nombre, b in zip(modelo['filas'], modelo['rhs']) if b]
+    lineas.append('BOUNDS')
+    lineas += [f" UP BND  {nombre}  {_numero(alto)}" for nombre, (_, alto) in zip(modelo['columnas'], modelo['limites'])]
+    lineas.append('ENDATA')
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lineas) + '\n')
+
+
+def _expresion(coeficientes, nombres):
+    terminos = [f"{'-' if c < 0 else '+'} {_numero(abs(c))} {n}" for c, n in zip(coeficientes, nombres)]
+    if terminos and terminos[0].startswith('+ '):
+        terminos[0] = terminos[0][2:]
+    return '\n   '.join(' '.join(terminos[k:k + _TERMINOS_POR_LINEA])
+                        for k in range(0, len(terminos), _TERMINOS_POR_LINEA))
+
+
+def escribir_lp(ruta, modelo):
+    """Formato LP de CPLEX (lo leen HiGHS, CBC, Gurobi, SCIP y GLPK)"""
+    A, columnas = modelo['A'], modelo['columnas']
+    operador = {'L': '<=', 'E': '='}
+    usadas = np.flatnonzero(modelo['costo'])
+    lineas = ['\\ Red de tuberías: formulación de models/main_mip.mzn', 'Minimize',
+              ' costo: ' + _expresion(modelo['costo'][usadas], [columnas[j] for j in usadas]), 'Subject To']
+    for k, nombre in enumerate(modelo['filas']):
+        inicio, fin = A.indptr[k], A.indptr[k+1]
+        lineas.append(f" {nombre}: {_expresion(A.data[inicio:fin], [columnas[j] for j in A.indices[inicio:fin]])}"
+                      f" {operador[modelo['sentidos'][k]]} {_numero(modelo['rhs'][k])}")
+    lineas.append('Bounds')
+    lineas += [f" 0 <= {nombre} <= {_numero(alto)}" for nombre, (_, alto) in zip(columnas, modelo['limites'])]
+    lineas.append('General')
+    lineas += [f" {nombre}" for nombre in columnas]
+    lineas.append('End')
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lineas) + '\n')
+
+
+def exportar(ruta_dzn, ruta_salida):
+    """Escribe la instancia en MPS o LP según la extensión; devuelve los tiempos (s)"""
+    inicio = time.perf_counter()
+    modelo = modelo_lineal(leer_dzn(ruta_dzn))
+    armado = time.perf_counter() - inicio
+    (escribir_lp if ruta_salida.endswith('.lp') else escribir_mps)(ruta_salida, modelo)
+    return {'columnas': len(modelo['columnas']), 'filas': len(modelo['filas']), 'no_ceros': modelo['A'].nnz,
+            'armado': round(armado, 3), 'total': round(time.perf_counter() - inicio, 3)}
+
+
+def leer_solucion(ruta_sol, arreglos):
+    """
+    Lee la solución que escribió el solver y la devuelve como un resultado
+    del modelo ('y', 'f_c', 'unmet_c', costos escalados y 'estado'). Basta
+    con que cada columna aparezca seguida de su valor en alguna línea, así
+    que sirven los .sol de HiGHS, CBC, Gurobi y SCIP; las columnas que no
+    aparecen valen 0 (CBC solo escribe las no nulas). Si el archivo repite
+    las columnas (duales de HiGHS) vale la primera aparición.
+    """
+    nA, nD = len(arreglos['arc_from']), len(arreglos['max_capacity'])
+    nP, nT, N = arreglos['nP'], arreglos['nT'], len(arreglos['supply'])
+    valores = {}
+    with open(ruta_sol, 'r', encoding='utf-8', errors='replace') as f:
+        texto = f.read()
+    for linea in texto.splitlines():
+        tokens = linea.split()
+        for k, token in enumerate(tokens[:-1]):
+            if re.fullmatch(r'[yfu](?:_\d+){1,2}', token) and token not in valores:
+                try:
+                    valores[token] = float(tokens[k+1])
+                except ValueError:
+                    pass
+                break
+    minusculas = texto.lower()
+    if 'infeasible' in minusculas:
+        return {'estado': 'INFACTIBLE'}
+
+    y = [next((d for d in range(1, nD + 1) if valores.get(f'y_{a+1}_{d}', 0) > 0.5), 0) for a in range(nA)]
+    f_c = [int(round(valores.get(f'f_{a+1}', 0))) for a in range(nA)]
+    unmet = [int(round(valores.get(f'u_{i}', 0))) if i > nP + nT else 0 for i in range(1, N + 1)]
+    return resultado_modelo(arreglos, 'OPTIMO' if 'optimal' in minusculas else 'SOLUCION', y, f_c, unmet)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporta la formulación MIP a MPS/LP sin aplanar con MiniZinc')
+    sub = parser.add_subparsers(dest='accion', required=True)
+
+    p = sub.add_parser('exportar', help='Escribe un .mps o .lp por instancia')
+    p.add_argument('instancias', nargs='+')
+    p.add_argument('--formato', choices=['mps', 'lp'], default='mps')
+    p.add_argument('--carpeta', default=os.path.join('resultados', 'mip'))
+
+    p = sub.add_parser('reporte', help='Convierte el .sol del solver al reporte del modelo')
+    p.add_argument('instancia')
+    p.add_argument('solucion')
+    p.add_argument('--salida', default=None, help='por defecto, el .sol con extensión .txt')
+
+    args = parser.parse_args()
+    if args.accion == 'exportar':
+        os.makedirs(args.carpeta, exist_ok=True)
+        for ruta in args.instancias:
+            nombre = os.path.splitext(os.path.basename(ruta))[0]
+            salida = os.path.join(args.carpeta, f'{nombre}.{args.formato}')
+            r = exportar(ruta, salida)
+            print(f"{salida}: {r['columnas']} columnas, {r['filas']} filas, {r['no_ceros']} no ceros "
+                  f"| armado {r['armado']}s, total {r['total']}s")
+    else:
+        arreglos = leer_dzn(args.instancia)
+        resultado = leer_solucion(args.solucion, arreglos)
+        salida = args.salida or os.path.splitext(args.solucion)[0] + '.txt'
+        escribir_reporte(salida, arreglos, resultado, 'RESULTADO DEL SOLVER MIP (MPS/LP)')
+        costo = pesos(resultado['costo_total_c']) if 'costo_total_c' in resultado else '-'
+        print(f"{salida}: {resultado['estado']} | costo {costo}")
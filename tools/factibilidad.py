@@ -0,0 +1,237 @@
+import sys
+import time
+from collections import deque
+
+from cotas import MAX_INSATISFECHA_C, SCALE, _escalar, capacidad_fuente
+from dzn import leer_dzn
+
+PENALIZACION = 1000  # factor de penalty_unmet_demand_c
+
+
+class _RedFlujo:
+    """Grafo residual para Dinic; el arco e y su reverso son e y e^1"""
+
+    def __init__(self, n):
+        self.n = n
+        self.adyacentes = [[] for _ in range(n)]
+        self.destino = []
+        self.capacidad = []
+
+    def agregar(self, u, v, capacidad):
+        self.adyacentes[u].append(len(self.destino))
+        self.destino.append(v)
+        self.capacidad.append(capacidad)
+        self.adyacentes[v].append(len(self.destino))
+        self.destino.append(u)
+        self.capacidad.append(0)
+        return len(self.destino) - 2
+
+    def _niveles(self, s, t):
+        nivel = [-1] * self.n
+        nivel[s] = 0
+        cola = deque([s])
+        while cola:
+            u = cola.popleft()
+            for e in self.adyacentes[u]:
+                v = self.destino[e]
+                if self.capacidad[e] > 0 and nivel[v] < 0:
+                    nivel[v] = nivel[u] + 1
+                    cola.append(v)
+        return nivel if nivel[t] >= 0 else None
+
+    def _bloqueante(self, s, t, nivel):
+        # DFS iterativo con punteros por nodo (las redes grandes exceden la recursión)
+        siguiente = [0] * self.n
+        total = 0
+        while True:
+            camino = []
+            u = s
+            while u != t:
+                ady = self.adyacentes[u]
+                avanzo = False
+                while siguiente[u] < len(ady):
+                    e = ady[siguiente[u]]
+                    v = self.destino[e]
+                    if self.capacidad[e] > 0 and nivel[v] == nivel[u] + 1:
+                        camino.append(e)
+                        u = v
+                        avanzo = True
+                        break
+                    siguiente[u] += 1
+                if not avanzo:
+                    if u == s:
+                        return total
+                    # Callejón sin salida: se descarta y se retrocede un arco
+                    nivel[u] = -1
+                    e = camino.pop()
+                    u = self.destino[e ^ 1]
+                    siguiente[u] += 1
+            aumento = min(self.capacidad[e] for e in camino)
+            for e in camino:
+                self.capacidad[e] -= aumento
+                self.capacidad[e ^ 1] += aumento
+            total += aumento
+
+    def flujo_maximo(self, s, t):
+        total = 0
+        while True:
+            nivel = self._niveles(s, t)
+            if nivel is None:
+                return total
+            total += self._bloqueante(s, t, nivel)
+
+    def lado_fuente(self, s):
+        """Nodos alcanzables desde s en el residual (lado s del corte mínimo)"""
+        visto = [False] * self.n
+        visto[s] = True
+        cola = deque([s])
+        while cola:
+            u = cola.popleft()
+            for e in self.adyacentes[u]:
+                v = self.destino[e]
+                if self.capacidad[e] > 0 and not visto[v]:
+                    visto[v] = True
+                    cola.append(v)
+        return visto
+
+
+def analizar_factibilidad(arreglos):
+    """
+    Flujo máximo en la red con capacidad por arco del mayor diámetro, oferta
+    de las plantas y demanda de los consumidores, todo escalado como en el
+    modelo. Devuelve un diccionario con:
+      clasificacion: FACTIBLE (toda la demanda se puede cubrir),
+                     DEMANDA_PARCIAL (solo con penalización),
+                     SIN_FLUJO (ninguna demanda alcanzable ni obligatoria: el
+                     óptimo es no instalar nada) o INFACTIBLE (algún nodo
+                     queda con más demanda insatisfecha que el dominio de
+                     unmet_demand_c aun con lo que pueden emitir los otros
+                     consumidores, ver cotas.capacidad_fuente);
+      demanda_maxima_satisfecha / demanda_insatisfecha_minima: cota exacta;
+      penalizacion_minima_c: cota inferior de penalty_unmet_demand_c;
+      corte: arcos, plantas y consumidores del corte mínimo (cuello de botella);
+      nodos_inalcanzables: consumidores sin camino desde una planta con oferta;
+      nodos_sin_holgura: consumidores a los que no llega el exceso de su
+                         demanda sobre MAX_INSATISFECHA_C.
+    """
+    inicio = time.perf_counter()
+    supply = [_escalar(s) for s in arreglos['supply']]
+    demand = [_escalar(d) for d in arreglos['demand']]
+    N = len(supply)
+    nP, nT = arreglos['nP'], arreglos['nT']
+    arc_from = [int(u) for u in arreglos['arc_from']]
+    arc_to = [int(v) for v in arreglos['arc_to']]
+    capacidad_arco = max(int(c) for c in arreglos['max_capacity']) * SCALE
+
+    # Nodo 0 = fuente, 1..N = red, N+1 = sumidero
+    fuente, sumidero = 0, N + 1
+    red = _RedFlujo(N + 2)
+    for u, v in zip(arc_from, arc_to):
+        red.agregar(u, v, capacidad_arco)
+    for i in range(1, nP + 1):
+        if supply[i-1] > 0:
+            red.agregar(fuente, i, supply[i-1])
+    consumidores = [i for i in range(nP + nT + 1, N + 1) if demand[i-1] > 0]
+    for i in consumidores:
+        red.agregar(i, sumidero, demand[i-1])
+
+    flujo = red.flujo_maximo(fuente, sumidero)
+    lado_s = red.lado_fuente(fuente)
+
+    # Consumidores alcanzables desde alguna planta con oferta (sin mirar capacidades)
+    sucesores = [[] for _ in range(N + 1)]
+    for u, v in zip(arc_from, arc_to):
+        sucesores[u].append(v)
+    alcanzado = [False] * (N + 1)
+    cola = deque(i for i in range(1, nP + 1) if supply[i-1] > 0)
+    for i in cola:
+        alcanzado[i] = True
+    while cola:
+        u = cola.popleft()
+        for v in sucesores[u]:
+            if not alcanzado[v]:
+                alcanzado[v] = True
+                cola.append(v)
+    inalcanzables = [i for i in consumidores if not alcanzado[i]]
+
+    # Factibilidad exacta: cada consumidor con más demanda que el dominio de
+    # unmet_demand_c tiene que recibir al menos el exceso, desde las plantas
+    # o desde otros consumidores que emiten flujo. Es factible si y solo si
+    # el flujo máximo satura todos esos excesos.
+    exceso = {i: demand[i-1] - MAX_INSATISFECHA_C for i in consumidores if demand[i-1] > MAX_INSATISFECHA_C}
+    sin_holgura = []
+    if exceso:
+        emision = capacidad_fuente(supply, demand, nP, nT)
+        obligatoria = _RedFlujo(N + 2)
+        for u, v in zip(arc_from, arc_to):
+            obligatoria.agregar(u, v, capacidad_arco)
+        for i in range(1, N + 1):
+            if emision[i-1] > 0:
+                obligatoria.agregar(fuente, i, emision[i-1])
+        arco_exceso = {i: obligatoria.agregar(i, sumidero, e) for i, e in exceso.items()}
+        obligatoria.flujo_maximo(fuente, sumidero)
+        sin_holgura = [i for i, e in arco_exceso.items() if obligatoria.capacidad[e] > 0]
+
+    demanda_total = sum(demand)
+    if sin_holgura:
+        clasificacion = 'INFACTIBLE'
+    elif flujo == demanda_total:
+        clasificacion = 'FACTIBLE'
+    elif flujo == 0 and not exceso:
+        clasificacion = 'SIN_FLUJO'
+    else:
+        clasificacion = 'DEMANDA_PARCIAL'
+
+    return {
+        'clasificacion': clasificacion,
+        'demanda_total': demanda_total / SCALE,
+        'demanda_maxima_satisfecha': flujo / SCALE,
+        'demanda_insatisfecha_minima': (demanda_total - flujo) / SCALE,
+        'penalizacion_minima_c': (demanda_total - flujo) * PENALIZACION,
+        'corte': {
+            'arcos': [a + 1 for a in range(len(arc_from))
+                      if lado_s[arc_from[a]] and not lado_s[arc_to[a]]],
+            'plantas': [i for i in range(1, nP + 1) if supply[i-1] > 0 and not lado_s[i]],
+            'consumidores': [i for i in consumidores if lado_s[i]]
+        },
+        'nodos_inalcanzables': inalcanzables,
+        'nodos_sin_holgura': sin_holgura,
+        'tiempo': round(time.perf_counter() - inicio, 4)
+    }
+
+
+def analisis_conocido(factibilidad):
+    """
+    Análisis equivalente al de ejecutar_minizinc para las instancias cuyo
+    resultado ya se conoce sin resolverlas; None si hay que ejecutar MiniZinc.
+    Una instancia SIN_FLUJO no es problemática: su óptimo es no instalar nada
+    y pagar la penalización de toda la demanda.
+    """
+    clasificacion = factibilidad['clasificacion']
+    analisis = {
+        'tiempo_ejecutado': 0.0,
+        'codigo_retorno': None,
+        'timeout_alcanzado': False,
+        'omitido': True
+    }
+    if clasificacion == 'INFACTIBLE':
+        analisis['es_problematico'] = True
+        analisis['razon'] = (f"Infactible: {len(factibilidad['nodos_sin_holgura'])} nodos superan el "
+                             f"máximo de demanda insatisfecha (flujo máximo)")
+    elif clasificacion == 'SIN_FLUJO':
+        analisis['es_problematico'] = False
+        analisis['razon'] = 'Óptimo conocido: ninguna demanda alcanzable desde las plantas (flujo máximo 0)'
+        analisis['costo_conocido_c'] = factibilidad['penalizacion_minima_c']
+    else:
+        return None
+    return analisis
+
+
+if __name__ == '__main__':
+    # Uso: python tools/factibilidad.py instancia.dzn [...]
+    for ruta in sys.argv[1:]:
+        r = analizar_factibilidad(leer_dzn(ruta))
+        print(f"{ruta}: {r['clasificacion']} | demanda {r['demanda_total']:.2f}, "
+              f"máx. satisfecha {r['demanda_maxima_satisfecha']:.2f}, "
+              f"corte {len(r['corte']['arcos'])} arcos, "
+              f"{len(r['nodos_inalcanzables'])} inalcanzables ({r['tiempo']}s)")
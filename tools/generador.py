@@ -1,10 +1,15 @@
-import random
 import numpy as np
 import os
+import sys
 import json
 
+from dzn import escribir_dzn
+from instancia import Instancia
+
 class GeneradorInstanciasGrupo5:
-    def __init__(self):
+    def __init__(self, rng=None):
+        # Cada generador usa su propio flujo aleatorio (ver tools/corpus.py)
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.diametros = ['D2', 'D3', 'D5']
         self.diametro_specs = {
             'D2': {'nominal_mm': 75, 'max_flujo': 795},
@@ -18,60 +23,49 @@ class GeneradorInstanciasGrupo5:
         self.rangos_instancias = {
             'pequeñas':    {'plantas': (2, 3), 'tanques': (5, 8), 'transbordo': (5, 8), 'finales': (8, 15)},
             'medianas':    {'plantas': (3, 5), 'tanques': (8, 15), 'transbordo': (8, 15), 'finales': (15, 30)},
-            'grandes':     {'plantas': (4, 6), 'tanques': (15, 30), 'transbordo': (20, 35), 'finales': (30, 60)}
+            'grandes':     {'plantas': (4, 6), 'tanques': (15, 30), 'transbordo': (20, 35), 'finales': (30, 60)},
+            # Niveles para medir cómo escala el solver (10^4 y 10^5 nodos)
+            'enormes':     {'plantas': (20, 50), 'tanques': (500, 1000), 'transbordo': (2000, 4000), 'finales': (5000, 8000)},
+            'gigantes':    {'plantas': (100, 200), 'tanques': (5000, 10000), 'transbordo': (20000, 40000), 'finales': (50000, 80000)}
         }
 
     def generar_demandas_balanceadas(self, num, factor_demanda=0.7):
         """Genera demandas más conservadoras para garantizar satisfacibilidad"""
-        base_demand = random.uniform(30, 80)  
-        demands = []
-        for _ in range(num):
-            variation = random.uniform(0.8, 1.2)
-            demand = round(base_demand * variation * factor_demanda, 2)
-            demands.append(max(20, demand))  
-        return demands
+        base_demand = self.rng.uniform(30, 80)
+        variation = self.rng.uniform(0.8, 1.2, num)
+        return np.maximum(20, np.round(base_demand * variation * factor_demanda, 2))
 
     def generar_costos_transporte(self, m):
         """Genera costos de transporte más razonables"""
-        return [round(max(1.0, np.random.normal(8, 2)), 2) for _ in range(m)]
-
-    def generar_topologia_conectada(self, nP, nT, nC1, nC2):
-        """Genera una topología que garantiza conectividad completa"""
-        pt = []
-
-        for p in range(nP):
-            pt.append((f"P{p}", f"T{random.randint(0, nT-1)}"))
-        
- 
-        for t in range(nT):
-            if not any(conn[1] == f"T{t}" for conn in pt):
-                pt.append((f"P{random.randint(0, nP-1)}", f"T{t}"))
-        
-        tc1 = []
-
-        for t in range(nT):
-            tc1.append((f"T{t}", f"C1_{random.randint(0, nC1-1)}"))
-        
-
-        for c in range(nC1):
-            if not any(conn[1] == f"C1_{c}" for conn in tc1):
-                tc1.append((f"T{random.randint(0, nT-1)}", f"C1_{c}"))
-        
-        c1c2 = []
-
-        for c in range(nC1):
-            c1c2.append((f"C1_{c}", f"C2_{random.randint(0, nC2-1)}"))
-        
+        return np.round(np.maximum(1.0, self.rng.normal(8, 2, m)), 2)
 
-        for f in range(nC2):
-            if not any(conn[1] == f"C2_{f}" for conn in c1c2):
-                c1c2.append((f"C1_{random.randint(0, nC1-1)}", f"C2_{f}"))
+    def _cubrir_capa(self, n_origen, n_destino):
+        """
+        Arcos de una capa: cada nodo de origen se conecta a un destino al azar
+        y luego cada destino que quedó sin arco entrante recibe uno desde un
+        origen al azar. Devuelve un arreglo (arcos, 2) con índices locales.
+        """
+        destinos = self.rng.integers(0, n_destino, n_origen)
+        cubierto = np.zeros(n_destino, dtype=bool)
+        cubierto[destinos] = True
+        sin_cubrir = np.flatnonzero(~cubierto)
+        origenes = self.rng.integers(0, n_origen, len(sin_cubrir))
+        return np.concatenate((np.column_stack((np.arange(n_origen), destinos)),
+                               np.column_stack((origenes, sin_cubrir))))
 
-        return pt, tc1, c1c2
+    def generar_topologia_conectada(self, nP, nT, nC1, nC2):
+        """
+        Genera una topología que garantiza conectividad completa: todo nodo
+        T, C1 y C2 tiene al menos un arco entrante y todo nodo P, T y C1 uno
+        saliente. O(arcos); cada capa es un arreglo de pares con índices locales.
+        """
+        return (self._cubrir_capa(nP, nT),
+                self._cubrir_capa(nT, nC1),
+                self._cubrir_capa(nC1, nC2))
 
     def calcular_suministro_adecuado(self, d1, d2, nP, factor_holgura=1.3):
         """Calcula suministro con suficiente holgura para satisfacibilidad"""
-        demanda_total = sum(d1) + sum(d2)
+        demanda_total = float(np.sum(d1) + np.sum(d2))
         suministro_por_planta = (demanda_total * factor_holgura) / nP
         return round(suministro_por_planta, 2)
 
@@ -88,9 +82,9 @@ class GeneradorInstanciasGrupo5:
 
     def generar_instancia(self, tam, idx):
         r = self.rangos_instancias[tam]
-        nP, nT, nC1, nC2 = (random.randint(*r[k]) for k in ['plantas', 'tanques', 'transbordo', 'finales'])
+        nP, nT, nC1, nC2 = (int(self.rng.integers(r[k][0], r[k][1] + 1)) for k in ['plantas', 'tanques', 'transbordo', 'finales'])
         
-        factor_demanda = {'pequeñas': 0.6, 'medianas': 0.7, 'grandes': 0.8}[tam]
+        factor_demanda = {'pequeñas': 0.6, 'medianas': 0.7}.get(tam, 0.8)
         d1 = self.generar_demandas_balanceadas(nC1, factor_demanda)
         d2 = self.generar_demandas_balanceadas(nC2, factor_demanda)
         
@@ -98,7 +92,7 @@ class GeneradorInstanciasGrupo5:
         pt, tc1, c1c2 = self.generar_topologia_conectada(nP, nT, nC1, nC2)
         
 
-        demanda_total = sum(d1) + sum(d2)
+        demanda_total = float(d1.sum() + d2.sum())
         self.validar_capacidades_flujo(pt, tc1, c1c2, demanda_total)
         
         M = len(pt) + len(tc1) + len(c1c2)
@@ -107,149 +101,59 @@ class GeneradorInstanciasGrupo5:
         
         sup = self.calcular_suministro_adecuado(d1, d2, nP)
 
-        def build_dict(conns, offs):
-            return {f"{a}->{b}": trans[i + offs] for i, (a, b) in enumerate(conns)}
-
-        c_pt = build_dict(pt, 0)
-        c_tc1 = build_dict(tc1, len(pt))
-        c_c1c2 = build_dict(c1c2, len(pt) + len(tc1))
-
-        nodos = {
-            'P': [f"P{i}" for i in range(nP)],
-            'T': [f"T{i}" for i in range(nT)],
-            'C1': [f"C1_{i}" for i in range(nC1)],
-            'C2': [f"C2_{i}" for i in range(nC2)]
-        }
-
-        inst = {
-            'metadata': {
-                'tamaño': tam, 
-                'numero': idx, 
-                'grupo': 5,
-                'demanda_total': round(demanda_total, 2),
-                'suministro_total': round(sup * nP, 2),
-                'factor_holgura': round((sup * nP) / demanda_total, 2),
-                'num_arcos': M,
-                'conectividad': {
-                    'plantas_tanques': len(pt),
-                    'tanques_transbordo': len(tc1),
-                    'transbordo_finales': len(c1c2)
-                }
-            },
-            'nodos': nodos,
-            'conexiones': {'pt': pt, 'tc1': tc1, 'c1c2': c1c2},
-            'param': {
-                'suministro': {f"P{i}": sup for i in range(nP)},
-                'd1': {n: d for n, d in zip(nodos['C1'], d1)},
-                'd2': {n: d for n, d in zip(nodos['C2'], d2)},
-                'costos': {'pt': c_pt, 'tc1': c_tc1, 'c1c2': c_c1c2}
+        metadata = {
+            'tamaño': tam, 
+            'numero': idx, 
+            'grupo': 5,
+            'demanda_total': round(demanda_total, 2),
+            'suministro_total': round(sup * nP, 2),
+            'factor_holgura': round((sup * nP) / demanda_total, 2),
+            'num_arcos': M,
+            'conectividad': {
+                'plantas_tanques': len(pt),
+                'tanques_transbordo': len(tc1),
+                'transbordo_finales': len(c1c2)
             }
         }
-        return inst
+        return Instancia.desde_capas(self, nP, nT, nC1, nC2, pt, tc1, c1c2, trans,
+                                     sup, d1, d2, metadata)
 
     def guardar_dzn(self, instancia, ruta):
         """
         Genera un archivo .dzn compatible con el modelo MiniZinc.
         Incluye parámetros adicionales para máximas capacidades.
         """
-
-        node_idx = {}
-        contador = 1
-        for grupo in ['P', 'T', 'C1', 'C2']:
-            for nodo in instancia['nodos'][grupo]:
-                node_idx[nodo] = contador
-                contador += 1
-
-
-        arcos = instancia['conexiones']['pt'] + instancia['conexiones']['tc1'] + instancia['conexiones']['c1c2']
-        arc_from = [node_idx[a] for (a,b) in arcos]
-        arc_to   = [node_idx[b] for (a,b) in arcos]
-        trans_costs = list(instancia['param']['costos']['pt'].values()) + \
-                      list(instancia['param']['costos']['tc1'].values()) + \
-                      list(instancia['param']['costos']['c1c2'].values())
-
-
-        N = contador - 1
-        supply = [0.0] * N
-        for nodo in instancia['nodos']['P']:
-            supply[node_idx[nodo]-1] = instancia['param']['suministro'][nodo]
-
-
-        demand = [0.0] * N
-        for nodo,val in instancia['param']['d1'].items():
-            demand[node_idx[nodo]-1] = val
-        for nodo,val in instancia['param']['d2'].items():
-            demand[node_idx[nodo]-1] = val
-        max_capacity = [self.diametro_specs[d]['max_flujo'] for d in self.diametros]
-
-
-        install_costs = []
-        for i in range(len(arcos)):
-            tipo = 'tipo_a' if i % 2 == 0 else 'tipo_b'
-            install_costs.append([self.costos_instalacion[tipo][d] for d in self.diametros])
-
-
-        with open(ruta, 'w') as f:
-
-            f.write(f"nP = {len(instancia['nodos']['P'])};\n")
-            f.write(f"nT = {len(instancia['nodos']['T'])};\n")
-            f.write(f"nC1 = {len(instancia['nodos']['C1'])};\n")
-            f.write(f"nC2 = {len(instancia['nodos']['C2'])};\n")
-            f.write(f"nA = {len(arcos)};\n")
-            f.write(f"nD = {len(self.diametros)};\n\n")
-
-            f.write("arc_from = [" + ", ".join(map(str, arc_from)) + "];\n")
-            f.write("arc_to = [" + ", ".join(map(str, arc_to)) + "];\n\n")
-
-
-            f.write("supply = [" + ", ".join(f"{s:.2f}" for s in supply) + "];\n")
-            f.write("demand = [" + ", ".join(f"{d:.2f}" for d in demand) + "];\n\n")
-
-
-            f.write("max_capacity = [" + ", ".join(f"{c}" for c in max_capacity) + "];\n\n")
-
-            f.write("install_cost = array2d(1..nA, 1..nD, [\n")
-            for i, row in enumerate(install_costs):
-                f.write("  " + ", ".join(f"{c}" for c in row))
-                if i < len(install_costs) - 1:
-                    f.write(",\n")
-                else:
-                    f.write("\n")
-            f.write("]);\n\n")
-
-            f.write("trans_cost = [" + ", ".join(f"{c:.2f}" for c in trans_costs) + "];\n\n")
-
-
-            f.write(f"% Metadata: {instancia['metadata']}\n")
-            f.write(f"% Total supply: {sum(supply):.2f}\n")
-            f.write(f"% Total demand: {sum(demand):.2f}\n")
-            f.write(f"% Balance factor: {sum(supply)/max(sum(demand),1):.2f}\n")
+        supply_total = sum(instancia.supply.tolist())
+        demand_total = sum(instancia.demand.tolist())
+        pie = (f"\n% Metadata: {instancia.metadata}\n"
+               f"% Total supply: {supply_total:.2f}\n"
+               f"% Total demand: {demand_total:.2f}\n"
+               f"% Balance factor: {supply_total/max(demand_total,1):.2f}\n")
+        escribir_dzn(ruta, instancia, pie=pie)
 
     def generar_reporte_instancia(self, instancia, ruta_reporte):
         """Genera un reporte detallado de la instancia para análisis"""
         with open(ruta_reporte, 'w') as f:
             f.write("=== REPORTE DE INSTANCIA ===\n\n")
-            f.write(f"Metadata: {instancia['metadata']}\n\n")
+            f.write(f"Metadata: {instancia.metadata}\n\n")
             
             f.write("BALANCE OFERTA-DEMANDA:\n")
-            supply_total = sum(instancia['param']['suministro'].values())
-            demand_total = sum(instancia['param']['d1'].values()) + sum(instancia['param']['d2'].values())
+            supply_total = instancia.supply.sum()
+            demand_total = instancia.demand.sum()
             f.write(f"  Suministro total: {supply_total:.2f}\n")
             f.write(f"  Demanda total: {demand_total:.2f}\n")
             f.write(f"  Factor de holgura: {supply_total/demand_total:.2f}\n\n")
             
             f.write("CONECTIVIDAD:\n")
-            f.write(f"  Plantas -> Tanques: {len(instancia['conexiones']['pt'])} conexiones\n")
-            f.write(f"  Tanques -> Transbordo: {len(instancia['conexiones']['tc1'])} conexiones\n")
-            f.write(f"  Transbordo -> Finales: {len(instancia['conexiones']['c1c2'])} conexiones\n\n")
-
+            f.write(f"  Plantas -> Tanques: {len(instancia.pt.arc_from)} conexiones\n")
+            f.write(f"  Tanques -> Transbordo: {len(instancia.tc1.arc_from)} conexiones\n")
+            f.write(f"  Transbordo -> Finales: {len(instancia.c1c2.arc_from)} conexiones\n\n")
 
 if __name__=='__main__':
-    random.seed(42)
-    np.random.seed(42)
-    gen = GeneradorInstanciasGrupo5()
+    # Uso: python tools/generador.py [tamaño ...]  (por defecto pequeñas, medianas y grandes)
+    gen = GeneradorInstanciasGrupo5(np.random.default_rng(42))
     
-    for tam in ['pequeñas','medianas','grandes']:
+    for tam in sys.argv[1:] or ['pequeñas','medianas','grandes']:
         carpeta = f'instancias/{tam}'
         carpeta_reportes = f'reportes/{tam}'
         os.makedirs(carpeta, exist_ok=True)
@@ -266,7 +170,7 @@ if __name__=='__main__':
             ruta_reporte = os.path.join(carpeta_reportes, f"reporte_{tam[:-1]}_{i}.txt")
             gen.generar_reporte_instancia(inst, ruta_reporte)
             
-            metadata = inst['metadata']
+            metadata = inst.metadata
             print(f"  Instancia {i}: Factor holgura = {metadata['factor_holgura']:.2f}, "
                   f"Arcos = {metadata['num_arcos']}, "
                   f"Demanda = {metadata['demanda_total']:.2f}")
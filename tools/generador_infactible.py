@@ -1,12 +1,17 @@
-import random
 import numpy as np
 import os
 import json
-import subprocess
-import time
+
+from ejecutor import ejecutar_minizinc, ejecutar_lote
+from factibilidad import analizar_factibilidad, analisis_conocido
+from heuristica import heuristica_greedy
+from dzn import escribir_dzn
+from instancia import Instancia
+from presolve import presolve, guardar_dzn_reducido, guardar_mapeo
 
 class GeneradorProblematico:
-    def __init__(self):
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.diametros = ['D2', 'D3', 'D5']
         self.diametro_specs = {
             'D2': {'nominal_mm': 75, 'max_flujo': 795},
@@ -42,8 +47,8 @@ class GeneradorProblematico:
         nP, nT, nC1, nC2 = 4, 1, 6, 10  # Solo 1 nodo intermedio T
         
         # Demandas altas que deben pasar por el único nodo T
-        d1 = [round(random.uniform(500, 800), 2) for _ in range(nC1)]
-        d2 = [round(random.uniform(600, 900), 2) for _ in range(nC2)]
+        d1 = [round(self.rng.uniform(500, 800), 2) for _ in range(nC1)]
+        d2 = [round(self.rng.uniform(600, 900), 2) for _ in range(nC2)]
         
         # Suministro distribuido pero insuficiente para el cuello de botella
         sup = round(sum(d1 + d2) * 0.8 / nP, 2)
@@ -55,8 +60,8 @@ class GeneradorProblematico:
         nP, nT, nC1, nC2 = 3, 4, 5, 7
         
         # Demandas moderadas
-        d1 = [round(random.uniform(80, 150), 2) for _ in range(nC1)]
-        d2 = [round(random.uniform(100, 180), 2) for _ in range(nC2)]
+        d1 = [round(self.rng.uniform(80, 150), 2) for _ in range(nC1)]
+        d2 = [round(self.rng.uniform(100, 180), 2) for _ in range(nC2)]
         
         # Suministro adecuado
         sup = round(sum(d1 + d2) * 1.1 / nP, 2)
@@ -68,8 +73,8 @@ class GeneradorProblematico:
         nP, nT, nC1, nC2 = 3, 5, 6, 8
         
         # Demandas altas en nodos que serán aislados
-        d1 = [round(random.uniform(200, 400), 2) for _ in range(nC1)]
-        d2 = [round(random.uniform(300, 500), 2) for _ in range(nC2)]
+        d1 = [round(self.rng.uniform(200, 400), 2) for _ in range(nC1)]
+        d2 = [round(self.rng.uniform(300, 500), 2) for _ in range(nC2)]
         
         # Suministro suficiente si hubiera conectividad
         sup = round(sum(d1 + d2) * 1.2 / nP, 2)
@@ -81,8 +86,8 @@ class GeneradorProblematico:
         nP, nT, nC1, nC2 = 6, 10, 15, 25  # Problema muy grande
         
         # Patrones de demanda complejos y variables
-        d1 = [round(random.uniform(10, 500), 2) for _ in range(nC1)]
-        d2 = [round(random.uniform(20, 600), 2) for _ in range(nC2)]
+        d1 = [round(self.rng.uniform(10, 500), 2) for _ in range(nC1)]
+        d2 = [round(self.rng.uniform(20, 600), 2) for _ in range(nC2)]
         
         # Suministro en el límite exacto
         sup = round(sum(d1 + d2) * 1.001 / nP, 2)  # Apenas suficiente
@@ -94,8 +99,8 @@ class GeneradorProblematico:
         nP, nT, nC1, nC2 = 2, 3, 4, 6
         
         # Demandas que requieren capacidades específicas conflictivas
-        d1 = [round(random.uniform(800, 1200), 2) for _ in range(nC1)]  # Requieren D5
-        d2 = [round(random.uniform(50, 100), 2) for _ in range(nC2)]    # Pueden usar D2
+        d1 = [round(self.rng.uniform(800, 1200), 2) for _ in range(nC1)]  # Requieren D5
+        d2 = [round(self.rng.uniform(50, 100), 2) for _ in range(nC2)]    # Pueden usar D2
         
         # Suministro ajustado para crear tensión
         sup = round(sum(d1 + d2) * 1.05 / nP, 2)
@@ -105,23 +110,23 @@ class GeneradorProblematico:
     def _crear_instancia_base(self, idx, nP, nT, nC1, nC2, d1, d2, sup, tipo, fragmentar=False):
         """Crea la estructura base de una instancia"""
         # Generar conexiones completas inicialmente
-        pt = [(f"P{p}", f"T{t}") for p in range(nP) for t in range(nT)]
-        tc1 = [(f"T{t}", f"C1_{c}") for t in range(nT) for c in range(nC1)]
-        c1c2 = [(f"C1_{c}", f"C2_{f}") for c in range(nC1) for f in range(nC2)]
+        pt = [(p, t) for p in range(nP) for t in range(nT)]
+        tc1 = [(t, c) for t in range(nT) for c in range(nC1)]
+        c1c2 = [(c, f) for c in range(nC1) for f in range(nC2)]
         
         # Aplicar fragmentación específica según el tipo de problema
         if fragmentar or tipo == "TOPOLOGIA_IMPOSIBLE":
             # Eliminar conexiones críticas para aislar nodos
             if len(pt) > 2:
-                pt = random.sample(pt, max(1, len(pt) // 3))  # Eliminar 2/3 de conexiones P-T
+                pt = self._muestra(pt, max(1, len(pt) // 3))  # Eliminar 2/3 de conexiones P-T
             
             if len(tc1) > 2:
-                tc1 = random.sample(tc1, max(1, len(tc1) // 2))  # Eliminar 1/2 de conexiones T-C1
+                tc1 = self._muestra(tc1, max(1, len(tc1) // 2))  # Eliminar 1/2 de conexiones T-C1
             
             # Aislar completamente algunos nodos C2 de alta demanda
             if nC2 > 3:
-                nodos_aislados = random.sample(range(nC2), min(3, nC2 // 2))
-                c1c2 = [arc for arc in c1c2 if not any(arc[1] == f'C2_{n}' for n in nodos_aislados)]
+                nodos_aislados = self._muestra(range(nC2), min(3, nC2 // 2))
+                c1c2 = [arc for arc in c1c2 if arc[1] not in nodos_aislados]
                 print(f"Nodos C2 aislados: {[f'C2_{n}' for n in nodos_aislados]}")
         
         M = len(pt) + len(tc1) + len(c1c2)
@@ -129,54 +134,37 @@ class GeneradorProblematico:
         # Generar costos según el tipo de problema
         if tipo == "COSTOS_PROHIBITIVOS":
             # Costos extremadamente altos
-            trans = [round(random.uniform(5000, 20000), 2) for _ in range(M)]
+            trans = [round(self.rng.uniform(5000, 20000), 2) for _ in range(M)]
         elif tipo == "RESTRICCIONES_CONFLICTIVAS":
             # Costos que favorecen capacidades pequeñas pero necesitamos grandes
-            trans = [round(random.uniform(1, 5), 2) for _ in range(M)]  # Muy baratos
+            trans = [round(self.rng.uniform(1, 5), 2) for _ in range(M)]  # Muy baratos
         else:
             # Costos normales con variabilidad
-            trans = [round(max(0.5, np.random.normal(8, 3)), 2) for _ in range(M)]
-        
-        def build_dict(conns, offs):
-            return {(a, b): trans[i + offs] for i, (a, b) in enumerate(conns)}
-        
-        c_pt = build_dict(pt, 0)
-        c_tc1 = build_dict(tc1, len(pt))
-        c_c1c2 = build_dict(c1c2, len(pt) + len(tc1))
-        
-        nodos = {
-            'P': [f"P{i}" for i in range(nP)],
-            'T': [f"T{i}" for i in range(nT)],
-            'C1': [f"C1_{i}" for i in range(nC1)],
-            'C2': [f"C2_{i}" for i in range(nC2)]
-        }
+            trans = [round(max(0.5, self.rng.normal(8, 3)), 2) for _ in range(M)]
         
         demanda_total = sum(d1) + sum(d2)
         suministro_total = sup * nP
         
-        return {
-            'metadata': {
-                'tamaño': self._clasificar_tamaño(M, nP + nT + nC1 + nC2),
-                'numero': idx,
-                'tipo_problema': tipo,
-                'demanda_total': round(demanda_total, 2),
-                'suministro_total': round(suministro_total, 2),
-                'factor_holgura': round(suministro_total / demanda_total, 2) if demanda_total > 0 else 0,
-                'num_arcos': M,
-                'nodos_totales': nP + nT + nC1 + nC2,
-                'densidad_conexion': round(M / ((nP + nT + nC1 + nC2) ** 2), 4),
-                'es_problematico': True,
-                'razon_problematico': self._explicar_problema(tipo, demanda_total, suministro_total, M)
-            },
-            'nodos': nodos,
-            'conexiones': {'pt': pt, 'tc1': tc1, 'c1c2': c1c2},
-            'param': {
-                'suministro': {f"P{i}": sup for i in range(nP)},
-                'd1': {n: d for n, d in zip(nodos['C1'], d1)},
-                'd2': {n: d for n, d in zip(nodos['C2'], d2)},
-                'costos': {'pt': c_pt, 'tc1': c_tc1, 'c1c2': c_c1c2}
-            }
+        metadata = {
+            'tamaño': self._clasificar_tamaño(M, nP + nT + nC1 + nC2),
+            'numero': idx,
+            'tipo_problema': tipo,
+            'demanda_total': round(demanda_total, 2),
+            'suministro_total': round(suministro_total, 2),
+            'factor_holgura': round(suministro_total / demanda_total, 2) if demanda_total > 0 else 0,
+            'num_arcos': M,
+            'nodos_totales': nP + nT + nC1 + nC2,
+            'densidad_conexion': round(M / ((nP + nT + nC1 + nC2) ** 2), 4),
+            'es_problematico': True,
+            'razon_problematico': self._explicar_problema(tipo, demanda_total, suministro_total, M)
         }
+        return Instancia.desde_capas(self, nP, nT, nC1, nC2, pt, tc1, c1c2, trans,
+                                     sup, d1, d2, metadata)
+
+    def _muestra(self, elementos, k):
+        """k elementos distintos al azar, en orden aleatorio (como random.sample)"""
+        elementos = list(elementos)
+        return [elementos[j] for j in self.rng.choice(len(elementos), k, replace=False)]
 
     def _clasificar_tamaño(self, num_arcos, num_nodos):
         """Clasifica el tamaño del problema"""
@@ -201,106 +189,18 @@ class GeneradorProblematico:
         }
         return explicaciones.get(tipo, 'Problema diseñado para ser difícil')
 
-    def validar_numero(self, num):
-        """Valida y formatea números para MiniZinc"""
-        if isinstance(num, (int, float)):
-            if abs(num - round(num)) < 1e-10:  # Es prácticamente un entero
-                return str(int(round(num)))
-            else:
-                return f"{num:.2f}"
-        return str(num)
-
     def guardar_dzn(self, instancia, ruta):
         """Guarda la instancia en formato .dzn para MiniZinc"""
-        # Crear mapeo de nodos a índices
-        node_idx = {}
-        contador = 1
-        for grupo in ['P', 'T', 'C1', 'C2']:
-            for nodo in instancia['nodos'][grupo]:
-                node_idx[nodo] = contador
-                contador += 1
-        
-        # Crear listas de arcos
-        arcos = (instancia['conexiones']['pt'] + 
-                instancia['conexiones']['tc1'] + 
-                instancia['conexiones']['c1c2'])
-        
-        arc_from = [node_idx[a] for (a, b) in arcos]
-        arc_to = [node_idx[b] for (a, b) in arcos]
-        
-        # Costos de transporte
-        trans_costs = (list(instancia['param']['costos']['pt'].values()) + 
-                      list(instancia['param']['costos']['tc1'].values()) + 
-                      list(instancia['param']['costos']['c1c2'].values()))
-        
-        N = contador - 1
-        
-        # Arrays de suministro y demanda
-        supply = [0.0] * N
-        demand = [0.0] * N
-        
-        for nodo in instancia['nodos']['P']:
-            supply[node_idx[nodo]-1] = instancia['param']['suministro'][nodo]
-        
-        for nodo, val in instancia['param']['d1'].items():
-            demand[node_idx[nodo]-1] = val
-        
-        for nodo, val in instancia['param']['d2'].items():
-            demand[node_idx[nodo]-1] = val
-        
-        # Capacidades máximas por diámetro
-        max_capacity = [self.diametro_specs[d]['max_flujo'] for d in self.diametros]
-        
-        # Costos de instalación por arco y diámetro
-        install_costs = []
-        for i in range(len(arcos)):
-            tipo = 'tipo_a' if i % 2 == 0 else 'tipo_b'
-            install_costs.append([self.costos_instalacion[tipo][d] for d in self.diametros])
-        
-        # Escribir archivo .dzn
+        metadata = instancia.metadata
+        cabecera = (f"% Instancia problemática tipo: {metadata['tipo_problema']}\n"
+                    f"% Razón: {metadata['razon_problematico']}\n"
+                    f"% Demanda total: {metadata['demanda_total']}\n"
+                    f"% Suministro total: {metadata['suministro_total']}\n"
+                    f"% Factor holgura: {metadata['factor_holgura']}\n\n")
         try:
-            with open(ruta, 'w', encoding='utf-8') as f:
-                # Comentario de metadata
-                f.write(f"% Instancia problemática tipo: {instancia['metadata']['tipo_problema']}\n")
-                f.write(f"% Razón: {instancia['metadata']['razon_problematico']}\n")
-                f.write(f"% Demanda total: {instancia['metadata']['demanda_total']}\n")
-                f.write(f"% Suministro total: {instancia['metadata']['suministro_total']}\n")
-                f.write(f"% Factor holgura: {instancia['metadata']['factor_holgura']}\n\n")
-                
-                # Parámetros básicos
-                f.write(f"nP = {len(instancia['nodos']['P'])};\n")
-                f.write(f"nT = {len(instancia['nodos']['T'])};\n")
-                f.write(f"nC1 = {len(instancia['nodos']['C1'])};\n")
-                f.write(f"nC2 = {len(instancia['nodos']['C2'])};\n")
-                f.write(f"nA = {len(arcos)};\n")
-                f.write(f"nD = {len(self.diametros)};\n\n")
-                
-                # Arrays de arcos
-                f.write("arc_from = [" + ", ".join(str(x) for x in arc_from) + "];\n")
-                f.write("arc_to = [" + ", ".join(str(x) for x in arc_to) + "];\n\n")
-                
-                # Arrays de suministro y demanda
-                f.write("supply = [" + ", ".join(self.validar_numero(s) for s in supply) + "];\n")
-                f.write("demand = [" + ", ".join(self.validar_numero(d) for d in demand) + "];\n\n")
-                
-                # Capacidades máximas
-                f.write("max_capacity = [" + ", ".join(str(c) for c in max_capacity) + "];\n\n")
-                
-                # Costos de instalación
-                f.write("install_cost = array2d(1..nA, 1..nD, [\n")
-                for i, row in enumerate(install_costs):
-                    f.write("  " + ", ".join(str(c) for c in row))
-                    if i < len(install_costs) - 1:
-                        f.write(",\n")
-                    else:
-                        f.write("\n")
-                f.write("]);\n\n")
-                
-                # Costos de transporte
-                f.write("trans_cost = [" + ", ".join(self.validar_numero(c) for c in trans_costs) + "];\n")
-                
+            # Reales enteros sin decimales y el resto con 2 decimales
+            escribir_dzn(ruta, instancia, cabecera=cabecera, reales='compacto')
             print(f"Archivo .dzn creado: {ruta}")
-            
         except Exception as e:
             print(f"Error escribiendo archivo .dzn: {e}")
             raise
@@ -309,94 +209,25 @@ class GeneradorProblematico:
         """Guarda metadata en JSON para análisis"""
         try:
             with open(ruta, 'w', encoding='utf-8') as f:
-                json.dump(instancia['metadata'], f, indent=2, ensure_ascii=False)
+                json.dump(instancia.metadata, f, indent=2, ensure_ascii=False)
             print(f"Metadata guardada: {ruta}")
         except Exception as e:
             print(f"Error guardando metadata: {e}")
 
     def ejecutar_minizinc_con_timeout(self, ruta_dzn, ruta_sol, timeout_segundos=120):
         """Ejecuta MiniZinc con timeout para detectar problemas"""
-        comando = [
-            'minizinc', 
-            '--solver', 'org.gecode.gecode',
-            '--output-to-file', ruta_sol,
-            '--time-limit', str(timeout_segundos * 1000),  # MiniZinc usa milisegundos
-            '--statistics',
-            'models/main.mzn',  # Asume que tienes tu modelo en models/main.mzn
-            ruta_dzn
-        ]
-        
-        try:
-            print(f"Ejecutando MiniZinc con timeout de {timeout_segundos}s...")
-            inicio = time.time()
-            
-            resultado = subprocess.run(comando, 
-                                     capture_output=True, 
-                                     text=True, 
-                                     timeout=timeout_segundos + 10)
-            
-            tiempo_total = time.time() - inicio
-            
-            # Analizar resultado
-            analisis = {
-                'tiempo_ejecutado': round(tiempo_total, 2),
-                'codigo_retorno': resultado.returncode,
-                'timeout_alcanzado': tiempo_total >= timeout_segundos,
-                'es_problematico': False
-            }
-            
-            if resultado.returncode != 0:
-                analisis['es_problematico'] = True
-                analisis['razon'] = 'Error de ejecución o infactible'
-            elif tiempo_total >= timeout_segundos * 0.9:
-                analisis['es_problematico'] = True
-                analisis['razon'] = 'Timeout o muy lento'
-            elif '=====UNSATISFIABLE=====' in resultado.stdout:
-                analisis['es_problematico'] = True
-                analisis['razon'] = 'Infactible'
-            elif '=====UNKNOWN=====' in resultado.stdout:
-                analisis['es_problematico'] = True
-                analisis['razon'] = 'No pudo resolver'
-            
-            # Escribir resultado completo
-            with open(ruta_sol, 'w', encoding='utf-8') as f:
-                f.write(f"=== ANÁLISIS AUTOMÁTICO ===\n")
-                f.write(f"Tiempo: {analisis['tiempo_ejecutado']}s\n")
-                f.write(f"Problemático: {analisis['es_problematico']}\n")
-                if 'razon' in analisis:
-                    f.write(f"Razón: {analisis['razon']}\n")
-                f.write(f"\n=== SALIDA MINIZINC ===\n")
-                f.write(resultado.stdout)
-                if resultado.stderr:
-                    f.write(f"\n=== ERRORES ===\n")
-                    f.write(resultado.stderr)
-            
-            return analisis
-            
-        except subprocess.TimeoutExpired:
-            analisis = {
-                'tiempo_ejecutado': timeout_segundos,
-                'timeout_alcanzado': True,
-                'es_problematico': True,
-                'razon': 'Timeout forzado'
-            }
-            with open(ruta_sol, 'w', encoding='utf-8') as f:
-                f.write("=== TIMEOUT FORZADO ===\n")
-                f.write(f"Excedió {timeout_segundos} segundos\n")
-            return analisis
-            
-        except Exception as e:
-            analisis = {
-                'error': str(e),
-                'es_problematico': True,
-                'razon': f'Error de ejecución: {e}'
-            }
-            with open(ruta_sol, 'w', encoding='utf-8') as f:
-                f.write(f"=== ERROR ===\n{e}\n")
-            return analisis
+        print(f"Ejecutando MiniZinc con timeout de {timeout_segundos}s...")
+        return ejecutar_minizinc(ruta_dzn, ruta_sol, timeout_segundos)
 
-    def ejecutar_experimento_completo(self, num_instancias_por_tipo=2):
-        """Ejecuta experimento completo con diferentes tipos de instancias problemáticas"""
+    def ejecutar_experimento_completo(self, num_instancias_por_tipo=2, max_procesos=None, aplicar_presolve=True,
+                                      omitir_conocidas=True, usar_heuristica=True):
+        """
+        Ejecuta experimento completo con diferentes tipos de instancias problemáticas.
+        Con omitir_conocidas=True no se ejecuta MiniZinc en las instancias cuyo
+        resultado ya demuestra el análisis de flujo máximo (infactibles o sin flujo).
+        Con usar_heuristica=True la solución de la heurística greedy se pasa a
+        MiniZinc como arranque y su costo como cota del objetivo.
+        """
         
         tipos_generadores = [
             ("infactible_demanda", self.generar_instancia_infactible_demanda),
@@ -410,16 +241,19 @@ class GeneradorProblematico:
         carpeta_dzn = 'instancias/problematicas'
         carpeta_metadata = 'metadata/problematicas'
         carpeta_resultados = 'resultados/problematicas'
+        carpeta_reducidas = os.path.join(carpeta_dzn, 'reducidas')
         
-        for carpeta in [carpeta_dzn, carpeta_metadata, carpeta_resultados]:
+        for carpeta in [carpeta_dzn, carpeta_metadata, carpeta_resultados, carpeta_reducidas]:
             os.makedirs(carpeta, exist_ok=True)
         
         resumen_experimento = []
+        generadas = []
         
         print(f"{'='*80}")
         print(f"GENERANDO INSTANCIAS PROBLEMÁTICAS PARA MINIZINC")
         print(f"{'='*80}")
         
+        # Fase 1: generar todas las instancias (secuencial: los generadores sacan todo de self.rng)
         for tipo, generador in tipos_generadores:
             print(f"\n{'-'*60}")
             print(f"Tipo: {tipo.upper().replace('_', ' ')}")
@@ -441,34 +275,82 @@ class GeneradorProblematico:
                     self.guardar_dzn(instancia, archivo_dzn)
                     self.guardar_metadata_json(instancia, archivo_metadata)
                     
-                    # Probar con MiniZinc
-                    analisis = self.ejecutar_minizinc_con_timeout(archivo_dzn, archivo_resultado, 60)
+                    # Presolve: MiniZinc resuelve la red reducida, equivalente a la original
+                    estadisticas_presolve = None
+                    archivo_a_resolver = archivo_dzn
+                    red_a_resolver = instancia
+                    if aplicar_presolve:
+                        reducida, mapeo = presolve(instancia)
+                        red_a_resolver = reducida
+                        archivo_a_resolver = os.path.join(carpeta_reducidas, f'{tipo}_{i}.dzn')
+                        guardar_dzn_reducido(reducida, archivo_a_resolver)
+                        guardar_mapeo(mapeo, os.path.join(carpeta_metadata, f'{tipo}_{i}_mapeo.json'))
+                        estadisticas_presolve = mapeo['estadisticas']
+                        print(f"Presolve: {estadisticas_presolve['arcos_originales']} -> "
+                              f"{estadisticas_presolve['arcos_reducidos']} arcos")
                     
-                    # Registrar resultado
-                    resultado_completo = {
-                        'archivo_dzn': f'{tipo}_{i}.dzn',
-                        'tipo': tipo,
-                        'metadata': instancia['metadata'],
-                        'analisis_minizinc': analisis
-                    }
+                    # Flujo máximo: clasificación y cota exacta de demanda insatisfecha
+                    factibilidad = analizar_factibilidad(instancia)
+                    print(f"Factibilidad: {factibilidad['clasificacion']} "
+                          f"(demanda insatisfecha mínima {factibilidad['demanda_insatisfecha_minima']:.2f})")
                     
-                    resumen_experimento.append(resultado_completo)
+                    # Heuristica greedy: solución inicial y cota superior del objetivo
+                    heuristica = solucion = None
+                    if usar_heuristica and factibilidad['clasificacion'] != 'INFACTIBLE':
+                        solucion = heuristica_greedy(red_a_resolver)
+                        heuristica = {k: solucion[k] for k in ('costo_total_c', 'factible', 'tiempo')}
+                        print(f"Heurística: costo {solucion['costo_total_c'] / 100:.2f} ({solucion['tiempo']}s)")
                     
-                    # Mostrar resumen
-                    print(f"✓ Generado: {archivo_dzn}")
-                    print(f"  Tamaño: {instancia['metadata']['tamaño']}")
-                    print(f"  Arcos: {instancia['metadata']['num_arcos']}")
-                    print(f"  Nodos: {instancia['metadata']['nodos_totales']}")
-                    print(f"  Problemático: {analisis['es_problematico']}")
-                    if 'razon' in analisis:
-                        print(f"  Razón: {analisis['razon']}")
-                    print(f"  Tiempo: {analisis.get('tiempo_ejecutado', 'N/A')}s")
+                    generadas.append((tipo, i, instancia, archivo_a_resolver, archivo_resultado,
+                                      estadisticas_presolve, factibilidad, heuristica, solucion))
                     
                 except Exception as e:
                     print(f"✗ Error procesando {tipo}_{i}: {e}")
                     import traceback
                     traceback.print_exc()
         
+        # Fase 2: probar todas las instancias con MiniZinc en paralelo
+        print(f"\n{'='*80}")
+        print(f"RESOLVIENDO CON MINIZINC")
+        print(f"{'='*80}")
+        conocidos = [analisis_conocido(g[6]) if omitir_conocidas else None for g in generadas]
+        pendientes = [g for g, conocido in zip(generadas, conocidos) if conocido is None]
+        print(f"Omitidas por flujo máximo: {len(generadas) - len(pendientes)} de {len(generadas)}")
+        trabajos = []
+        for g in pendientes:
+            heuristica, solucion = g[7], g[8]
+            opciones = {}
+            if heuristica and heuristica['factible']:
+                opciones = {'cota_objetivo': heuristica['costo_total_c'], 'arranque': solucion}
+            trabajos.append((g[3], g[4], opciones))
+        resueltos = iter(ejecutar_lote(trabajos, timeout_segundos=60, max_procesos=max_procesos))
+        analisis_lote = [conocido if conocido is not None else next(resueltos) for conocido in conocidos]
+        
+        for (tipo, i, instancia, archivo_dzn, _, estadisticas_presolve, factibilidad, heuristica, _), analisis in zip(generadas, analisis_lote):
+            # Registrar resultado
+            resultado_completo = {
+                'archivo_dzn': f'{tipo}_{i}.dzn',
+                'tipo': tipo,
+                'metadata': instancia.metadata,
+                'analisis_minizinc': analisis,
+                'analisis_factibilidad': factibilidad,
+                'heuristica': heuristica,
+                'presolve': estadisticas_presolve
+            }
+            
+            resumen_experimento.append(resultado_completo)
+            
+            # Mostrar resumen
+            print(f"\n✓ Generado: {archivo_dzn}")
+            print(f"  Tamaño: {instancia.metadata['tamaño']}")
+            print(f"  Arcos: {instancia.metadata['num_arcos']}")
+            print(f"  Nodos: {instancia.metadata['nodos_totales']}")
+            print(f"  Factibilidad: {factibilidad['clasificacion']}")
+            print(f"  Problemático: {analisis['es_problematico']}")
+            if 'razon' in analisis:
+                print(f"  Razón: {analisis['razon']}")
+            print(f"  Tiempo: {analisis.get('tiempo_ejecutado', 'N/A')}s")
+        
         # Guardar resumen final
         archivo_resumen = os.path.join(carpeta_resultados, 'resumen_experimento.json')
         with open(archivo_resumen, 'w', encoding='utf-8') as f:
@@ -491,11 +373,8 @@ class GeneradorProblematico:
         print(f"\nPara usar en MiniZinc IDE: abrir archivos .dzn desde {carpeta_dzn}")
 
 if __name__ == '__main__':
-    # Configurar semillas
-    random.seed(42)
-    np.random.seed(42)
-    
-    generador = GeneradorProblematico()
+    # Configurar semilla
+    generador = GeneradorProblematico(np.random.default_rng(42))
     
     # Ejecutar experimento
     generador.ejecutar_experimento_completo(num_instancias_por_tipo=3)
\ No newline at end of file
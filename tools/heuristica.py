@@ -0,0 +1,140 @@
+import heapq
+import sys
+import time
+
+from cotas import SCALE, datos_escalados
+from dzn import leer_dzn
+from factibilidad import MAX_INSATISFECHA_C, PENALIZACION
+
+
+def _costo_instalacion(costos, capacidades, permitidos, flujo):
+    """Costo del diámetro permitido más barato que soporta el flujo (0 sin flujo)"""
+    if flujo == 0:
+        return 0
+    return min((costos[d-1] for d in permitidos if capacidades[d-1] >= flujo), default=None)
+
+
+def _diametro(costos, capacidades, permitidos, flujo):
+    if flujo == 0:
+        return 0
+    return min((d for d in permitidos if capacidades[d-1] >= flujo),
+               key=lambda d: (costos[d-1], d))
+
+
+def heuristica_greedy(arreglos):
+    """
+    Solución inicial constructiva en la escala del modelo (SCALE). Atiende a
+    los consumidores de mayor a menor demanda: para cada uno busca, hacia
+    atrás, el camino más barato desde una planta con oferta, donde el costo
+    de un arco es el transporte más el aumento de costo de instalación
+    (diámetro permitido más chico que alcanza) para mandar lo que falta.
+    Solo envía si sale más barato que la penalización, salvo que el nodo
+    quede con más demanda insatisfecha que la que admite el modelo.
+
+    Respeta flow_ub y allowed_diam de tools/cotas.py, así que la asignación
+    es factible para models/red.mzn. Devuelve un diccionario con 'y'
+    (diámetro 1..nD por arco, 0 = sin tubería), 'f_c', 'unmet_c' (por nodo),
+    los costos escalados y 'factible' (False si algún nodo supera el dominio
+    de unmet_demand_c).
+    """
+    inicio = time.perf_counter()
+    datos = datos_escalados(arreglos)
+    supply, demand = datos['supply'], datos['demand']
+    N, nP, nT, nA = datos['N'], datos['nP'], datos['nT'], datos['nA']
+    arc_from, arc_to = datos['arc_from'], datos['arc_to']
+    trans_c, install_c = datos['trans_c'], datos['install_c']
+    capacidades = datos['capacidad_c']
+    flow_ub, allowed_diam = datos['flow_ub'], datos['allowed_diam']
+    permitidos = [sorted(p) for p in allowed_diam]
+    tope = [min(flow_ub[a], max((capacidades[d-1] for d in permitidos[a]), default=0))
+            for a in range(nA)]
+
+    entrantes = [[] for _ in range(N + 1)]
+    for a, v in enumerate(arc_to):
+        entrantes[v].append(a)
+
+    flujo = [0] * nA
+    oferta = supply[:]
+    pendiente = demand[:]
+
+    def incremento(a, x):
+        antes = _costo_instalacion(install_c[a], capacidades, permitidos[a], flujo[a])
+        despues = _costo_instalacion(install_c[a], capacidades, permitidos[a], flujo[a] + x)
+        return trans_c[a] * x + despues - antes
+
+    consumidores = sorted((i for i in range(nP + nT + 1, N + 1) if demand[i-1] > 0),
+                          key=lambda i: -demand[i-1])
+    for i in consumidores:
+        while pendiente[i-1] > 0:
+            r = pendiente[i-1]
+            # Dijkstra hacia atrás desde i; previo[u] = arco por el que u llega a i
+            distancia = {i: 0}
+            previo = {}
+            cola = [(0, i)]
+            planta = None
+            while cola:
+                d, v = heapq.heappop(cola)
+                if d > distancia[v]:
+                    continue
+                if v <= nP and oferta[v-1] > 0:
+                    planta = v
+                    break
+                for a in entrantes[v]:
+                    libre = tope[a] - flujo[a]
+                    if libre <= 0:
+                        continue
+                    u = arc_from[a]
+                    nd = d + incremento(a, min(r, libre))
+                    if nd < distancia.get(u, float('inf')):
+                        distancia[u] = nd
+                        previo[u] = a
+                        heapq.heappush(cola, (nd, u))
+            if planta is None:
+                break
+
+            camino = []
+            u = planta
+            while u != i:
+                a = previo[u]
+                camino.append(a)
+                u = arc_to[a]
+            x = min([r, oferta[planta-1]] + [tope[a] - flujo[a] for a in camino])
+            costo = sum(incremento(a, x) for a in camino)
+            obligatorio = r - MAX_INSATISFECHA_C
+            if costo >= x * PENALIZACION:
+                if obligatorio <= 0:
+                    break
+                # Más caro que penalizar, pero sin esto el nodo excede el dominio
+                x = min(x, obligatorio)
+            for a in camino:
+                flujo[a] += x
+            oferta[planta-1] -= x
+            pendiente[i-1] -= x
+
+    y = [_diametro(install_c[a], capacidades, permitidos[a], flujo[a]) for a in range(nA)]
+    costo_instalacion = sum(install_c[a][y[a]-1] for a in range(nA) if y[a])
+    costo_transporte = sum(trans_c[a] * flujo[a] for a in range(nA))
+    unmet = [pendiente[i] if i >= nP + nT else 0 for i in range(N)]
+    penalizacion = sum(unmet) * PENALIZACION
+    return {
+        'y': y,
+        'f_c': flujo,
+        'unmet_c': unmet,
+        'costo_instalacion_c': costo_instalacion,
+        'costo_transporte_c': costo_transporte,
+        'penalizacion_c': penalizacion,
+        'costo_total_c': costo_instalacion + costo_transporte + penalizacion,
+        'factible': all(u <= MAX_INSATISFECHA_C for u in unmet),
+        'tiempo': round(time.perf_counter() - inicio, 4)
+    }
+
+
+if __name__ == '__main__':
+    # Uso: python tools/heuristica.py instancia.dzn [...]
+    for ruta in sys.argv[1:]:
+        r = heuristica_greedy(leer_dzn(ruta))
+        estado = f"cota_objetivo={r['costo_total_c']}" if r['factible'] else 'sin solución factible'
+        print(f"{ruta}: costo {r['costo_total_c'] / SCALE:.2f} "
+              f"(instalación {r['costo_instalacion_c'] / SCALE:.2f}, "
+              f"transporte {r['costo_transporte_c'] / SCALE:.2f}, "
+              f"penalización {r['penalizacion_c'] / SCALE:.2f}) | {estado} ({r['tiempo']}s)")
@@ -0,0 +1,114 @@
+from collections import namedtuple
+
+import numpy as np
+
+CAPAS = ('P', 'T', 'C1', 'C2')
+
+# Vista de los arcos de una capa: rebanadas de los arreglos de la instancia (sin copia)
+VistaCapa = namedtuple('VistaCapa', ['arc_from', 'arc_to', 'trans_cost', 'install_cost'])
+
+
+class Instancia:
+    """
+    Instancia de la red P->T->C1->C2 guardada en arreglos NumPy.
+
+    Los nodos se numeran 1..N en orden P, T, C1, C2 (igual que en el .dzn) y
+    los arcos están agrupados por capa: primero los P->T, luego T->C1 y al
+    final C1->C2. Los campos llevan los mismos nombres que los parámetros del
+    modelo, e instancia['arc_from'] funciona igual que instancia.arc_from,
+    así que se puede pasar donde se esperan los arreglos del .dzn.
+    """
+
+    __slots__ = ('nP', 'nT', 'nC1', 'nC2', 'arc_from', 'arc_to', 'trans_cost',
+                 'install_cost', 'supply', 'demand', 'max_capacity', 'nA_pt',
+                 'nA_tc1', 'metadata')
+
+    def __init__(self, nP, nT, nC1, nC2, arc_from, arc_to, trans_cost, install_cost,
+                 supply, demand, max_capacity, nA_pt, nA_tc1, metadata=None):
+        self.nP, self.nT, self.nC1, self.nC2 = nP, nT, nC1, nC2
+        self.arc_from = np.asarray(arc_from, dtype=np.int32)
+        self.arc_to = np.asarray(arc_to, dtype=np.int32)
+        self.trans_cost = np.asarray(trans_cost, dtype=np.float64)
+        self.install_cost = np.asarray(install_cost, dtype=np.int32)
+        self.supply = np.asarray(supply, dtype=np.float64)
+        self.demand = np.asarray(demand, dtype=np.float64)
+        self.max_capacity = np.asarray(max_capacity, dtype=np.int32)
+        self.nA_pt, self.nA_tc1 = nA_pt, nA_tc1
+        self.metadata = metadata if metadata is not None else {}
+
+    @classmethod
+    def desde_capas(cls, gen, nP, nT, nC1, nC2, pt, tc1, c1c2, trans_cost,
+                    suministro, d1, d2, metadata=None):
+        """
+        Arma la instancia a partir de los arcos de cada capa como pares
+        (origen, destino) con índices locales 0-based de su capa, p. ej.
+        (0, 2) en pt es P0->T2. 'suministro' es el de cada planta (un
+        valor o uno por planta); d1 y d2 son las demandas de C1 y C2.
+        Los costos de instalación alternan tipo_a (arcos pares) y tipo_b.
+        """
+        tamaños = (nP, nT, nC1, nC2)
+        inicio = np.concatenate(([1], 1 + np.cumsum(tamaños)))
+        arc_from, arc_to = [], []
+        for c, arcos in enumerate((pt, tc1, c1c2)):
+            arcos = np.asarray(arcos, dtype=np.int32).reshape(-1, 2)
+            arc_from.append(arcos[:, 0] + inicio[c])
+            arc_to.append(arcos[:, 1] + inicio[c + 1])
+        nA = sum(len(a) for a in arc_from)
+
+        N = sum(tamaños)
+        supply = np.zeros(N)
+        supply[:nP] = suministro
+        demand = np.zeros(N)
+        demand[nP + nT:nP + nT + nC1] = d1
+        demand[nP + nT + nC1:] = d2
+
+        filas = np.array([[gen.costos_instalacion[tipo][d] for d in gen.diametros]
+                          for tipo in ('tipo_a', 'tipo_b')])
+        return cls(nP, nT, nC1, nC2,
+                   np.concatenate(arc_from), np.concatenate(arc_to),
+                   trans_cost, filas[np.arange(nA) % 2], supply, demand,
+                   [gen.diametro_specs[d]['max_flujo'] for d in gen.diametros],
+                   len(arc_from[0]), len(arc_from[1]), metadata)
+
+    def __getitem__(self, nombre):
+        if nombre not in self.__slots__:
+            raise KeyError(nombre)
+        return getattr(self, nombre)
+
+    @property
+    def N(self):
+        return self.nP + self.nT + self.nC1 + self.nC2
+
+    @property
+    def nA(self):
+        return len(self.arc_from)
+
+    def _vista(self, desde, hasta):
+        return VistaCapa(self.arc_from[desde:hasta], self.arc_to[desde:hasta],
+                         self.trans_cost[desde:hasta], self.install_cost[desde:hasta])
+
+    @property
+    def pt(self):
+        return self._vista(0, self.nA_pt)
+
+    @property
+    def tc1(self):
+        return self._vista(self.nA_pt, self.nA_pt + self.nA_tc1)
+
+    @property
+    def c1c2(self):
+        return self._vista(self.nA_pt + self.nA_tc1, self.nA)
+
+    def nombre_nodo(self, i):
+        """Nombre del nodo i (1..N) como en los reportes: P0, T3, C1_2, C2_5"""
+        for capa, tamaño in zip(CAPAS, (self.nP, self.nT, self.nC1, self.nC2)):
+            if i <= tamaño:
+                return f"{capa}{i-1}" if capa in ('P', 'T') else f"{capa}_{i-1}"
+            i -= tamaño
+        raise IndexError('Nodo fuera de rango')
+
+    def nbytes(self):
+        """Memoria ocupada por los arreglos, en bytes"""
+        return sum(getattr(self, campo).nbytes for campo in
+                   ('arc_from', 'arc_to', 'trans_cost', 'install_cost',
+                    'supply', 'demand', 'max_capacity'))
@@ -0,0 +1,203 @@
+import argparse
+import os
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+
+from arranque import solucion_desde_salida
+from cache_soluciones import cache_por_defecto
+from dzn import leer_dzn
+from ejecutor import FORMULACIONES, MODELO_POR_DEFECTO, SOLVER_POR_DEFECTO, ejecutar_lote, ejecutar_minizinc
+from heuristica import heuristica_greedy
+from resultados_db import registrar_ejecucion
+from traza import metricas
+
+MODELO_VECINDARIO = 'models/vecindario.mzn'  # fija y fuera del vecindario
+
+
+def _capa_arcos(arreglos):
+    """Capa de cada arco: 0 = P->T, 1 = T->C1, 2 = C1->C2"""
+    arc_from = np.asarray(arreglos['arc_from'])
+    nP, nT = arreglos['nP'], arreglos['nT']
+    return (arc_from > nP).astype(int) + (arc_from > nP + nT)
+
+
+def vecindario_planta(arreglos, rng, tamaño):
+    """Arcos del subárbol de una planta con oferta, en orden BFS, hasta 'tamaño'"""
+    supply = np.asarray(arreglos['supply'])
+    plantas = np.flatnonzero(supply[:arreglos['nP']] > 0) + 1
+    if len(plantas) == 0:
+        return vecindario_aleatorio(arreglos, rng, tamaño)
+    salientes = {}
+    for a, u in enumerate(arreglos['arc_from']):
+        salientes.setdefault(int(u), []).append(a)
+    libres = []
+    visto = {int(rng.choice(plantas))}
+    cola = deque(visto)
+    while cola and len(libres) < tamaño:
+        u = cola.popleft()
+        for a in salientes.get(u, []):
+            libres.append(a)
+            v = int(arreglos['arc_to'][a])
+            if v not in visto:
+                visto.add(v)
+                cola.append(v)
+    return libres[:tamaño]
+
+
+def vecindario_capa(arreglos, rng, tamaño):
+    """Arcos de una capa elegida al azar (una muestra si la capa es más grande)"""
+    capas = _capa_arcos(arreglos)
+    arcos = np.flatnonzero(capas == rng.choice(np.unique(capas)))
+    if len(arcos) > tamaño:
+        arcos = rng.choice(arcos, tamaño, replace=False)
+    return sorted(arcos.tolist())
+
+
+def vecindario_aleatorio(arreglos, rng, tamaño):
+    nA = len(arreglos['arc_from'])
+    return sorted(rng.choice(nA, min(tamaño, nA), replace=False).tolist())
+
+
+VECINDARIOS = {
+    'planta': vecindario_planta,
+    'capa': vecindario_capa,
+    'aleatorio': vecindario_aleatorio
+}
+
+
+def seccion_vecindario(y, libres):
+    """Datos de models/vecindario.mzn: y del incumbente salvo los arcos libres"""
+    y_fijo = list(y)
+    for a in libres:
+        y_fijo[a] = -1
+    return f"y_fijo = [{', '.join(map(str, y_fijo))}];\n"
+
+
+def _solucion_inicial(ruta_dzn, arreglos, timeout_segundos, modelo, solver, carpeta):
+    solucion = heuristica_greedy(arreglos)
+    if solucion['factible']:
+        return solucion
+    # Sin solución greedy factible: una ejecución corta del modelo completo
+    ruta_sol = os.path.join(carpeta, 'inicial.txt')
+    ejecutar_minizinc(ruta_dzn, ruta_sol, timeout_segundos, modelo, solver, cache=False, arranque=False,
+                      salida='json', registrar=False)
+    with open(ruta_sol, 'r', encoding='utf-8') as f:
+        return solucion_desde_salida(f.read(), len(arreglos['arc_from']), len(arreglos['max_capacity']))
+
+
+def buscar_lns(ruta_dzn, tiempo_total=60, timeout_vecindario=5, tamaño_vecindario=None,
+               vecindarios=tuple(VECINDARIOS), procesos=None, modelo=MODELO_POR_DEFECTO,
+               solver=SOLVER_POR_DEFECTO, semilla=0):
+    """
+    Búsqueda de vecindario grande sobre el modelo. Parte de la heurística
+    greedy (o de una ejecución corta si no es factible) y en cada ronda
+    libera 'procesos' vecindarios en paralelo, uno de cada tipo por turnos,
+    fijando el resto de y con models/vecindario.mzn. Cada vecindario se
+    resuelve con timeout_vecindario segundos, arrancando del incumbente y
+    con la cota del objetivo en su costo menos uno, así que solo devuelve
+    soluciones que mejoran. Se queda con la mejor de la ronda.
+
+    Devuelve un diccionario con 'y', 'f_c', 'costo_total_c' (None si no se
+    encontró solución), 'historial' [(segundos, costo_c)], 'rondas' y
+    'mejoras'. La mejor solución queda como previa en la caché para el
+    arranque de ejecuciones siguientes. Los vecindarios no se registran en
+    resultados_db; sí la búsqueda completa.
+    """
+    inicio = time.perf_counter()
+    arreglos = leer_dzn(ruta_dzn)
+    nA, nD = len(arreglos['arc_from']), len(arreglos['max_capacity'])
+    if tamaño_vecindario is None:
+        tamaño_vecindario = min(nA, max(20, nA // 10))
+    procesos = procesos or os.cpu_count() or 1
+    rng = np.random.default_rng(semilla)
+    tipos = list(vecindarios)
+
+    with tempfile.TemporaryDirectory(prefix='lns_') as carpeta:
+        incumbente = _solucion_inicial(ruta_dzn, arreglos, timeout_vecindario, modelo, solver, carpeta)
+        if incumbente is None or incumbente['costo_total_c'] is None:
+            resultado = {'y': None, 'f_c': None, 'costo_total_c': None, 'historial': [],
+                         'rondas': 0, 'mejoras': 0, 'tiempo': round(time.perf_counter() - inicio, 2)}
+            _registrar(ruta_dzn, resultado, tiempo_total, timeout_vecindario, procesos, modelo, solver, semilla)
+            return resultado
+        historial = [(round(time.perf_counter() - inicio, 2), incumbente['costo_total_c'])]
+        print(f"LNS {os.path.basename(ruta_dzn)}: inicial {incumbente['costo_total_c'] / 100:.2f}")
+
+        rondas = mejoras = 0
+        while time.perf_counter() - inicio + timeout_vecindario <= tiempo_total:
+            trabajos = []
+            for k in range(procesos):
+                tipo = tipos[(rondas * procesos + k) % len(tipos)]
+                libres = VECINDARIOS[tipo](arreglos, rng, tamaño_vecindario)
+                ruta_vecindario = os.path.join(carpeta, f'vecindario_{k}.dzn')
+                with open(ruta_vecindario, 'w', encoding='utf-8') as f:
+                    f.write(seccion_vecindario(incumbente['y'], libres))
+                trabajos.append((ruta_dzn, os.path.join(carpeta, f'resultado_{k}.txt'), {
+                    'archivos_extra': (MODELO_VECINDARIO, ruta_vecindario),
+                    'cota_objetivo': incumbente['costo_total_c'] - 1,
+                    'arranque': incumbente
+                }))
+            ejecutar_lote(trabajos, timeout_vecindario, procesos, modelo, solver, cache=False, salida='json',
+                          registrar=False)
+            rondas += 1
+
+            for _, ruta_sol, _ in trabajos:
+                with open(ruta_sol, 'r', encoding='utf-8') as f:
+                    solucion = solucion_desde_salida(f.read(), nA, nD)
+                if (solucion and solucion['costo_total_c'] is not None
+                        and solucion['costo_total_c'] < incumbente['costo_total_c']):
+                    incumbente = solucion
+            if incumbente['costo_total_c'] < historial[-1][1]:
+                mejoras += 1
+                historial.append((round(time.perf_counter() - inicio, 2), incumbente['costo_total_c']))
+                print(f"  Ronda {rondas}: {incumbente['costo_total_c'] / 100:.2f}")
+
+    cache_por_defecto().guardar_previa(ruta_dzn, incumbente, nA, nD)
+    resultado = {
+        'y': incumbente['y'],
+        'f_c': incumbente['f_c'],
+        'costo_total_c': incumbente['costo_total_c'],
+        'historial': historial,
+        'rondas': rondas,
+        'mejoras': mejoras,
+        'tiempo': round(time.perf_counter() - inicio, 2)
+    }
+    _registrar(ruta_dzn, resultado, tiempo_total, timeout_vecindario, procesos, modelo, solver, semilla)
+    return resultado
+
+
+def _registrar(ruta_dzn, resultado, tiempo_total, timeout_vecindario, procesos, modelo, solver, semilla):
+    anytime = metricas([{'tiempo': t, 'objetivo': c, 'evento': 'solucion'} for t, c in resultado['historial']],
+                       tiempo_total)
+    registrar_ejecucion(ruta_dzn, {
+        'herramienta': 'lns', 'solver': solver, 'modelo': FORMULACIONES.get(modelo, modelo),
+        'configuracion': {'timeout_vecindario': timeout_vecindario, 'procesos': procesos, 'semilla': semilla,
+                          'rondas': resultado['rondas']},
+        'estado': 'SOLUCION' if resultado['costo_total_c'] is not None else 'SIN_SOLUCION',
+        'objetivo_c': resultado['costo_total_c'], 'tiempo': resultado['tiempo'], 'timeout_segundos': tiempo_total,
+        'tiempo_primera': anytime['tiempo_primera'], 'tiempo_mejor': anytime['tiempo_mejor'],
+        'integral_primal': anytime['integral_primal'] if resultado['historial'] else None
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Búsqueda de vecindario grande sobre el modelo de MiniZinc')
+    parser.add_argument('instancias', nargs='+')
+    parser.add_argument('--tiempo', type=int, default=60, help='Segundos totales por instancia')
+    parser.add_argument('--timeout-vecindario', type=int, default=5)
+    parser.add_argument('--tamaño', type=int, default=None, help='Arcos libres por vecindario')
+    parser.add_argument('--vecindarios', nargs='+', choices=sorted(VECINDARIOS), default=list(VECINDARIOS))
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--modelo', default=MODELO_POR_DEFECTO,
+                        help=f"ruta del .mzn o formulación ({', '.join(FORMULACIONES)})")
+    parser.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    for ruta in args.instancias:
+        r = buscar_lns(ruta, args.tiempo, args.timeout_vecindario, args.tamaño, args.vecindarios,
+                       args.procesos, args.modelo, args.solver, args.semilla)
+        costo = f"{r['costo_total_c'] / 100:.2f}" if r['costo_total_c'] is not None else 'sin solución'
+        print(f"{ruta}: costo {costo} | {r['rondas']} rondas, {r['mejoras']} mejoras ({r['tiempo']}s)")
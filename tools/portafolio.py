@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+from arranque import OPCIONES_SALIDA_TEXTO, solucion_desde_salida, tamaños_dzn
+from cache_soluciones import cache_por_defecto
+from ejecutor import FORMULACIONES, escribir_resultado, lanzar_proceso, liberar_proceso, matar_proceso
+from resultados_db import estadisticas_salida, estado_salida, registrar_ejecucion
+
+RUTA_GANADORES = 'cache/portafolio.json'
+
+# Configuraciones candidatas; solo corren las de solvers instalados. 'solver'
+# es el id o una etiqueta de MiniZinc y 'modelo' una de ejecutor.FORMULACIONES
+PORTAFOLIO = [
+    {'nombre': 'gecode', 'solver': 'org.gecode.gecode', 'modelo': 'csr'},
+    {'nombre': 'chuffed', 'solver': 'org.chuffed.chuffed', 'modelo': 'csr'},
+    {'nombre': 'cp-sat', 'solver': 'cp-sat', 'modelo': 'csr', 'argumentos': ['-p', '4']},
+    {'nombre': 'highs', 'solver': 'highs', 'modelo': 'mip'},
+    {'nombre': 'cbc', 'solver': 'cbc', 'modelo': 'mip'}
+]
+
+_candado_ganadores = threading.Lock()
+
+
+def solvers_instalados():
+    """Ids y etiquetas de los solvers que MiniZinc encuentra en esta máquina"""
+    try:
+        salida = subprocess.run(['minizinc', '--solvers-json'], capture_output=True, text=True,
+                                encoding='utf-8', check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return set()
+    nombres = set()
+    for solver in json.loads(salida):
+        nombres.add(solver['id'])
+        nombres.add(solver['id'].rsplit('.', 1)[-1])
+        nombres.update(solver.get('tags', []))
+    return nombres
+
+
+def familia(ruta_dzn):
+    """Familia de la instancia: el nombre del archivo sin el índice final (inst_grande_3 -> inst_grande)"""
+    return re.sub(r'_\d+$', '', os.path.splitext(os.path.basename(ruta_dzn))[0])
+
+
+def leer_ganadores(ruta=RUTA_GANADORES):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def registrar_carrera(nombre_familia, participantes, ganador, optimo, ruta=RUTA_GANADORES):
+    """
+    Suma la carrera a las estadísticas de la familia: por configuración,
+    'carreras', 'victorias', 'optimos' (victorias con óptimo probado) y
+    'tiempo_victorias' (segundos acumulados de sus victorias).
+    """
+    with _candado_ganadores:
+        ganadores = leer_ganadores(ruta)
+        por_familia = ganadores.setdefault(nombre_familia, {})
+        for nombre, resultado in participantes.items():
+            fila = por_familia.setdefault(nombre, {'carreras': 0, 'victorias': 0, 'optimos': 0,
+                                                   'tiempo_victorias': 0.0})
+            fila['carreras'] += 1
+            if nombre == ganador:
+                fila['victorias'] += 1
+                fila['optimos'] += int(optimo)
+                fila['tiempo_victorias'] = round(fila['tiempo_victorias'] + resultado['tiempo'], 2)
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(ganadores, f, indent=2, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+
+def podar(configuraciones, nombre_familia, min_carreras=5, ruta=RUTA_GANADORES):
+    """
+    Quita las configuraciones que ya corrieron min_carreras veces en la
+    familia sin ganar ninguna, y ordena el resto por victorias. Nunca deja
+    el portafolio vacío.
+    """
+    estadisticas = leer_ganadores(ruta).get(nombre_familia, {})
+
+    def fila(c):
+        return estadisticas.get(c['nombre'], {'carreras': 0, 'victorias': 0})
+
+    vigentes = [c for c in configuraciones
+                if fila(c)['carreras'] < min_carreras or fila(c)['victorias'] > 0]
+    return sorted(vigentes or configuraciones, key=lambda c: -fila(c)['victorias'])
+
+
+def _esperar(indice, proceso, inicio, timeout_segundos, resultados):
+    try:
+        stdout, stderr = proceso.communicate(timeout=timeout_segundos + 10)
+    except subprocess.TimeoutExpired:
+        matar_proceso(proceso)
+        stdout, stderr = proceso.communicate()
+    finally:
+        liberar_proceso(proceso)
+    resultados.put((indice, proceso.returncode, stdout, stderr, time.time() - inicio))
+
+
+def correr_portafolio(ruta_dzn, ruta_sol, timeout_segundos=120, configuraciones=None, registrar=True):
+    """
+    Lanza a la vez una ejecución de MiniZinc por configuración instalada
+    sobre la misma instancia. La primera que prueba el óptimo gana y las
+    demás se matan en el acto; si ninguna lo prueba antes del límite, gana
+    la de menor costo. Escribe la salida de la ganadora en ruta_sol, guarda
+    su solución como previa y, con registrar, suma la carrera a las
+    estadísticas por familia (RUTA_GANADORES) y agrega cada participante a
+    resultados_db. Devuelve el análisis de
+    ejecutor con 'portafolio': ganadora, si probó el óptimo y el estado de
+    cada participante.
+    """
+    instalados = solvers_instalados()
+    configuraciones = [c for c in (configuraciones or PORTAFOLIO) if c['solver'] in instalados]
+    if not configuraciones:
+        analisis = {'es_problematico': True, 'razon': 'Ningún solver del portafolio está instalado'}
+        with open(ruta_sol, 'w', encoding='utf-8') as f:
+            f.write("=== ERROR ===\nNingún solver del portafolio está instalado\n")
+        return analisis
+
+    tamaños = tamaños_dzn(ruta_dzn)
+    resultados = queue.Queue()
+    procesos = []
+    inicio = time.time()
+    for indice, c in enumerate(configuraciones):
+        comando = (['minizinc', '--solver', c['solver'], '--time-limit', str(timeout_segundos * 1000),
+                    '--statistics'] + OPCIONES_SALIDA_TEXTO + list(c.get('argumentos', []))
+                   + [FORMULACIONES.get(c['modelo'], c['modelo']), ruta_dzn])
+        proceso = lanzar_proceso(comando)
+        procesos.append(proceso)
+        threading.Thread(target=_esperar, args=(indice, proceso, inicio, timeout_segundos, resultados),
+                         daemon=True).start()
+
+    terminados = {}
+    ganador = None
+    while len(terminados) < len(procesos):
+        indice, codigo, stdout, stderr, tiempo = resultados.get()
+        solucion = solucion_desde_salida(stdout, *tamaños) if codigo == 0 else None
+        optimo = solucion is not None and '==========' in stdout
+        terminados[indice] = {'codigo': codigo, 'stdout': stdout, 'stderr': stderr, 'tiempo': tiempo,
+                              'solucion': solucion, 'optimo': optimo}
+        if optimo and ganador is None:
+            ganador = indice
+            for otro, proceso in enumerate(procesos):
+                if otro not in terminados:
+                    matar_proceso(proceso)
+
+    if ganador is None:
+        con_costo = [i for i, r in terminados.items()
+                     if r['solucion'] is not None and r['solucion']['costo_total_c'] is not None]
+        if con_costo:
+            ganador = min(con_costo, key=lambda i: (terminados[i]['solucion']['costo_total_c'],
+                                                    terminados[i]['tiempo']))
+
+    participantes = {}
+    for indice, c in enumerate(configuraciones):
+        r = terminados[indice]
+        if indice == ganador:
+            estado = 'ganador'
+        elif ganador is not None and terminados[ganador]['optimo'] and not r['optimo'] and r['codigo'] != 0:
+            estado = 'cancelado'
+        else:
+            estado = 'optimo' if r['optimo'] else 'solucion' if r['solucion'] else 'sin solución'
+        participantes[c['nombre']] = {
+            'estado': estado,
+            'costo_total_c': r['solucion']['costo_total_c'] if r['solucion'] else None,
+            'tiempo': round(r['tiempo'], 2)
+        }
+        if registrar:
+            registrar_ejecucion(ruta_dzn, dict(
+                estadisticas_salida(r['stdout']),
+                herramienta='portafolio', solver=c['solver'], modelo=FORMULACIONES.get(c['modelo'], c['modelo']),
+                configuracion={'nombre': c['nombre'], 'argumentos': c.get('argumentos', [])},
+                estado='CANCELADO' if estado == 'cancelado' else estado_salida(r['codigo'], r['stdout'], r['solucion']),
+                objetivo_c=participantes[c['nombre']]['costo_total_c'], tiempo=round(r['tiempo'], 3),
+                timeout_segundos=timeout_segundos))
+
+    if ganador is None:
+        # Nadie encontró solución: se informa la salida de la primera configuración
+        r = terminados[0]
+        analisis = escribir_resultado(ruta_sol, r['codigo'], r['stdout'], r['stderr'], r['tiempo'], timeout_segundos)
+        analisis['portafolio'] = {'ganador': None, 'optimo': False, 'participantes': participantes}
+        return analisis
+
+    r = terminados[ganador]
+    nombre = configuraciones[ganador]['nombre']
+    analisis = escribir_resultado(ruta_sol, r['codigo'], r['stdout'], r['stderr'], r['tiempo'], timeout_segundos)
+    analisis['portafolio'] = {'ganador': nombre, 'optimo': r['optimo'], 'participantes': participantes}
+    cache_por_defecto().guardar_previa(ruta_dzn, r['solucion'], *tamaños)
+    if registrar:
+        registrar_carrera(familia(ruta_dzn), participantes, nombre, r['optimo'])
+    return analisis
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Carrera de solvers sobre cada instancia')
+    sub = parser.add_subparsers(dest='accion', required=True)
+
+    p = sub.add_parser('correr', help='Corre el portafolio sobre las instancias')
+    p.add_argument('instancias', nargs='+')
+    p.add_argument('--timeout', type=int, default=120)
+    p.add_argument('--configuraciones', nargs='+', choices=[c['nombre'] for c in PORTAFOLIO],
+                   default=[c['nombre'] for c in PORTAFOLIO])
+    p.add_argument('--podar', action='store_true',
+                   help='omitir las configuraciones que nunca ganan en la familia de la instancia')
+    p.add_argument('--carpeta', default=os.path.join('resultados', 'portafolio'))
+
+    sub.add_parser('resumen', help='Victorias por familia y configuración')
+
+    args = parser.parse_args()
+    if args.accion == 'correr':
+        os.makedirs(args.carpeta, exist_ok=True)
+        elegidas = [c for c in PORTAFOLIO if c['nombre'] in args.configuraciones]
+        for ruta in args.instancias:
+            configuraciones = podar(elegidas, familia(ruta)) if args.podar else elegidas
+            nombre = os.path.splitext(os.path.basename(ruta))[0]
+            analisis = correr_portafolio(ruta, os.path.join(args.carpeta, f'{nombre}.txt'), args.timeout,
+                                         configuraciones)
+            carrera = analisis.get('portafolio')
+            if carrera is None:
+                print(f"{ruta}: {analisis['razon']}")
+                continue
+            detalle = ', '.join(f"{n}: {p['estado']} ({p['tiempo']}s)" for n, p in carrera['participantes'].items())
+            print(f"{ruta}: gana {carrera['ganador'] or '-'}"
+                  f"{' (óptimo)' if carrera['optimo'] else ''} | {detalle}")
+    else:
+        for nombre_familia, estadisticas in sorted(leer_ganadores().items()):
+            print(nombre_familia)
+            for nombre, fila in sorted(estadisticas.items(), key=lambda e: -e[1]['victorias']):
+                print(f"  {nombre:12s} {fila['victorias']:4d}/{fila['carreras']:<4d} victorias, "
+                      f"{fila['optimos']} con óptimo, {fila['tiempo_victorias']}s")
@@ -0,0 +1,157 @@
+import json
+from collections import deque
+
+from cotas import _escalar, capacidad_fuente
+from dzn import escribir_dzn
+
+
+def _alcanzables(origenes, vecinos):
+    vistos = set(origenes)
+    cola = deque(origenes)
+    while cola:
+        u = cola.popleft()
+        for v in vecinos.get(u, ()):
+            if v not in vistos:
+                vistos.add(v)
+                cola.append(v)
+    return vistos
+
+
+def _es_monotono(fila):
+    return all(a <= b for a, b in zip(fila, fila[1:]))
+
+
+def presolve(arreglos):
+    """
+    Reduce la red antes de escribir el .dzn:
+      1. elimina arcos cuyo origen no es alcanzable desde una fuente (una
+         planta con suministro o, si hace falta, un consumidor que puede
+         emitir flujo; ver cotas.capacidad_fuente) o cuyo destino no alcanza
+         ningún nodo con demanda;
+      2. contrae nodos de paso (que no son fuente ni tienen demanda, con una
+         entrada y una salida) en un solo arco con costos sumados;
+      3. elimina plantas y tanques que quedaron sin arcos.
+    Los nodos con demanda se conservan siempre, aunque queden aislados, para
+    que la penalización y por lo tanto el costo óptimo no cambien.
+    Devuelve (arreglos_reducidos, mapeo); mapeo['arcos'][k] lista los arcos
+    originales (1..nA) que forman el arco reducido k+1.
+    """
+    N = len(arreglos['supply'])
+    supply, demand = arreglos['supply'], arreglos['demand']
+    fuente = capacidad_fuente([_escalar(s) for s in supply], [_escalar(d) for d in demand],
+                              arreglos['nP'], arreglos['nT'])
+
+    # Arcos vivos: (from, to, trans, install, [arcos originales])
+    arcos = [(u, v, arreglos['trans_cost'][a], list(arreglos['install_cost'][a]), [a + 1])
+             for a, (u, v) in enumerate(zip(arreglos['arc_from'], arreglos['arc_to']))]
+
+    # 1. Alcanzabilidad hacia adelante desde las fuentes y hacia atrás desde la demanda
+    sucesores, predecesores = {}, {}
+    for u, v, *_ in arcos:
+        sucesores.setdefault(u, []).append(v)
+        predecesores.setdefault(v, []).append(u)
+    desde_fuentes = _alcanzables([i + 1 for i in range(N) if fuente[i] > 0], sucesores)
+    hacia_demanda = _alcanzables([i + 1 for i in range(N) if demand[i] > 0], predecesores)
+    arcos = [arc for arc in arcos if arc[0] in desde_fuentes and arc[1] in hacia_demanda]
+    nA_original = len(arreglos['arc_from'])
+    arcos_muertos = nA_original - len(arcos)
+
+    # 2. Contracción de cadenas de paso u -> i -> v. Contraer i no cambia los
+    # grados de u ni de v, así que basta una pasada sobre los nodos.
+    vivos = dict(enumerate(arcos))
+    entrantes, salientes = {}, {}
+    for k, (u, v, *_) in vivos.items():
+        salientes.setdefault(u, set()).add(k)
+        entrantes.setdefault(v, set()).add(k)
+    siguiente = len(arcos)
+    contraidos = 0
+    for i in range(1, N + 1):
+        if fuente[i-1] > 0 or demand[i-1] > 0:
+            continue
+        if len(entrantes.get(i, ())) != 1 or len(salientes.get(i, ())) != 1:
+            continue
+        k_in, k_out = next(iter(entrantes[i])), next(iter(salientes[i]))
+        u, _, t_in, c_in, orig_in = vivos[k_in]
+        _, v, t_out, c_out, orig_out = vivos[k_out]
+        if u == i or v == i:
+            continue
+        # Con costos crecientes ambos arcos eligen el mismo diámetro mínimo,
+        # así que el arco contraído con costos sumados es equivalente
+        if not (_es_monotono(c_in) and _es_monotono(c_out)):
+            continue
+        del vivos[k_in], vivos[k_out]
+        salientes[u].discard(k_in)
+        entrantes[v].discard(k_out)
+        del entrantes[i], salientes[i]
+        vivos[siguiente] = (u, v, round(t_in + t_out, 2), [a + b for a, b in zip(c_in, c_out)], orig_in + orig_out)
+        salientes[u].add(siguiente)
+        entrantes[v].add(siguiente)
+        siguiente += 1
+        contraidos += 1
+    arcos = list(vivos.values())
+
+    # 3. Renumerar nodos conservando el orden de las capas
+    usados = {u for u, *_ in arcos} | {v for _, v, *_ in arcos}
+    limites = [0]
+    for capa in ['nP', 'nT', 'nC1', 'nC2']:
+        limites.append(limites[-1] + arreglos[capa])
+    nuevos_tamaños = []
+    nodos = []
+    for c in range(4):
+        capa = [i for i in range(limites[c] + 1, limites[c+1] + 1)
+                if i in usados or demand[i-1] > 0]
+        nuevos_tamaños.append(len(capa))
+        nodos.extend(capa)
+    nuevo_idx = {orig: k + 1 for k, orig in enumerate(nodos)}
+
+    arcos.sort(key=lambda arc: (nuevo_idx[arc[0]], nuevo_idx[arc[1]], arc[4][0]))
+    reducidos = {
+        'nP': nuevos_tamaños[0], 'nT': nuevos_tamaños[1],
+        'nC1': nuevos_tamaños[2], 'nC2': nuevos_tamaños[3],
+        'arc_from': [nuevo_idx[u] for u, *_ in arcos],
+        'arc_to': [nuevo_idx[v] for _, v, *_ in arcos],
+        'trans_cost': [t for _, _, t, _, _ in arcos],
+        'install_cost': [c for _, _, _, c, _ in arcos],
+        'supply': [supply[i-1] for i in nodos],
+        'demand': [demand[i-1] for i in nodos],
+        'max_capacity': list(arreglos['max_capacity'])
+    }
+    mapeo = {
+        'nodos': nodos,
+        'arcos': [orig for *_, orig in arcos],
+        'nA_original': nA_original,
+        'N_original': N,
+        'estadisticas': {
+            'arcos_originales': nA_original,
+            'arcos_reducidos': len(arcos),
+            'arcos_muertos': arcos_muertos,
+            'cadenas_contraidas': contraidos,
+            'nodos_originales': N,
+            'nodos_reducidos': len(nodos)
+        }
+    }
+    return reducidos, mapeo
+
+
+def expandir_solucion(mapeo, flujos, diametros):
+    """
+    Lleva flujos y diámetros (índice 1..nD, 0 = sin tubería) de la red
+    reducida a los arcos originales; los arcos eliminados quedan en 0.
+    """
+    flujos_orig = [0] * mapeo['nA_original']
+    diametros_orig = [0] * mapeo['nA_original']
+    for k, originales in enumerate(mapeo['arcos']):
+        for a in originales:
+            flujos_orig[a-1] = flujos[k]
+            diametros_orig[a-1] = diametros[k]
+    return flujos_orig, diametros_orig
+
+
+def guardar_dzn_reducido(reducidos, ruta):
+    """Escribe la red reducida con el mismo formato que los generadores"""
+    escribir_dzn(ruta, reducidos)
+
+
+def guardar_mapeo(mapeo, ruta):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(mapeo, f, indent=2)
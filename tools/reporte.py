@@ -0,0 +1,102 @@
+import argparse
+import os
+
+from arranque import DIAMETROS_MM, solucion_desde_salida
+from cotas import SCALE, _escalar, costos_instalacion_c
+from dzn import leer_dzn
+from factibilidad import PENALIZACION
+
+
+def pesos(valor_c):
+    return f"${valor_c // SCALE}.{valor_c % SCALE:02d}"
+
+
+def resultado_modelo(arreglos, estado, y, f_c, unmet_c):
+    """Diccionario de resultado con los costos escalados de models/red.mzn"""
+    install_c = costos_instalacion_c(arreglos)
+    costo_instalacion = sum(install_c[a][d-1] for a, d in enumerate(y) if d)
+    costo_transporte = sum(_escalar(t) * f for t, f in zip(arreglos['trans_cost'], f_c))
+    penalizacion = sum(unmet_c) * PENALIZACION
+    return {
+        'estado': estado,
+        'y': y,
+        'f_c': f_c,
+        'unmet_c': unmet_c,
+        'costo_instalacion_c': costo_instalacion,
+        'costo_transporte_c': costo_transporte,
+        'penalizacion_c': penalizacion,
+        'costo_total_c': costo_instalacion + costo_transporte + penalizacion
+    }
+
+
+def escribir_reporte(ruta, arreglos, resultado, titulo, secciones=()):
+    """
+    Reporte con el formato de la salida del modelo (costos y detalle de
+    arcos activos) para los resultados que no vienen de MiniZinc; se lee
+    con arranque.solucion_desde_salida. Sin 'y' en el resultado solo se
+    escribe el estado. 'secciones' son pares (título, líneas) que se
+    escriben antes del detalle de arcos.
+    """
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(f"=== {titulo} ===\n")
+        f.write(f"Estado: {resultado['estado']}\n\n")
+        if 'y' not in resultado:
+            return
+        f.write("--- COSTOS ---\n")
+        f.write(f"Costo Instalación: {pesos(resultado['costo_instalacion_c'])}\n")
+        f.write(f"Costo Transporte:  {pesos(resultado['costo_transporte_c'])}\n")
+        f.write(f"Penalización:      {pesos(resultado['penalizacion_c'])}\n")
+        f.write(f"COSTO TOTAL:       {pesos(resultado['costo_total_c'])}\n\n")
+        f.write("--- FLUJOS ---\n")
+        f.write(f"Demanda total: {sum(float(d) for d in arreglos['demand']):.2f} l/min\n")
+        f.write(f"Demanda no satisfecha: {sum(resultado['unmet_c']) / SCALE:.2f} l/min\n")
+        for nombre, lineas in secciones:
+            f.write(f"\n--- {nombre} ---\n")
+            f.writelines(f"{linea}\n" for linea in lineas)
+        f.write("\n--- DETALLE DE ARCOS ACTIVOS ---\n")
+        for a, (flujo, d) in enumerate(zip(resultado['f_c'], resultado['y'])):
+            if flujo > 0:
+                diametro = f"{DIAMETROS_MM[d-1]}mm" if d else "N/A"
+                f.write(f"Arco {a+1}: {arreglos['arc_from'][a]} -> {arreglos['arc_to'][a]} | "
+                        f"Flujo: {flujo / SCALE} l/min | Diámetro: {diametro}\n")
+        f.write("----------\n")
+        if resultado['estado'] == 'OPTIMO':
+            f.write("==========\n")
+
+
+def resultado_desde_salida(arreglos, stdout):
+    """
+    Resultado del modelo a partir de la salida compacta de MiniZinc
+    (arranque.OPCIONES_SALIDA_COMPACTA), con los costos recalculados como en
+    models/red.mzn. None si no hay solución o la salida es el reporte de
+    texto, que no trae unmet_demand_c.
+    """
+    solucion = solucion_desde_salida(stdout, len(arreglos['arc_from']), len(arreglos['max_capacity']))
+    if solucion is None or 'insatisfecha' not in solucion:
+        return None
+    N = len(arreglos['supply'])
+    if any(not 0 < nodo <= N for nodo in solucion['insatisfecha']):
+        return None
+    unmet_c = [solucion['insatisfecha'].get(i, 0) for i in range(1, N + 1)]
+    estado = 'OPTIMO' if '==========' in stdout else 'SOLUCION'
+    return resultado_modelo(arreglos, estado, solucion['y'], solucion['f_c'], unmet_c)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reporte de texto a partir de la salida JSON de MiniZinc')
+    parser.add_argument('instancia')
+    parser.add_argument('resultados', nargs='+', help='archivos escritos por ejecutor.py con salida json')
+    parser.add_argument('--sufijo', default='_reporte', help='el reporte se escribe junto al resultado')
+    args = parser.parse_args()
+
+    arreglos = leer_dzn(args.instancia)
+    for ruta in args.resultados:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            resultado = resultado_desde_salida(arreglos, f.read())
+        if resultado is None:
+            print(f"{ruta}: sin solución en formato JSON")
+            continue
+        base, extension = os.path.splitext(ruta)
+        salida = f"{base}{args.sufijo}{extension or '.txt'}"
+        escribir_reporte(salida, arreglos, resultado, 'RESULTADOS OPTIMIZACIÓN RED DE TUBERÍAS - GRUPO 5')
+        print(f"{salida}: {resultado['estado']} | costo {pesos(resultado['costo_total_c'])}")
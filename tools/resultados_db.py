@@ -0,0 +1,287 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from cache_soluciones import huella_archivo
+from cotas import SCALE
+from dzn import leer_dzn
+
+RUTA_BD = os.path.join('resultados', 'ejecuciones.sqlite')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS instancias (
+    hash TEXT PRIMARY KEY,          -- sha256 del .dzn ('informe:<nombre>' para las importadas)
+    nombre TEXT NOT NULL,
+    familia TEXT,
+    tamaño TEXT,
+    ruta TEXT,
+    nP INTEGER, nT INTEGER, nC1 INTEGER, nC2 INTEGER, nA INTEGER,
+    suministro_total REAL,
+    demanda_total REAL,
+    factor_holgura REAL
+);
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    instancia TEXT NOT NULL REFERENCES instancias(hash),
+    herramienta TEXT NOT NULL,      -- minizinc, portafolio, cpsat, informe
+    solver TEXT,
+    modelo TEXT,
+    configuracion TEXT,             -- JSON con las opciones de la ejecución
+    estado TEXT,                    -- OPTIMO, SOLUCION, INFACTIBLE, SIN_SOLUCION, TIMEOUT, CANCELADO, ERROR
+    objetivo_c INTEGER,
+    cota_c INTEGER,
+    tiempo REAL,
+    timeout_segundos REAL,
+    tiempo_aplanado REAL,
+    tiempo_resolucion REAL,
+    nodos INTEGER,
+    fallas INTEGER,
+    tiempo_primera REAL,
+    tiempo_mejor REAL,
+    integral_primal REAL,
+    cpu_s REAL,
+    memoria_max_mb REAL
+);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_instancia ON ejecuciones(instancia, fecha);
+-- Cubre el mejor objetivo y la mejor cota por instancia sin leer la tabla
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_mejores ON ejecuciones(instancia, objetivo_c, cota_c);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_solver ON ejecuciones(solver, modelo);
+CREATE INDEX IF NOT EXISTS idx_ejecuciones_estado ON ejecuciones(estado);
+CREATE INDEX IF NOT EXISTS idx_instancias_familia ON instancias(familia, tamaño);
+"""
+
+_COLUMNAS = ('herramienta', 'solver', 'modelo', 'configuracion', 'estado', 'objetivo_c', 'cota_c', 'tiempo',
+             'timeout_segundos', 'tiempo_aplanado', 'tiempo_resolucion', 'nodos', 'fallas', 'tiempo_primera',
+             'tiempo_mejor', 'integral_primal', 'cpu_s', 'memoria_max_mb')
+
+# Estadísticas de MiniZinc (%%%mzn-stat) que tienen columna propia
+_ESTADISTICAS = {'flatTime': 'tiempo_aplanado', 'solveTime': 'tiempo_resolucion', 'nodes': 'nodos',
+                 'failures': 'fallas', 'objectiveBound': 'cota_c'}
+_RE_ESTADISTICA = re.compile(r'^%%%mzn-stat:? (\w+)=(\S+)', re.M)
+
+# Instancias ya registradas en esta sesión: (ruta, mtime) -> hash
+_instancias_vistas = {}
+_candado = threading.Lock()
+
+
+def conectar(ruta=RUTA_BD):
+    """Abre la base (creándola si hace falta); WAL permite escribir desde los hilos del lote"""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    con = sqlite3.connect(ruta, timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute('PRAGMA journal_mode=WAL')
+    con.executescript(_ESQUEMA)
+    return con
+
+
+def familia(nombre):
+    """Nombre de la instancia sin el índice final (inst_grande_3 -> inst_grande)"""
+    return re.sub(r'_\d+$', '', nombre)
+
+
+def caracteristicas(ruta_dzn):
+    """Columnas de la tabla instancias calculadas desde el .dzn"""
+    arreglos = leer_dzn(ruta_dzn)
+    nombre = os.path.splitext(os.path.basename(ruta_dzn))[0]
+    suministro = float(sum(arreglos['supply']))
+    demanda = float(sum(arreglos['demand']))
+    return {
+        'nombre': nombre,
+        'familia': familia(nombre),
+        'tamaño': os.path.basename(os.path.dirname(os.path.abspath(ruta_dzn))),
+        'ruta': os.path.relpath(ruta_dzn),
+        'nP': arreglos['nP'], 'nT': arreglos['nT'], 'nC1': arreglos['nC1'], 'nC2': arreglos['nC2'],
+        'nA': len(arreglos['arc_from']),
+        'suministro_total': round(suministro, 2),
+        'demanda_total': round(demanda, 2),
+        'factor_holgura': round(suministro / demanda, 2) if demanda > 0 else None
+    }
+
+
+def _registrar_instancia(con, ruta_dzn):
+    clave = (os.path.abspath(ruta_dzn), os.path.getmtime(ruta_dzn))
+    with _candado:
+        huella = _instancias_vistas.get(clave)
+    if huella is not None:
+        return huella
+    huella = huella_archivo(ruta_dzn)
+    if con.execute('SELECT 1 FROM instancias WHERE hash = ?', (huella,)).fetchone() is None:
+        fila = dict(caracteristicas(ruta_dzn), hash=huella)
+        con.execute(f"INSERT OR IGNORE INTO instancias ({', '.join(fila)}) VALUES ({', '.join('?' * len(fila))})",
+                    list(fila.values()))
+    with _candado:
+        _instancias_vistas[clave] = huella
+    return huella
+
+
+def estadisticas_salida(stdout):
+    """Columnas de ejecuciones que se leen de las líneas %%%mzn-stat de MiniZinc (vale la última)"""
+    datos = {}
+    for clave, valor in _RE_ESTADISTICA.findall(stdout or ''):
+        if clave in _ESTADISTICAS:
+            try:
+                numero = float(valor)
+            except ValueError:
+                continue
+            datos[_ESTADISTICAS[clave]] = int(round(numero)) if clave in ('nodes', 'failures') else numero
+    if 'cota_c' in datos:
+        datos['cota_c'] = int(round(datos['cota_c']))
+    return datos
+
+
+def estado_salida(codigo_retorno, stdout, solucion):
+    if solucion is not None:
+        return 'OPTIMO' if '==========' in stdout else 'SOLUCION'
+    if '=====UNSATISFIABLE=====' in stdout:
+        return 'INFACTIBLE'
+    return 'ERROR' if codigo_retorno != 0 else 'SIN_SOLUCION'
+
+
+def registrar_ejecucion(ruta_dzn, datos, ruta_bd=RUTA_BD):
+    """
+    Agrega una ejecución. datos usa los nombres de columna de ejecuciones
+    (las claves desconocidas se ignoran; 'configuracion' puede ser un
+    diccionario). Las características de la instancia se calculan solo la
+    primera vez que aparece su hash. Devuelve el id de la fila; un error de
+    la base nunca interrumpe la ejecución que se está registrando (None).
+    """
+    fila = {k: datos[k] for k in _COLUMNAS if datos.get(k) is not None}
+    if isinstance(fila.get('configuracion'), dict):
+        fila['configuracion'] = json.dumps(fila['configuracion'], sort_keys=True, ensure_ascii=False)
+    try:
+        con = conectar(ruta_bd)
+        try:
+            with con:
+                fila['instancia'] = _registrar_instancia(con, ruta_dzn)
+                fila['fecha'] = datos.get('fecha') or datetime.datetime.now().isoformat(timespec='seconds')
+                cursor = con.execute(f"INSERT INTO ejecuciones ({', '.join(fila)}) "
+                                     f"VALUES ({', '.join('?' * len(fila))})", list(fila.values()))
+            return cursor.lastrowid
+        finally:
+            con.close()
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def ultimas_por_instancia(con, herramientas=None):
+    """
+    Última ejecución de cada instancia (por nombre), con las características
+    de la instancia y el mejor objetivo y la mejor cota de todas las
+    ejecuciones sobre el mismo .dzn. La última se busca por instancia con
+    idx_ejecuciones_instancia, sin recorrer la tabla ordenada entera.
+    """
+    filtro = ''
+    parametros = []
+    if herramientas:
+        filtro = f"AND herramienta IN ({', '.join('?' * len(herramientas))})"
+        parametros = list(herramientas)
+    filas = con.execute(f"""
+        SELECT e.*, i.nombre, i.familia, i.tamaño, i.ruta, i.nA, i.suministro_total, i.demanda_total,
+               i.factor_holgura, m.mejor_objetivo_c, m.mejor_cota_c
+        FROM instancias i
+        JOIN ejecuciones e ON e.id = (SELECT id FROM ejecuciones WHERE instancia = i.hash {filtro}
+                                      ORDER BY fecha DESC, id DESC LIMIT 1)
+        JOIN (SELECT instancia, MIN(objetivo_c) AS mejor_objetivo_c, MAX(cota_c) AS mejor_cota_c
+              FROM ejecuciones WHERE 1 {filtro} GROUP BY instancia) m ON m.instancia = i.hash
+    """, parametros * 2).fetchall()
+    # Una instancia regenerada tiene otro hash: vale la ejecución más reciente
+    ultimas = {}
+    for f in filas:
+        anterior = ultimas.get(f['nombre'])
+        if anterior is None or (f['fecha'], f['id']) > (anterior['fecha'], anterior['id']):
+            ultimas[f['nombre']] = f
+    return sorted(ultimas.values(), key=lambda f: (f['tamaño'] or '', f['nombre']))
+
+
+def resumen(con, por='solver'):
+    """Ejecuciones, óptimos, tiempo medio e integral primal media agrupados por una columna"""
+    columnas = {'solver': 'e.solver', 'modelo': 'e.modelo', 'herramienta': 'e.herramienta',
+                'familia': 'i.familia', 'tamaño': 'i.tamaño', 'estado': 'e.estado'}
+    columna = columnas[por]
+    # Las columnas de ejecuciones se agrupan sin unir con instancias
+    union = 'JOIN instancias i ON i.hash = e.instancia' if columna.startswith('i.') else ''
+    return con.execute(f"""
+        SELECT {columna} AS grupo, COUNT(*) AS ejecuciones,
+               SUM(e.estado = 'OPTIMO') AS optimos,
+               COUNT(DISTINCT e.instancia) AS instancias,
+               AVG(e.tiempo) AS tiempo_medio,
+               AVG(e.integral_primal) AS integral_primal_media,
+               MAX(e.memoria_max_mb) AS memoria_max_mb
+        FROM ejecuciones e {union}
+        GROUP BY {columna} ORDER BY ejecuciones DESC
+    """).fetchall()
+
+
+# Tabla resumen de informe_proyecto.tex (ejecuciones con Gecode previas al
+# registro automático), que graficos_reportes.py tenía cargada a mano. Se
+# importa una sola vez con 'importar-informe'.
+_INFORME = [
+    ('pequeñas', 1, 682.82, 525.24, 36, 60.0), ('pequeñas', 2, 849.58, 653.52, 40, 63.0),
+    ('pequeñas', 3, 1199.01, 922.32, 47, 9.0), ('pequeñas', 4, 1076.49, 828.07, 51, 32.108),
+    ('pequeñas', 5, 1456.26, 1120.20, 76, 78.0),
+    ('medianas', 1, 2308.14, 1775.49, 87, 324.0), ('medianas', 2, 1062.81, 817.54, 60, 111.0),
+    ('medianas', 3, 1607.10, 1236.24, 99, 447.0), ('medianas', 4, 1450.89, 1116.08, 88, 133.0),
+    ('medianas', 5, 1456.26, 1120.20, 76, 105.0),
+    ('grandes', 1, 5095.98, 3920.00, 186, 507.0), ('grandes', 2, 3134.20, 2410.91, 130, 333.0),
+    ('grandes', 3, 4441.16, 3416.28, 183, 1163.0), ('grandes', 4, 5757.96, 4429.22, 193, 507.0),
+    ('grandes', 5, 5280.20, 4061.69, 167, 1822.0),
+]
+_SINGULAR = {'pequeñas': 'pequeña', 'medianas': 'mediana', 'grandes': 'grande'}
+
+
+def importar_informe(con):
+    """Carga las ejecuciones de _INFORME con fecha del informe; no duplica si ya están"""
+    agregadas = 0
+    with con:
+        for tamaño, numero, suministro, demanda, arcos, tiempo in _INFORME:
+            nombre = f'inst_{_SINGULAR[tamaño]}_{numero}'
+            huella = f'informe:{nombre}'
+            con.execute("INSERT OR IGNORE INTO instancias (hash, nombre, familia, tamaño, nA, suministro_total, "
+                        "demanda_total, factor_holgura) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (huella, nombre, familia(nombre), tamaño, arcos, suministro, demanda,
+                         round(suministro / demanda, 2)))
+            if con.execute("SELECT 1 FROM ejecuciones WHERE instancia = ? AND herramienta = 'informe'",
+                           (huella,)).fetchone() is None:
+                con.execute("INSERT INTO ejecuciones (fecha, instancia, herramienta, solver, modelo, tiempo) "
+                            "VALUES ('2025-06-22T00:00:00', ?, 'informe', 'org.gecode.gecode', 'models/main.mzn', ?)",
+                            (huella, tiempo))
+                agregadas += 1
+    return agregadas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Registro de ejecuciones en SQLite')
+    parser.add_argument('--bd', default=RUTA_BD)
+    sub = parser.add_subparsers(dest='accion', required=True)
+
+    p = sub.add_parser('resumen', help='Ejecuciones agrupadas por una columna')
+    p.add_argument('--por', choices=['solver', 'modelo', 'herramienta', 'familia', 'tamaño', 'estado'],
+                   default='solver')
+    sub.add_parser('instancias', help='Última ejecución y mejor objetivo de cada instancia')
+    sub.add_parser('importar-informe', help='Carga la tabla de tiempos de informe_proyecto.tex')
+
+    args = parser.parse_args()
+    con = conectar(args.bd)
+    if args.accion == 'resumen':
+        print(f"{args.por.capitalize():40s}{'Ejec.':>7s}{'Ópt.':>6s}{'Inst.':>7s}{'Tiempo (s)':>12s}{'Integral':>10s}")
+        for f in resumen(con, args.por):
+            tiempo = f"{f['tiempo_medio']:.2f}" if f['tiempo_medio'] is not None else '-'
+            integral = f"{f['integral_primal_media']:.3f}" if f['integral_primal_media'] is not None else '-'
+            print(f"{str(f['grupo']):40s}{f['ejecuciones']:7d}{f['optimos'] or 0:6d}{f['instancias']:7d}"
+                  f"{tiempo:>12s}{integral:>10s}")
+    elif args.accion == 'instancias':
+        print(f"{'Instancia':30s}{'Estado':>14s}{'Mejor objetivo':>18s}{'Tiempo (s)':>12s}  Solver")
+        for f in ultimas_por_instancia(con):
+            objetivo = f"{f['mejor_objetivo_c'] / SCALE:.2f}" if f['mejor_objetivo_c'] is not None else '-'
+            tiempo = f"{f['tiempo']:.2f}" if f['tiempo'] is not None else '-'
+            print(f"{f['nombre']:30s}{f['estado'] or '-':>14s}{objetivo:>18s}{tiempo:>12s}  {f['solver'] or '-'}")
+    else:
+        print(f"{importar_informe(con)} ejecuciones importadas de informe_proyecto.tex")
+    con.close()
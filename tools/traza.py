@@ -0,0 +1,225 @@
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+
+from arranque import OPCIONES_SALIDA_COMPACTA, SECCION_COMPACTA
+
+# Cada solución intermedia y cada bloque de estadísticas llegan como una línea
+# JSON de stdout (--json-stream) mientras el solver sigue buscando
+OPCIONES_TRAZA = ['--json-stream', '--intermediate-solutions', '--output-time', '--statistics'] + OPCIONES_SALIDA_COMPACTA
+
+# Estadísticas estándar de MiniZinc que se guardan en la traza
+ESTADISTICAS = {
+    'nodes': 'nodos',
+    'failures': 'fallas',
+    'flatTime': 'tiempo_aplanado',
+    'solveTime': 'tiempo_resolucion',
+    'objectiveBound': 'cota'
+}
+
+# Marcas del formato de texto de MiniZinc para cada estado final
+_MARCAS_ESTADO = {
+    'OPTIMAL_SOLUTION': '==========',
+    'ALL_SOLUTIONS': '==========',
+    'UNSATISFIABLE': '=====UNSATISFIABLE=====',
+    'UNBOUNDED': '=====UNBOUNDED=====',
+    'UNSAT_OR_UNBOUNDED': '=====UNSATorUNBOUNDED=====',
+    'UNKNOWN': '=====UNKNOWN=====',
+    'ERROR': '=====ERROR====='
+}
+
+
+def _valor_compacto(salida):
+    # La sección compacta es texto con una línea JSON (ver models/red.mzn)
+    valor = salida.get(SECCION_COMPACTA)
+    return json.loads(valor) if isinstance(valor, str) else valor
+
+
+def leer_flujo(proceso, ruta_traza, inicio, cabecera=None):
+    """
+    Lee la salida --json-stream de un proceso MiniZinc a medida que llega y
+    escribe una línea JSON por evento en ruta_traza: 'tiempo' (segundos de
+    reloj desde inicio), 'evento' (solucion, estadisticas o estado),
+    'objetivo' (el de la solución más reciente) y los campos de
+    ESTADISTICAS conocidos hasta ese momento. La primera línea es cabecera
+    (instancia, solver, etc.) con evento 'inicio'.
+
+    No espera al proceso: eso queda a cargo de quien lo lanzó.
+    Devuelve (stdout, stderr), donde stdout es la última solución en el
+    formato de la salida compacta, con sus estadísticas y la marca del estado
+    final, de modo que se lee con arranque.solucion_desde_salida igual que
+    una ejecución sin traza.
+    """
+    errores = []
+    lector = threading.Thread(target=lambda: errores.append(proceso.stderr.read()), daemon=True)
+    lector.start()
+
+    actual = {'objetivo': None}
+    ultima, estadisticas, marca = None, {}, ''
+    directorio = os.path.dirname(ruta_traza)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(ruta_traza, 'w', encoding='utf-8') as traza:
+        traza.write(json.dumps(dict(cabecera or {}, tiempo=0.0, evento='inicio'), ensure_ascii=False) + '\n')
+        for linea in proceso.stdout:
+            try:
+                mensaje = json.loads(linea)
+            except ValueError:
+                continue
+            tipo = mensaje.get('type')
+            if tipo == 'solution':
+                ultima = _valor_compacto(mensaje.get('output', {}))
+                actual['objetivo'] = sum(ultima['costos']) if ultima else None
+                evento = 'solucion'
+            elif tipo == 'statistics':
+                for clave, valor in mensaje.get('statistics', {}).items():
+                    estadisticas[clave] = valor
+                    if clave in ESTADISTICAS:
+                        actual[ESTADISTICAS[clave]] = valor
+                evento = 'estadisticas'
+            elif tipo == 'status':
+                marca = _MARCAS_ESTADO.get(mensaje.get('status'), '')
+                actual['estado'] = mensaje.get('status')
+                evento = 'estado'
+            elif tipo == 'error':
+                errores.append(f"{mensaje.get('what', 'error')}: {mensaje.get('message', '')}\n")
+                continue
+            else:
+                continue
+            fila = dict(actual, tiempo=round(time.time() - inicio, 3), evento=evento)
+            if 'time' in mensaje:
+                fila['tiempo_minizinc'] = mensaje['time'] / 1000
+            traza.write(json.dumps(fila) + '\n')
+            traza.flush()
+    lector.join()
+
+    partes = [f'%%%mzn-stat: {clave}={valor}\n' for clave, valor in estadisticas.items()]
+    if ultima is not None:
+        partes.append(json.dumps(ultima) + '\n----------\n')
+    if marca:
+        partes.append(marca + '\n')
+    return ''.join(partes), ''.join(errores)
+
+
+def leer_traza(ruta_traza):
+    with open(ruta_traza, 'r', encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def metricas(filas, tiempo_limite=None, referencia=None):
+    """
+    Métricas de una traza:
+    - tiempo_primera: segundos hasta la primera solución
+    - tiempo_mejor: segundos hasta la mejor solución de la traza
+    - integral_primal: integral en [0, T] de la brecha primal
+      (z(t) - referencia) / max(|z(t)|, |referencia|), que vale 1 antes de la
+      primera solución; T es tiempo_limite o el último evento
+    - integral_primal_normalizada: integral_primal / T, entre 0 y 1
+    referencia es el mejor objetivo conocido de la instancia (escalado); por
+    defecto, el mejor de la propia traza. Para comparar ejecuciones de una
+    misma instancia conviene pasarles la misma referencia.
+    """
+    soluciones = [(f['tiempo'], f['objetivo']) for f in filas
+                  if f.get('evento') == 'solucion' and f.get('objetivo') is not None]
+    fin = max([tiempo_limite or 0.0] + [f['tiempo'] for f in filas])
+    resultado = {'soluciones': len(soluciones), 'objetivo': None, 'cota': None, 'estado': None,
+                 'tiempo_primera': None, 'tiempo_mejor': None,
+                 'integral_primal': round(fin, 3), 'integral_primal_normalizada': 1.0 if fin > 0 else None}
+    for f in filas:
+        resultado['cota'] = f.get('cota', resultado['cota'])
+        resultado['estado'] = f.get('estado', resultado['estado'])
+    if not soluciones:
+        return resultado
+
+    mejor = min(objetivo for _, objetivo in soluciones)
+    referencia = mejor if referencia is None else min(referencia, mejor)
+
+    def brecha(objetivo):
+        escala = max(abs(objetivo), abs(referencia))
+        return 0.0 if escala == 0 else (objetivo - referencia) / escala
+
+    integral, desde, actual = soluciones[0][0], soluciones[0][0], soluciones[0][1]
+    for tiempo, objetivo in soluciones[1:]:
+        integral += (tiempo - desde) * brecha(actual)
+        desde, actual = tiempo, min(actual, objetivo)
+    integral += (fin - desde) * brecha(actual)
+
+    resultado.update({
+        'objetivo': mejor,
+        'tiempo_primera': soluciones[0][0],
+        'tiempo_mejor': next(tiempo for tiempo, objetivo in soluciones if objetivo == mejor),
+        'integral_primal': round(integral, 3),
+        'integral_primal_normalizada': round(integral / fin, 6) if fin > 0 else 0.0
+    })
+    return resultado
+
+
+def metricas_por_instancia(rutas_trazas):
+    """
+    Métricas de varias trazas, usando para cada instancia como referencia el
+    mejor objetivo entre todas sus trazas, para que las integrales primales
+    de distintos solvers o configuraciones sean comparables.
+    """
+    trazas = {ruta: leer_traza(ruta) for ruta in rutas_trazas}
+    mejores = {}
+    for filas in trazas.values():
+        instancia = filas[0].get('instancia') if filas else None
+        for f in filas:
+            if f.get('evento') == 'solucion' and f.get('objetivo') is not None:
+                mejores[instancia] = min(mejores.get(instancia, f['objetivo']), f['objetivo'])
+    resultado = {}
+    for ruta, filas in trazas.items():
+        cabecera = filas[0] if filas else {}
+        resultado[ruta] = dict(metricas(filas, cabecera.get('timeout_segundos'),
+                                        mejores.get(cabecera.get('instancia'))),
+                               instancia=cabecera.get('instancia'), solver=cabecera.get('solver'),
+                               modelo=cabecera.get('modelo'))
+    return resultado
+
+
+if __name__ == '__main__':
+    from ejecutor import FORMULACIONES, SOLVER_POR_DEFECTO, ejecutar_minizinc
+
+    parser = argparse.ArgumentParser(description='Trazas de soluciones intermedias y métricas anytime')
+    sub = parser.add_subparsers(dest='accion', required=True)
+
+    p = sub.add_parser('correr', help='Resuelve las instancias guardando la traza de cada una')
+    p.add_argument('instancias', nargs='+')
+    p.add_argument('--timeout', type=int, default=60)
+    p.add_argument('--solver', default=SOLVER_POR_DEFECTO)
+    p.add_argument('--modelo', choices=sorted(FORMULACIONES), default='cp')
+    p.add_argument('--sin-arranque', action='store_true', help='no partir de la solución previa')
+    p.add_argument('--carpeta', default=os.path.join('resultados', 'trazas'))
+
+    p = sub.add_parser('metricas', help='Tiempo a la primera y a la mejor solución e integral primal')
+    p.add_argument('trazas', nargs='+', help='archivos .jsonl (se aceptan patrones)')
+
+    args = parser.parse_args()
+    if args.accion == 'correr':
+        os.makedirs(args.carpeta, exist_ok=True)
+        etiqueta = args.solver.rsplit('.', 1)[-1]
+        for ruta in args.instancias:
+            nombre = os.path.splitext(os.path.basename(ruta))[0]
+            base = os.path.join(args.carpeta, f'{nombre}_{etiqueta}_{args.modelo}')
+            analisis = ejecutar_minizinc(ruta, base + '.txt', args.timeout, args.modelo, args.solver,
+                                         arranque=not args.sin_arranque, traza=base + '.jsonl')
+            m = analisis.get('traza')
+            if m is None:
+                print(f"{ruta}: {analisis.get('razon', 'sin traza')}")
+                continue
+            if m['soluciones'] == 0:
+                print(f"{base}.jsonl: sin soluciones ({m['estado'] or analisis.get('razon', '-')})")
+                continue
+            print(f"{base}.jsonl: {m['soluciones']} soluciones | primera {m['tiempo_primera']}s, "
+                  f"mejor {m['tiempo_mejor']}s | integral primal {m['integral_primal']}")
+    else:
+        rutas = sorted({r for patron in args.trazas for r in (glob.glob(patron) or [patron])})
+        print(f"{'Traza':50s}{'Sols':>6s}{'Primera (s)':>13s}{'Mejor (s)':>11s}{'Integral':>10s}{'Norm.':>8s}")
+        for ruta, m in metricas_por_instancia(rutas).items():
+            primera = f"{m['tiempo_primera']:.2f}" if m['tiempo_primera'] is not None else '-'
+            mejor = f"{m['tiempo_mejor']:.2f}" if m['tiempo_mejor'] is not None else '-'
+            print(f"{ruta:50s}{m['soluciones']:6d}{primera:>13s}{mejor:>11s}"
+                  f"{m['integral_primal']:10.3f}{m['integral_primal_normalizada'] or 0:8.4f}")